@@ -0,0 +1,108 @@
+# bench_cleaning.py
+"""
+clean_rosters: normalizacja wiersz po wierszu (clean_player) vs kolumnowa
+z cache (clean_players) na syntetycznych rosterach.
+
+Zawodnicy pochodzą z synth_sidearm.py (tak jak zwraca ich parser), plus
+garść nietypowych wartości (None, liczby, "6′2\"", "R So.", "-", " / " w
+hometown). Oba warianty muszą dać identyczny JSON – przy różnicy kod 1.
+
+Użycie:
+    python benchmarks/bench_cleaning.py                  # 200 drużyn po 40 zawodników
+    python benchmarks/bench_cleaning.py --teams 2000 --players 60
+"""
+import argparse
+import copy
+import json
+import os
+import statistics
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "scraping"))
+sys.path.insert(0, os.path.join(HERE, "..", "cleaning"))
+
+import clean_rosters  # noqa: E402
+from scrape_rosters import build_ontology_json_for_school  # noqa: E402
+from synth_sidearm import Synth  # noqa: E402
+
+TEAMS = 200
+PLAYERS = 40
+REPEAT = 5
+
+# wartości, których generator nie robi, a zdarzają się na stronach
+EDGE_PLAYERS = [
+    {"classYear": "R-So.", "height": "6′2\"", "weight": "185", "hometown": "Tampa, Fla. / IMG Academy",
+     "lastSchool": ""},
+    {"classYear": "R So", "height": "6 - 1", "weight": "-", "hometown": "", "lastSchool": "Tulane"},
+    {"classYear": "Gr.", "height": "-", "weight": "", "hometown": "A / B / C", "lastSchool": ""},
+    {"classYear": None, "height": None, "weight": None, "hometown": None, "lastSchool": None},
+    {"classYear": 3, "height": "", "weight": "210 lbs.", "hometown": "Ocala, Fla."},
+    {"fullName": "No fields at all"},
+]
+
+
+def make_teams(teams: int, players: int, seed: int):
+    cfg = {"school_name": "Synthetic University", "conference": "Synthetic Conference"}
+    out = []
+    for i in range(teams):
+        layout = "roster-view2" if i % 2 else "roster-list"
+        _, parsed = Synth(seed=seed + i, missing=0.2).page(layout, players)
+        team = build_ontology_json_for_school(dict(cfg, season_year=2000 + i % 25), parsed)
+        out.append(team)
+    out[0]["Players"].extend(copy.deepcopy(EDGE_PLAYERS))
+    return out
+
+
+def row_wise(teams):
+    return [[clean_rosters.clean_player(p.copy()) for p in t["Players"]] for t in teams]
+
+
+def columnar(teams):
+    return [clean_rosters.clean_players(t["Players"]) for t in teams]
+
+
+def timed(fn, teams, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        data = copy.deepcopy(teams)
+        t0 = time.perf_counter()
+        fn(data)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare row-wise and columnar roster cleaning.")
+    parser.add_argument("--teams", type=int, default=TEAMS)
+    parser.add_argument("--players", type=int, default=PLAYERS, help="players per team")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs (median)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    teams = make_teams(args.teams, args.players, args.seed)
+    rows = sum(len(t["Players"]) for t in teams)
+
+    expected = row_wise(copy.deepcopy(teams))
+    got = columnar(copy.deepcopy(teams))
+    same = json.dumps(got, ensure_ascii=False) == json.dumps(expected, ensure_ascii=False)
+
+    fields = ("classYear", "height", "weight", "hometown")
+    distinct = {f: len({repr(p.get(f)) for t in teams for p in t["Players"]}) for f in fields}
+
+    t_rows = timed(row_wise, teams, args.repeat)
+    t_cols = timed(columnar, teams, args.repeat)
+    print(f"{rows} players in {len(teams)} teams; distinct values: "
+          + ", ".join(f"{f} {n}" for f, n in distinct.items()))
+    print(f"  row-wise  {1000 * t_rows:8.1f} ms  {rows / t_rows:>10.0f} players/s")
+    print(f"  columnar  {1000 * t_cols:8.1f} ms  {rows / t_cols:>10.0f} players/s  "
+          f"({t_rows / t_cols:.1f}x)")
+    if not same:
+        print("[ERROR] columnar output differs from clean_player")
+        sys.exit(1)
+    print("Outputs identical")
+
+
+if __name__ == "__main__":
+    main()
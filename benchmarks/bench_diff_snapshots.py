@@ -0,0 +1,148 @@
+# bench_diff_snapshots.py
+"""
+diff_snapshots.py na syntetycznym snapshocie: czas pełnego porównania
+i sprawdzenie scenariuszy, w których łatwo o fałszywe "remove":
+
+  - drużyna brakuje tylko w staffie   -> trenerzy i staff przechodzą dalej, zawodnicy bez zmian,
+  - drużyna brakuje tylko w rosterach -> zawodnicy przechodzą dalej,
+  - drużyna brakuje w obu plikach     -> wszystko przechodzi dalej,
+  - to samo z --drop-missing-teams    -> "remove" dla encji z brakującego pliku,
+  - jeden zawodnik mniej, zmiana pozycji, nowy trener -> dokładnie te delty.
+
+Drużyny budują scrapery (build_*_json_for_school) z danych synth_sidearm.py.
+Przy niezgodności liczników kod 1.
+
+Użycie:
+    python benchmarks/bench_diff_snapshots.py                 # 200 drużyn
+    python benchmarks/bench_diff_snapshots.py --teams 2000
+"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "scraping"))
+sys.path.insert(0, os.path.join(HERE, "..", "cleaning"))
+
+import diff_snapshots  # noqa: E402
+from scrape_rosters import build_ontology_json_for_school  # noqa: E402
+from scrape_staff import build_staff_json_for_school  # noqa: E402
+from synth_sidearm import Synth  # noqa: E402
+
+TEAMS = 200
+PLAYERS = 40
+STAFF = 10
+
+
+def make_snapshot(teams: int, players: int, staff: int, seed: int):
+    rosters, staff_entries = [], []
+    for i in range(teams):
+        cfg = {"school_name": f"Synthetic University {i // 2}", "conference": "Synthetic Conference",
+               "season_year": 2024 + i % 2}
+        _, parsed = Synth(seed=seed + i, missing=0.2).page("roster-list", players)
+        rosters.append(build_ontology_json_for_school(cfg, parsed))
+        _, expected = Synth(seed=seed + i).staff_page(staff)
+        staff_entries.append(build_staff_json_for_school(cfg, expected["coaches"], expected["support"]))
+    return rosters, staff_entries
+
+
+def run_diff(work: str, state_dir: str, rosters, staff_entries, **options):
+    """Zapisuje snapshot do plików i puszcza diff_snapshots.main; zwraca liczniki."""
+    rosters_path = os.path.join(work, "rosters.json")
+    staff_path = os.path.join(work, "staff.json")
+    for path, data in ((rosters_path, rosters), (staff_path, staff_entries)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return diff_snapshots.main(rosters_path=rosters_path, staff_path=staff_path, state_dir=state_dir,
+                                   deltas_dir=os.path.join(work, "deltas"), metrics_dir="", **options)
+
+
+def counts(summary, kind: str):
+    c = summary[kind]
+    return c["add"], c["update"], c["remove"], c["carried"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time diff_snapshots and check its delta counts.")
+    parser.add_argument("--teams", type=int, default=TEAMS)
+    parser.add_argument("--players", type=int, default=PLAYERS, help="players per team")
+    parser.add_argument("--staff", type=int, default=STAFF, help="coaches + support staff per team")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rosters, staff_entries = make_snapshot(max(args.teams, 2), args.players, args.staff, args.seed)
+    gone = 1   # drużyna, która "nie przyszła" w scenariuszach
+    n_players = len(rosters[gone]["Players"])
+    n_coaches = len(staff_entries[gone]["Coaches"])
+    n_support = len(staff_entries[gone]["SupportStaff"])
+
+    def without(entries):
+        return [e for i, e in enumerate(entries) if i != gone]
+
+    changed = copy.deepcopy(rosters)
+    changed[0]["Players"].pop()
+    changed[0]["Players"][0]["position"] = "ZZ"
+    changed_staff = copy.deepcopy(staff_entries)
+    coach = {"coachId": changed_staff[0]["Team"]["teamId"] + "_coach_new", "fullName": "New Assistant",
+             "role": "Assistant Coach", "email": "", "phone": ""}
+    changed_staff[0]["Coaches"].append(coach)
+
+    # (opis, rostery, staff, opcje, {typ: (add, update, remove, carried)})
+    scenarios = [
+        ("unchanged", rosters, staff_entries, {},
+         {"teams": (0, 0, 0, 0), "players": (0, 0, 0, 0), "coaches": (0, 0, 0, 0)}),
+        ("team missing from staff only", rosters, without(staff_entries), {},
+         {"teams": (0, 0, 0, 0), "players": (0, 0, 0, 0), "coaches": (0, 0, 0, n_coaches),
+          "support_staff": (0, 0, 0, n_support)}),
+        ("team missing from rosters only", without(rosters), staff_entries, {},
+         {"teams": (0, 0, 0, 0), "players": (0, 0, 0, n_players), "coaches": (0, 0, 0, 0)}),
+        ("team missing from both", without(rosters), without(staff_entries), {},
+         {"teams": (0, 0, 0, 1), "players": (0, 0, 0, n_players), "coaches": (0, 0, 0, n_coaches)}),
+        ("missing from staff, --drop-missing-teams", rosters, without(staff_entries),
+         {"drop_missing_teams": True},
+         {"teams": (0, 0, 0, 0), "players": (0, 0, 0, 0), "coaches": (0, 0, n_coaches, 0),
+          "support_staff": (0, 0, n_support, 0)}),
+        ("player left, position change, new coach", changed, changed_staff, {},
+         {"teams": (0, 0, 0, 0), "players": (0, 1, 1, 0), "coaches": (1, 0, 0, 0)}),
+    ]
+
+    failed = 0
+    with tempfile.TemporaryDirectory() as work:
+        state_dir = os.path.join(work, "state")
+        t0 = time.perf_counter()
+        first = run_diff(work, state_dir, rosters, staff_entries)
+        t_first = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        run_diff(work, state_dir, rosters, staff_entries, dry_run=True)
+        t_same = time.perf_counter() - t0
+
+        rows = sum(first[kind]["add"] for kind in first)
+        print(f"{rows} entities in {len(rosters)} teams")
+        print(f"  first run (all add)   {1000 * t_first:8.1f} ms  {rows / t_first:>10.0f} entities/s")
+        print(f"  unchanged snapshot    {1000 * t_same:8.1f} ms  {rows / t_same:>10.0f} entities/s")
+
+        for name, r, s, options, expected in scenarios:
+            summary = run_diff(work, state_dir, r, s, dry_run=True, **options)
+            wrong = {kind: counts(summary, kind) for kind, want in expected.items()
+                     if counts(summary, kind) != want}
+            status = "ok" if not wrong else "FAIL " + ", ".join(
+                f"{kind} (add, update, remove, carried) = {got}, expected {expected[kind]}"
+                for kind, got in wrong.items())
+            print(f"  {name:<42} {status}")
+            failed += bool(wrong)
+
+    if failed:
+        print(f"[ERROR] {failed} scenario(s) gave wrong delta counts")
+        sys.exit(1)
+    print("All scenarios match")
+
+
+if __name__ == "__main__":
+    main()
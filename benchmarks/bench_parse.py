@@ -0,0 +1,125 @@
+# bench_parse.py
+"""
+Benchmark parsowania stron rosteru: pełne drzewo vs drzewo tylko z fragmentu
+z rosterem (html_parsing.py), dla backendów html.parser i lxml.
+
+Dla każdego trybu raportuje medianę czasu parsowania jednej strony oraz
+szczytowe RSS procesu. Każdy tryb leci w osobnym podprocesie, żeby pomiar
+pamięci jednego trybu nie zawyżał drugiego.
+
+Użycie:
+    python benchmarks/bench_parse.py page1.html page2.html ...
+    python benchmarks/bench_parse.py --archive html_archive     # strony z archiwum
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "scraping"))
+
+from html_parsing import HAS_LXML  # noqa: E402
+from layout import sniff_dom_layout, LAYOUT_VIEW2_TABLE  # noqa: E402
+
+# (nazwa, backend, restrict)
+MODES = [
+    ("full/html.parser", "html.parser", False),
+    ("restricted/html.parser", "html.parser", True),
+    ("full/lxml", "lxml", False),
+    ("restricted/lxml", "lxml", True),
+]
+
+
+def load_pages(paths, archive_dir):
+    pages = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append((os.path.basename(path), f.read()))
+    if archive_dir:
+        from html_archive import HtmlArchive
+        archive = HtmlArchive(archive_dir)
+        for (school, season, _), entry in sorted(archive.latest_entries(kind="roster").items()):
+            pages.append((f"{school} {season}", archive.load(entry["hash"])))
+    return pages
+
+
+def max_rss_kb() -> int:
+    # Linux: ru_maxrss w KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_worker(mode_name, paths, archive_dir, repeat):
+    from scrape_rosters import parse_sidearm_roster
+    from parse_sidearm_view2_roster import parse_sidearm_roster_view2
+
+    _, backend, restrict = next(m for m in MODES if m[0] == mode_name)
+    pages = load_pages(paths, archive_dir)
+    baseline = max_rss_kb()
+
+    per_page = []
+    players = 0
+    for _, html in pages:
+        parse = (parse_sidearm_roster_view2 if sniff_dom_layout(html) == LAYOUT_VIEW2_TABLE
+                 else parse_sidearm_roster)
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            result = parse(html, backend=backend, restrict=restrict)
+            times.append(time.perf_counter() - t0)
+        per_page.append(statistics.median(times))
+        players += len(result)
+
+    print(json.dumps({
+        "mode": mode_name,
+        "pages": len(pages),
+        "players": players,
+        "median_ms": 1000 * statistics.median(per_page) if per_page else 0.0,
+        "total_ms": 1000 * sum(per_page),
+        "peak_rss_kb": max_rss_kb(),
+        "baseline_rss_kb": baseline,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark roster page parsing modes.")
+    parser.add_argument("pages", nargs="*", help="saved roster HTML files")
+    parser.add_argument("--archive", default="", help="also use latest roster pages from this archive")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--worker", default="", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.pages, args.archive, args.repeat)
+        return
+
+    if not args.pages and not args.archive:
+        parser.error("give some HTML files or --archive")
+
+    results = []
+    for mode_name, backend, _ in MODES:
+        if backend == "lxml" and not HAS_LXML:
+            print(f"skip {mode_name}: lxml not installed")
+            continue
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", mode_name,
+               "--repeat", str(args.repeat)]
+        if args.archive:
+            cmd += ["--archive", args.archive]
+        out = subprocess.run(cmd + list(args.pages), check=True,
+                             capture_output=True, text=True).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    print(f"{'mode':<24} {'pages':>5} {'players':>7} {'ms/page':>9} {'total ms':>9} "
+          f"{'peak RSS MB':>11} {'+RSS MB':>8}")
+    for r in results:
+        print(f"{r['mode']:<24} {r['pages']:>5} {r['players']:>7} {r['median_ms']:>9.2f} "
+              f"{r['total_ms']:>9.1f} {r['peak_rss_kb'] / 1024:>11.1f} "
+              f"{(r['peak_rss_kb'] - r['baseline_rss_kb']) / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
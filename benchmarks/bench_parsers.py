@@ -0,0 +1,267 @@
+# bench_parsers.py
+"""
+Benchmark + test regresji parserów na zapisanych stronach Sidearm (w pełni offline).
+
+Fixtures leżą w benchmarks/fixtures/<parser>/, po jednym pliku .html na stronę,
+obok wzorcowy wynik parsera <nazwa>.json ("golden"):
+
+    roster-list/    parse_sidearm_roster        (lista 'Jersey Number')
+    roster-view2/   parse_sidearm_roster_view2  (tabela view=2)
+    staff/          parse_staff_for_school      (coaches + support staff)
+
+Dla każdego parsera raportuje: strony/s, µs na rekord (zawodnika / osobę) i
+szczyt pamięci (tracemalloc) dla najcięższej strony. Przy każdej różnicy
+skrypt kończy się kodem 1, więc nadaje się do CI. Sprawdzenia są dwa:
+
+  - golden JSON przy fixtures – zapisany przez sam parser (--update-golden,
+    --capture), więc wyłapuje tylko ZMIANĘ wyniku względem poprzedniej wersji,
+    nie błąd, który był od początku. Obecne fixtures są ręcznie złożonymi
+    przykładami (np. lsu-2025-table – LSU nie ma w schools.json), nie
+    nagraniami stron szkół z rejestru,
+  - strony z synth_sidearm.py (--synthetic, domyślnie kilka na layout:
+    lista, view=2, tabela i karty staffu) – oczekiwany wynik liczy generator
+    z wylosowanych danych, niezależnie od parserów, więc to jest właściwy
+    test poprawności.
+
+Użycie:
+    python benchmarks/bench_parsers.py                    # wszystkie parsery
+    python benchmarks/bench_parsers.py --parser staff --repeat 20
+    python benchmarks/bench_parsers.py --update-golden    # po ZAMIERZONEJ zmianie parsera
+    python benchmarks/bench_parsers.py --capture html_archive   # nowe fixtures z archiwum
+    python benchmarks/bench_parsers.py --synthetic 20     # więcej stron syntetycznych
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "scraping"))
+
+from html_parsing import BACKENDS, HAS_LXML  # noqa: E402
+from layout import sniff_dom_layout, LAYOUT_VIEW2_TABLE  # noqa: E402
+from parse_sidearm_view2_roster import parse_sidearm_roster_view2  # noqa: E402
+from scrape_rosters import parse_sidearm_roster  # noqa: E402
+from scrape_staff import parse_staff_for_school  # noqa: E402
+from synth_sidearm import LAYOUTS, PARSER_DIRS, Synth  # noqa: E402
+
+FIXTURES_DIR = os.path.join(HERE, "fixtures")
+REPEAT = 5
+SYNTHETIC_PAGES = 5     # stron syntetycznych na layout
+SYNTHETIC_SIZES = {"roster-list": 40, "roster-view2": 40, "staff-table": 12, "staff-cards": 12}
+
+
+def _parse_staff(html: str, backend=None) -> Dict:
+    # parser staffu ma stały backend (html.parser)
+    coaches, support = parse_staff_for_school(html)
+    return {"coaches": coaches, "support": support}
+
+
+def _count_staff(result: Dict) -> int:
+    return len(result["coaches"]) + len(result["support"])
+
+
+# katalog fixtures -> (parser(html, backend) -> wynik JSON-owalny, liczba rekordów w wyniku)
+PARSERS: Dict[str, Tuple[Callable, Callable]] = {
+    "roster-list": (lambda html, backend=None: parse_sidearm_roster(html, backend=backend), len),
+    "roster-view2": (lambda html, backend=None: parse_sidearm_roster_view2(html, backend=backend), len),
+    "staff": (_parse_staff, _count_staff),
+}
+
+
+def golden_path(html_path: str) -> str:
+    return os.path.splitext(html_path)[0] + ".json"
+
+
+def load_fixtures(fixtures_dir: str, parser_name: str) -> List[Tuple[str, str]]:
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, parser_name, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append((path, f.read()))
+    return pages
+
+
+def write_golden(path: str, result) -> None:
+    with open(golden_path(path), "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def check_golden(path: str, result) -> str:
+    """"" gdy wynik zgadza się z golden JSON, inaczej opis różnicy."""
+    try:
+        with open(golden_path(path), "r", encoding="utf-8") as f:
+            expected = json.load(f)
+    except FileNotFoundError:
+        return "no golden file (run with --update-golden)"
+    return compare(result, expected)
+
+
+def compare(result, expected) -> str:
+    """"" gdy wyniki są równe, inaczej krótki opis pierwszej różnicy."""
+    if result == expected:
+        return ""
+    if isinstance(expected, list) and isinstance(result, list):
+        if len(result) != len(expected):
+            return f"{len(result)} records, expected {len(expected)}"
+        for i, (got, want) in enumerate(zip(result, expected)):
+            if got != want:
+                fields = sorted(k for k in set(got) | set(want) if got.get(k) != want.get(k))
+                return f"record {i} differs in {', '.join(fields)}"
+    if isinstance(expected, dict) and isinstance(result, dict):
+        for key in sorted(set(result) | set(expected)):
+            problem = compare(result.get(key), expected.get(key))
+            if problem:
+                return f"{key}: {problem}"
+    return "output differs from expected"
+
+
+def check_synthetic(pages: int, backend) -> Tuple[int, List[str]]:
+    """
+    Strony z synth_sidearm.py dla każdego layoutu; oczekiwany wynik pochodzi
+    z generatora, nie z parsera. Zwraca (liczba stron, opisy różnic).
+    """
+    failures = []
+    checked = 0
+    for layout in LAYOUTS:
+        parse = PARSERS[PARSER_DIRS[layout]][0]
+        for seed in range(pages):
+            page, expected = Synth(seed=seed).page(layout, SYNTHETIC_SIZES[layout])
+            problem = compare(parse(page, backend=backend), expected)
+            checked += 1
+            if problem:
+                failures.append(f"synthetic {layout} seed {seed}: {problem}")
+    return checked, failures
+
+
+def bench_parser(parser_name: str, pages: List[Tuple[str, str]], backend, repeat: int,
+                 update: bool) -> Dict:
+    parse, count = PARSERS[parser_name]
+    failures = []
+    records = 0
+    per_page = []
+    peak = 0
+    for path, html in pages:
+        result = parse(html, backend=backend)
+        records += count(result)
+        if update:
+            write_golden(path, result)
+        else:
+            problem = check_golden(path, result)
+            if problem:
+                failures.append(f"{os.path.relpath(path, HERE)}: {problem}")
+
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            parse(html, backend=backend)
+            times.append(time.perf_counter() - t0)
+        per_page.append(statistics.median(times))
+
+        # pamięć mierzymy osobno – tracemalloc spowalnia parsowanie
+        tracemalloc.start()
+        parse(html, backend=backend)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    total = sum(per_page)
+    return {
+        "parser": parser_name,
+        "pages": len(pages),
+        "records": records,
+        "pages_per_s": len(pages) / total if total else 0.0,
+        "us_per_record": 1e6 * total / records if records else 0.0,
+        "ms_per_page": 1000 * statistics.median(per_page) if per_page else 0.0,
+        "peak_kb": peak / 1024,
+        "failures": failures,
+    }
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def capture(archive_dir: str, fixtures_dir: str) -> int:
+    """Kopiuje najnowsze strony z archiwum HTML do fixtures i zapisuje dla nich golden JSON."""
+    from html_archive import HtmlArchive
+    archive = HtmlArchive(archive_dir)
+    added = 0
+    for (school, season, kind), entry in sorted(archive.latest_entries().items()):
+        html = archive.load(entry["hash"])
+        if kind == "staff":
+            parser_name = "staff"
+        else:
+            parser_name = "roster-view2" if sniff_dom_layout(html) == LAYOUT_VIEW2_TABLE else "roster-list"
+        path = os.path.join(fixtures_dir, parser_name, f"{_slug(school)}-{season}.html")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        write_golden(path, PARSERS[parser_name][0](html))
+        added += 1
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the roster/staff parsers on saved fixtures.")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="fixtures directory")
+    parser.add_argument("--parser", choices=sorted(PARSERS), action="append",
+                        help="only this parser (can be repeated)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per page (median)")
+    parser.add_argument("--html-parser", choices=BACKENDS, default="html.parser",
+                        help="BeautifulSoup backend for the roster parsers")
+    parser.add_argument("--update-golden", action="store_true",
+                        help="rewrite the golden JSON files from the current parsers")
+    parser.add_argument("--synthetic", type=int, default=SYNTHETIC_PAGES, metavar="N",
+                        help="also check N generated pages per layout against generator-derived output (0 = off)")
+    parser.add_argument("--capture", default="", metavar="ARCHIVE",
+                        help="add the latest pages from this HTML archive as fixtures and exit")
+    args = parser.parse_args()
+
+    if args.capture:
+        print(f"Captured {capture(args.capture, args.fixtures)} pages into {args.fixtures}")
+        return
+    if args.html_parser == "lxml" and not HAS_LXML:
+        parser.error("--html-parser lxml needs the lxml package")
+
+    results = []
+    for name in args.parser or sorted(PARSERS):
+        pages = load_fixtures(args.fixtures, name)
+        if not pages:
+            print(f"skip {name}: no fixtures in {os.path.join(args.fixtures, name)}")
+            continue
+        results.append(bench_parser(name, pages, args.html_parser, max(1, args.repeat),
+                                    args.update_golden))
+
+    print(f"{'parser':<14} {'pages':>5} {'records':>7} {'pages/s':>9} {'us/record':>10} "
+          f"{'ms/page':>8} {'peak KB':>8}")
+    for r in results:
+        print(f"{r['parser']:<14} {r['pages']:>5} {r['records']:>7} {r['pages_per_s']:>9.1f} "
+              f"{r['us_per_record']:>10.1f} {r['ms_per_page']:>8.2f} {r['peak_kb']:>8.0f}")
+
+    synthetic, synthetic_failures = check_synthetic(max(0, args.synthetic), args.html_parser)
+    if synthetic:
+        print(f"Synthetic pages: {synthetic - len(synthetic_failures)}/{synthetic} match "
+              "the generator's expected output")
+
+    failures = [f for r in results for f in r["failures"]]
+    if args.update_golden:
+        print(f"Updated golden JSON for {sum(r['pages'] for r in results)} pages")
+        failures = []
+    elif not failures:
+        print("All outputs match golden JSON")
+    failures += synthetic_failures
+    if failures:
+        print(f"\n{len(failures)} pages differ from the expected output:")
+        for f in failures:
+            print(f"  {f}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
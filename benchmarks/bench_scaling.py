@@ -0,0 +1,129 @@
+# bench_scaling.py
+"""
+Krzywe skalowania parserów na syntetycznych stronach (synth_sidearm.py).
+
+Dla rosnącej liczby wierszy (zawodników / osób) mierzy medianę czasu
+parsowania jednej strony, sprawdza wynik z oczekiwanym JSON-em i dopasowuje
+wykładnik k w czas ~ n^k (regresja na log-log). k wyraźnie powyżej 1 znaczy,
+że gdzieś w parserze jest pętla kwadratowa – zanim zobaczymy to na produkcji.
+
+Użycie:
+    python benchmarks/bench_scaling.py                          # wszystkie layouty
+    python benchmarks/bench_scaling.py --layout staff-table --sizes 100,1000,5000
+    python benchmarks/bench_scaling.py --csv scaling.csv        # punkty do wykresu
+
+Kod wyjścia 1: wynik parsera różni się od oczekiwanego albo k > --max-exponent.
+"""
+import argparse
+import csv
+import math
+import statistics
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from bench_parsers import PARSERS
+from synth_sidearm import LAYOUTS, PARSER_DIRS, Synth
+
+SIZES = (25, 50, 100, 200, 400, 800, 1600)
+MAX_EXPONENT = 1.3
+MIN_SECONDS = 0.2   # minimalny łączny czas pomiaru jednego punktu
+
+
+def fit_exponent(points: List[Tuple[int, float]]) -> float:
+    """Nachylenie prostej log(czas) ~ log(n) (najmniejsze kwadraty)."""
+    xs = [math.log(n) for n, _ in points]
+    ys = [math.log(t) for _, t in points]
+    mx, my = statistics.fmean(xs), statistics.fmean(ys)
+    var = sum((x - mx) ** 2 for x in xs)
+    if not var:
+        return 0.0
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var
+
+
+def time_parse(parse, html: str, backend) -> float:
+    """Mediana z kilku przebiegów; liczba przebiegów dobrana do czasu jednego."""
+    t0 = time.perf_counter()
+    parse(html, backend=backend)
+    first = time.perf_counter() - t0
+    runs = max(1, min(20, int(MIN_SECONDS / first) if first else 20))
+    times = [first]
+    for _ in range(runs - 1):
+        t0 = time.perf_counter()
+        parse(html, backend=backend)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def scale_layout(layout: str, sizes, backend, seed: int, noise: float, missing: float) -> Dict:
+    parse, count = PARSERS[PARSER_DIRS[layout]]
+    points = []
+    mismatches = []
+    for n in sizes:
+        page, expected = Synth(seed=seed, noise=noise, missing=missing).page(layout, n)
+        result = parse(page, backend=backend)
+        if result != expected:
+            mismatches.append(n)
+        seconds = time_parse(parse, page, backend)
+        points.append((n, seconds, count(result), len(page)))
+    return {
+        "layout": layout,
+        "points": points,
+        "exponent": fit_exponent([(n, t) for n, t, _, _ in points]),
+        "mismatches": mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure parser scaling on synthetic Sidearm pages.")
+    parser.add_argument("--layout", choices=LAYOUTS, action="append",
+                        help="layouts to measure (default: all, can be repeated)")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        help="rows per page, comma separated")
+    parser.add_argument("--html-parser", default="html.parser", help="backend for the roster parsers")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", type=float, default=0.3)
+    parser.add_argument("--missing", type=float, default=0.2)
+    parser.add_argument("--max-exponent", type=float, default=MAX_EXPONENT,
+                        help="fail when the fitted exponent is above this")
+    parser.add_argument("--csv", default="", help="also write all points to this CSV file")
+    args = parser.parse_args()
+    try:
+        sizes = sorted({int(s) for s in args.sizes.split(",") if s.strip()})
+    except ValueError:
+        parser.error(f"bad --sizes: {args.sizes!r}")
+    if len(sizes) < 2 or sizes[0] < 1:
+        parser.error("--sizes needs at least two positive sizes")
+
+    results = [scale_layout(layout, sizes, args.html_parser, args.seed, args.noise, args.missing)
+               for layout in args.layout or LAYOUTS]
+
+    failed = False
+    for r in results:
+        print(f"\n{r['layout']}")
+        print(f"  {'rows':>6} {'records':>7} {'page KB':>8} {'ms/page':>9} {'us/row':>8}")
+        for n, seconds, records, size in r["points"]:
+            print(f"  {n:>6} {records:>7} {size / 1024:>8.0f} {1000 * seconds:>9.2f} {1e6 * seconds / n:>8.1f}")
+        verdict = "ok"
+        if r["exponent"] > args.max_exponent:
+            verdict = f"SUPER-LINEAR (> {args.max_exponent})"
+            failed = True
+        print(f"  time ~ n^{r['exponent']:.2f}  {verdict}")
+        if r["mismatches"]:
+            print(f"  [ERROR] output differs from expected for sizes {r['mismatches']}")
+            failed = True
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["layout", "rows", "records", "page_bytes", "seconds"])
+            for r in results:
+                for n, seconds, records, size in r["points"]:
+                    writer.writerow([r["layout"], n, records, size, f"{seconds:.6f}"])
+        print(f"\nWrote {args.csv}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
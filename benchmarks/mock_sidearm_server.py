@@ -0,0 +1,249 @@
+# mock_sidearm_server.py
+"""
+Lokalny serwer udający strony Sidearm – do crawla end-to-end bez sieci
+i do testów obciążeniowych (przepustowość, --workers / --per-host, ponowienia).
+
+Każdy host z schools.json dostaje własny port: bazowy + pozycja hosta na
+posortowanej liście (registry.school_hosts), a ścieżki są takie same jak
+na prawdziwych stronach. Scrapery kieruje się na serwer opcją --base-url:
+
+    python benchmarks/mock_sidearm_server.py --port 8765 --latency 150 --error-rate 0.05 &
+    python scraping/crawl.py --base-url http://127.0.0.1:8765 --cache-dir "" --state-file ""
+
+Treść stron:
+  - domyślnie syntetyczna (synth_sidearm.py) – roster jako lista albo tabela
+    view=2 (pole "layout" z schools.json, a bez niego stały wybór per szkoła),
+    staff jako tabela albo karty; ta sama strona przy każdym uruchomieniu
+    (seed z nazwy szkoły, sezonu i rodzaju strony),
+  - --archive html_archive – strony nagrane przez scrapery (html_archive.py),
+    syntetyczne tylko tam, gdzie w archiwum nic nie ma.
+
+Zachowanie serwera (każdy request losowany osobno):
+  --latency / --jitter   opóźnienie odpowiedzi w ms,
+  --error-rate           odsetek odpowiedzi 503,
+  --throttle-rate        odsetek odpowiedzi 429 z nagłówkiem Retry-After (--retry-after),
+  --drop-rate            odsetek połączeń zamykanych bez odpowiedzi,
+ETag + If-None-Match -> 304, więc działają też warunkowe GET-y z http_cache.py.
+"""
+import argparse
+import hashlib
+import os
+import random
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "scraping"))
+
+from layout import LAYOUT_VIEW2_TABLE, normalize_layout  # noqa: E402
+from registry import BASE_SCHOOLS, YEARS, expand_schools, parse_years, school_hosts  # noqa: E402
+from synth_sidearm import Synth  # noqa: E402
+
+PORT = 8765
+PLAYERS = 40
+STAFF = 10
+
+
+class MockSidearm:
+    """Stan serwera wspólny dla wszystkich portów: strony, zachowanie, statystyki."""
+
+    def __init__(self, years: List[int], players: int = PLAYERS, staff: int = STAFF,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: int = 1, drop_rate: float = 0.0,
+                 archive_dir: str = "", seed: int = 0):
+        self.hosts = school_hosts(BASE_SCHOOLS)
+        self.players = players
+        self.staff = staff
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.drop_rate = drop_rate
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pages: Dict[Tuple[str, str], Tuple[Dict, str]] = {}
+        self._bodies: Dict[Tuple[str, str], Tuple[bytes, str]] = {}
+        self.stats: Counter = Counter()
+        self.started = time.monotonic()
+
+        # (host, ścieżka) -> (cfg, kind); roster wygrywa, gdy staff ma ten sam adres
+        for cfg in expand_schools(BASE_SCHOOLS, years):
+            for kind, url in (("staff", cfg["staff_url"]), ("roster", cfg["roster_url"])):
+                if url:
+                    parsed = urlparse(url)
+                    self._pages[parsed.netloc.lower(), parsed.path] = (cfg, kind)
+
+        self._archived: Dict[Tuple[str, int, str], str] = {}
+        self._archive = None
+        if archive_dir:
+            from html_archive import HtmlArchive
+            self._archive = HtmlArchive(archive_dir)
+            self._archived = {key: entry["hash"] for key, entry in self._archive.latest_entries().items()}
+
+    def _render(self, cfg: Dict, kind: str) -> str:
+        digest = self._archived.get((cfg["school_name"], cfg["season_year"], kind))
+        if digest is not None:
+            return self._archive.load(digest)
+        key = f"{self.seed}|{cfg['school_name']}|{cfg['season_year']}|{kind}".encode("utf-8")
+        synth = Synth(seed=int.from_bytes(hashlib.sha1(key).digest()[:8], "big"))
+        # stały "wariant" szkoły – część hostów ma tabelę view=2 / karty staffu
+        variant = hashlib.sha1(cfg["school_name"].encode("utf-8")).digest()[0]
+        if kind == "roster":
+            forced = normalize_layout(cfg.get("layout"))
+            view2 = forced == LAYOUT_VIEW2_TABLE if forced else variant % 3 == 0
+            return synth.page("roster-view2" if view2 else "roster-list", self.players)[0]
+        return synth.staff_page(self.staff, cards=variant % 2 == 1)[0]
+
+    def page(self, host: str, path: str) -> Optional[Tuple[bytes, str]]:
+        """(treść, ETag) albo None dla nieznanej ścieżki."""
+        key = (host, path)
+        with self._lock:
+            cached = self._bodies.get(key)
+        if cached is not None:
+            return cached
+        found = self._pages.get(key)
+        if found is None:
+            return None
+        body = self._render(*found).encode("utf-8")
+        page = (body, '"' + hashlib.sha1(body).hexdigest()[:16] + '"')
+        with self._lock:
+            self._bodies[key] = page
+        return page
+
+    def roll(self) -> Tuple[float, str]:
+        """Losuje opóźnienie i wynik requestu: ok / drop / throttle / error."""
+        with self._lock:
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+            r = self.rng.random()
+        for outcome, rate in (("drop", self.drop_rate), ("throttle", self.throttle_rate),
+                              ("error", self.error_rate)):
+            if r < rate:
+                return delay, outcome
+            r -= rate
+        return delay, "ok"
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+
+class MockSidearmHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, jak prawdziwe serwery
+    server_version = "MockSidearm/1.0"
+
+    def do_GET(self):
+        mock: MockSidearm = self.server.mock
+        host = self.server.site_host
+        delay, outcome = mock.roll()
+        if delay:
+            time.sleep(delay)
+
+        if outcome == "drop":
+            mock.count("dropped")
+            self.close_connection = True
+            return
+        if outcome == "throttle":
+            self._send(429, b"Too Many Requests", {"Retry-After": str(mock.retry_after)})
+            return
+        if outcome == "error":
+            self._send(503, b"Service Unavailable")
+            return
+
+        page = mock.page(host, urlparse(self.path).path)
+        if page is None:
+            self._send(404, b"Not Found")
+            return
+        body, etag = page
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", {"ETag": etag})
+            return
+        self._send(200, body, {"ETag": etag, "Content-Type": "text/html; charset=utf-8"})
+
+    def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        self.server.mock.count(str(status))
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            sys.stderr.write(f"{self.server.site_host} {format % args}\n")
+
+
+def serve(mock: MockSidearm, bind: str = "127.0.0.1", port: int = PORT,
+          verbose: bool = False) -> List[ThreadingHTTPServer]:
+    """Uruchamia po jednym serwerze na host (w wątkach); zwraca listę serwerów."""
+    servers = []
+    for i, host in enumerate(mock.hosts):
+        server = ThreadingHTTPServer((bind, port + i), MockSidearmHandler)
+        server.daemon_threads = True
+        server.mock = mock
+        server.site_host = host
+        server.verbose = verbose
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic or recorded Sidearm pages locally.")
+    parser.add_argument("--bind", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=PORT, help="first port (one port per school host)")
+    parser.add_argument("--years", default="", help="seasons to serve (default: schools.json)")
+    parser.add_argument("--players", type=int, default=PLAYERS, help="players per synthetic roster")
+    parser.add_argument("--staff", type=int, default=STAFF, help="people per synthetic staff page")
+    parser.add_argument("--archive", default="", help="serve recorded pages from this HTML archive")
+    parser.add_argument("--latency", type=float, default=0.0, help="mean response delay in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- random delay in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0,
+                        help="fraction of 429 responses with Retry-After")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After value in seconds")
+    parser.add_argument("--drop-rate", type=float, default=0.0,
+                        help="fraction of connections closed without a response")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    try:
+        years = parse_years(args.years) if args.years else YEARS
+    except ValueError as e:
+        parser.error(str(e))
+    mock = MockSidearm(years, players=args.players, staff=args.staff, latency=args.latency,
+                       jitter=args.jitter, error_rate=args.error_rate,
+                       throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+                       drop_rate=args.drop_rate, archive_dir=args.archive, seed=args.seed)
+    servers = serve(mock, args.bind, args.port, args.verbose)
+    print(f"Serving {len(mock.hosts)} hosts on {args.bind}:{args.port}-{args.port + len(servers) - 1}; "
+          f"use --base-url http://{args.bind}:{args.port}", flush=True)
+    # kill / Ctrl-C – w obu przypadkach wypisz statystyki
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for server in servers:
+            server.server_close()
+        elapsed = time.monotonic() - mock.started
+        total = sum(mock.stats.values())
+        print(f"\n{total} requests in {elapsed:.0f}s: "
+              + ", ".join(f"{k} {v}" for k, v in sorted(mock.stats.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+# synth_sidearm.py
+"""
+Generator syntetycznych stron Sidearm do testów skali i testów obciążeniowych parserów.
+
+Tworzy strony w trzech layoutach:
+  - roster-list  – lista 'Jersey Number' (parse_sidearm_roster),
+  - roster-view2 – tabela view=2 (parse_sidearm_roster_view2),
+  - staff        – tabela albo karty coachów (parse_staff_for_school),
+z dowolną liczbą zawodników / osób, szumem w markupie (puste kontenery,
+ikony SVG, komentarze, skrypty, tabele i linki spoza rosteru) i brakującymi
+polami. Razem ze stroną powstaje oczekiwany wynik parsera – liczony z
+wygenerowanych danych, a nie przez uruchomienie parsera.
+
+Braki są generowane tylko tam, gdzie parsery mają zdefiniowane zachowanie:
+  - lista: brak B/T, brak Last School, brak całego bloku Hometown,
+  - view=2: puste komórki wzrostu, wagi, B/T i szkoły,
+  - staff: brak e-maila, brak telefonu.
+
+Zapis ma ten sam układ co benchmarks/fixtures (<parser>/<nazwa>.html + .json),
+więc wygenerowany katalog można podać do bench_parsers.py --fixtures.
+
+Użycie:
+    python benchmarks/synth_sidearm.py --out /tmp/synth --players 2000 --staff 500
+    python benchmarks/bench_parsers.py --fixtures /tmp/synth
+"""
+import argparse
+import html as html_lib
+import json
+import os
+import random
+from typing import Dict, List, Tuple
+
+FIRST_NAMES = ("Jake Tyler Cole Mason Drew Luke Carson Brody Gavin Trey Wyatt Nolan Caleb Hunter "
+               "Landon Jackson Ryan Colby Ethan Parker Austin Blake Chase Logan Reid Grant Owen "
+               "Bryce Connor Dylan Jace Cade Hayden Seth Garrett Tanner Kyle Evan Marcus").split()
+LAST_NAMES = ("Anderson Bishop Carter Dawson Ellis Fletcher Hughes Irving Jennings Keller Lawson "
+              "Mercer Nash Owens Patton Quinn Ramsey Sutton Tucker Underwood Vance Walsh Young "
+              "Zimmerman Brooks Crane Doyle Foster Hale Kirby Moss Pruitt Rhodes Sims Thornton").split()
+POSITIONS = ("RHP", "LHP", "C", "1B", "2B", "SS", "3B", "OF", "INF", "UTL", "C/1B", "RHP/OF")
+CLASS_YEARS = ("Fr.", "So.", "Jr.", "Sr.", "Gr.", "R-Fr.", "R-So.", "R-Jr.", "R-Sr.", "5th")
+BATS_THROWS = ("R/R", "L/L", "R/L", "L/R", "S/R")
+HOMETOWNS = ("Tampa, Fla.", "Katy, Texas", "Lexington, Ky.", "Jackson, Tenn.", "Marietta, Ga.",
+             "Fresno, Calif.", "Baton Rouge, La.", "Tulsa, Okla.", "Naperville, Ill.", "Mobile, Ala.",
+             "Omaha, Neb.", "Wichita, Kan.")
+SCHOOLS = ("Jesuit HS", "Seven Lakes HS", "Lafayette HS", "Memphis University School", "Walton HS",
+           "Clovis West HS", "Catholic HS", "Jenks HS", "Neuqua Valley HS", "Chipola College",
+           "San Jacinto College", "McGill-Toolen Catholic")
+# (tytuł, czy coach według scrape_staff.classify_role)
+STAFF_TITLES = (
+    ("Head Coach", True), ("Associate Head Coach", True), ("Pitching Coach", True),
+    ("Assistant Coach / Recruiting Coordinator", True), ("Volunteer Assistant Coach", True),
+    ("Director of Baseball Operations", False), ("Director of Player Development", False),
+    ("Video Coordinator", False), ("Athletic Trainer", False), ("Equipment Manager", False),
+    ("Baseball Analyst", False), ("Strength and Conditioning Coach", True),
+)
+
+LAYOUTS = ("roster-list", "roster-view2", "staff-table", "staff-cards")
+# layout -> katalog parsera w układzie fixtures
+PARSER_DIRS = {"roster-list": "roster-list", "roster-view2": "roster-view2",
+               "staff-table": "staff", "staff-cards": "staff"}
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title}</title>
+<link rel="stylesheet" href="/css/app.css?v=3.14.2">
+<script>window.dataLayer=window.dataLayer||[];window.sidearmConfig={{"sport":"baseball"}};</script>
+<style>.sr-only{{position:absolute;width:1px;height:1px;overflow:hidden}}</style>
+</head><body>
+<header class="main-header"><nav><ul>
+<li><a href="/">Home</a></li><li><a href="/sports/baseball/schedule">Schedule</a></li>
+<li><a href="/sports/baseball/roster">Roster</a></li><li><a href="/tickets">Tickets</a></li>
+</ul></nav><form><input type="hidden" name="__RequestVerificationToken" value="{token}"></form></header>
+<main id="main-content">
+"""
+PAGE_FOOT = """</main>
+<footer><p>&copy; 2025 Synthetic University Athletics</p>
+<ul><li><a href="/privacy">Privacy Policy</a></li><li><a href="/accessibility">Accessibility</a></li></ul></footer>
+<script src="/js/sidearm.min.js"></script>
+</body></html>
+"""
+ICON = '<svg class="icon" viewBox="0 0 24 24" aria-hidden="true"><path d="M12 2L2 7l10 5 10-5-10-5z"/></svg>'
+
+
+class Synth:
+    """Generator z własnym random.Random – ten sam seed daje te same strony."""
+
+    def __init__(self, seed: int = 0, noise: float = 0.3, missing: float = 0.2):
+        self.rng = random.Random(seed)
+        self.noise = noise
+        self.missing = missing
+
+    def _maybe(self, p: float) -> bool:
+        return self.rng.random() < p
+
+    def _names(self, n: int) -> List[str]:
+        """n różnych imion; od pewnej liczby z inicjałem w środku (żadne nie jest podciągiem innego)."""
+        names = [f"{f} {l}" for f in FIRST_NAMES for l in LAST_NAMES]
+        self.rng.shuffle(names)
+        if n <= len(names):
+            return names[:n]
+        initials = [chr(c) for c in range(ord("A"), ord("Z") + 1)]
+        out = []
+        for i in range(n):
+            first, last = names[i % len(names)].split(" ")
+            k = i // len(names)
+            middle = initials[k % 26] + (str(k // 26) if k >= 26 else "")
+            out.append(f"{first} {middle}. {last}")
+        return out
+
+    def _noise_block(self) -> str:
+        """Markup bez tekstu w obrębie rosteru (nie zmienia wyniku parserów)."""
+        if not self._maybe(self.noise):
+            return ""
+        return self.rng.choice((
+            '<div class="ad-slot" data-slot="roster-inline"></div>',
+            f'<div class="sidearm-icons">{ICON}{ICON}</div>',
+            '<div class="spacer"><span></span><span></span></div>',
+            '<img src="/images/pixel.gif" alt="">',
+        ))
+
+    def _trailing_noise(self) -> str:
+        """Szum z tekstem – tylko po linku 'Full Bio', gdzie parser go ignoruje."""
+        if not self._maybe(self.noise):
+            return ""
+        return self.rng.choice((
+            "<!-- sidearm: player card end -->",
+            '<script>window.__cards=(window.__cards||0)+1;</script>',
+            '<span class="visually-hidden">Expand for more info about this player</span>',
+        ))
+
+    def players(self, n: int) -> List[Dict]:
+        players = []
+        for name in self._names(n):
+            players.append({
+                "name": name,
+                "jersey": str(self.rng.randint(0, 99)),
+                "position": self.rng.choice(POSITIONS),
+                "class_year": self.rng.choice(CLASS_YEARS),
+                "feet": self.rng.randint(5, 6),
+                "inches": self.rng.randint(0, 11),
+                "weight": self.rng.randint(160, 260),
+                "bats_throws": "" if self._maybe(self.missing) else self.rng.choice(BATS_THROWS),
+                "hometown": "" if self._maybe(self.missing / 2) else self.rng.choice(HOMETOWNS),
+                "school": "" if self._maybe(self.missing) else self.rng.choice(SCHOOLS),
+                "no_size": self._maybe(self.missing),   # view=2: puste Ht./Wt.
+            })
+        return players
+
+    # --- roster: lista 'Jersey Number' -----------------------------------
+
+    def roster_list_page(self, n: int) -> Tuple[str, List[Dict]]:
+        parts = [PAGE_HEAD.format(title="Baseball Roster", token=self.rng.getrandbits(32)),
+                 '<section class="sidearm-roster"><h2>Baseball Roster</h2>\n'
+                 '<ul class="sidearm-roster-players">\n']
+        expected = []
+        for p in self.players(n):
+            name = html_lib.escape(p["name"])
+            href = f'/sports/baseball/roster/{p["name"].lower().replace(" ", "-").replace(".", "")}/{len(expected) + 1000}'
+            height = f"{p['feet']}' {p['inches']}''"
+            parts.append('<li class="sidearm-roster-player"><div class="sidearm-roster-player-container">\n')
+            parts.append(self._noise_block())
+            parts.append(f'<div class="sidearm-roster-player-jersey"><a href="{href}">'
+                         f'<span class="sr-only">Jersey Number</span> {p["jersey"]}</a></div>\n')
+            parts.append(f'<div class="sidearm-roster-player-name"><h3><a href="{href}">{name}</a></h3></div>\n')
+            parts.append(self._noise_block())
+            parts.append('<div class="sidearm-roster-player-position">'
+                         f'<span class="sr-only">Position</span> <span>{p["position"]}</span> '
+                         f'<span class="sr-only">Academic Year</span> <span>{p["class_year"]}</span>'
+                         f'<span class="sr-only">Height</span> <span>{html_lib.escape(height)}</span> '
+                         f'<span class="sr-only">Weight</span> <span>{p["weight"]} lbs</span> ')
+            if p["bats_throws"]:
+                parts.append(f'<span class="sr-only">Custom Field 1</span> <span>{p["bats_throws"]}</span>')
+            parts.append('</div>\n')
+            if p["hometown"]:
+                parts.append(f'<div class="sidearm-roster-player-other"><span class="sr-only">Hometown</span> '
+                             f'<span>{html_lib.escape(p["hometown"])}</span> ')
+                if p["school"]:
+                    parts.append(f'<span class="sr-only">Last School</span> <span>{html_lib.escape(p["school"])}</span>')
+                parts.append('</div>\n')
+            parts.append(f'<div class="sidearm-roster-player-links"><a href="{href}">Full Bio for {name}</a></div>\n')
+            parts.append(self._trailing_noise())
+            parts.append('</div></li>\n')
+            expected.append({
+                "full_name": p["name"],
+                "jersey": p["jersey"],
+                "position": p["position"],
+                "class_year": p["class_year"].rstrip("."),
+                "height": height,
+                "weight": f"{p['weight']} lbs",
+                "hometown": p["hometown"],
+                "last_school": p["school"] if p["hometown"] else "",
+                "bats_throws": p["bats_throws"],
+            })
+        parts.append('</ul></section>\n<section class="sidearm-roster-coaches"><h2>Coaching Staff</h2>\n'
+                     '<ul><li><a href="/sports/baseball/roster/coaches/ben-smith/101">Ben Smith</a> Head Coach</li></ul>'
+                     '</section>\n')
+        parts.append(PAGE_FOOT)
+        return "".join(parts), _dedupe(expected)
+
+    # --- roster: tabela view=2 ---------------------------------------------
+
+    def roster_view2_page(self, n: int) -> Tuple[str, List[Dict]]:
+        split_columns = self._maybe(0.5)
+        parts = [PAGE_HEAD.format(title="Baseball Roster", token=self.rng.getrandbits(32))]
+        if self._maybe(self.noise):
+            parts.append('<table class="sidearm-table schedule"><thead><tr><th>Date</th><th>Opponent</th>'
+                         '<th>Result</th></tr></thead><tbody><tr><td>Feb 14</td><td>vs. Rice</td>'
+                         '<td>W 5-3</td></tr></tbody></table>\n')
+        if split_columns:
+            header = ("No.", "Name", "Position", "Height", "Weight", "Class", "Bats/Throws",
+                      "Hometown", "Previous School")
+        else:
+            header = ("#", "Name", "Pos.", "Ht.", "Wt.", "Yr.", "B/T", "Hometown / High School")
+        parts.append('<table class="sidearm-table roster"><caption>Baseball Roster</caption><thead><tr>'
+                     + "".join(f"<th>{h}</th>" for h in header) + "</tr></thead><tbody>\n")
+        expected = []
+        for p in self.players(n):
+            href = f'/sports/baseball/roster/{len(expected) + 2000}'
+            height = "" if p["no_size"] else f"{p['feet']}-{p['inches']}"
+            weight = "" if p["no_size"] else str(p["weight"])
+            cells = [p["jersey"], f'<a href="{href}">{html_lib.escape(p["name"])}</a>', p["position"],
+                     height, weight, p["class_year"], p["bats_throws"]]
+            if split_columns:
+                cells += [html_lib.escape(p["hometown"]), html_lib.escape(p["school"])]
+                hometown, school = p["hometown"], p["school"]
+            else:
+                combined = " / ".join(x for x in (p["hometown"], p["school"]) if x)
+                cells.append(html_lib.escape(combined))
+                hometown, school = _split_combined(p["hometown"], p["school"])
+            row = "".join(f"<td>{c}</td>" for c in cells)
+            if self._maybe(self.noise):
+                row = row.replace("</td>", f"{ICON}</td>", 1)
+            parts.append(f"<tr>{row}</tr>\n")
+            expected.append({
+                "full_name": p["name"],
+                "jersey": p["jersey"],
+                "position": p["position"],
+                "class_year": p["class_year"],
+                "height": height,
+                "weight": f"{weight} lbs" if weight else "",
+                "hometown": hometown,
+                "last_school": school,
+                "bats_throws": p["bats_throws"],
+            })
+        parts.append("</tbody></table>\n")
+        parts.append(PAGE_FOOT)
+        return "".join(parts), _dedupe(expected)
+
+    # --- staff ---------------------------------------------------------------
+
+    def staff_members(self, n: int) -> List[Dict]:
+        members = []
+        for i, name in enumerate(self._names(n)):
+            title, is_coach = STAFF_TITLES[i % len(STAFF_TITLES)] if i < len(STAFF_TITLES) \
+                else self.rng.choice(STAFF_TITLES)
+            members.append({
+                "name": name,
+                "title": title,
+                "coach": is_coach,
+                "email": "" if self._maybe(self.missing) else
+                         name.lower().replace(". ", ".").replace(" ", ".") + "@athletics.example.edu",
+                "phone": "" if self._maybe(self.missing) else
+                         f"({self.rng.randint(200, 989)}) {self.rng.randint(200, 999)}-{self.rng.randint(1000, 9999)}",
+                "tel_link": self._maybe(0.5),
+            })
+        return members
+
+    def staff_page(self, n: int, cards: bool = False) -> Tuple[str, Dict]:
+        members = self.staff_members(n)
+        parts = [PAGE_HEAD.format(title="Baseball Coaches", token=self.rng.getrandbits(32))]
+        if cards:
+            parts.append('<div class="sidearm-coaches"><h2>Coaching Staff</h2>\n')
+            for i, m in enumerate(members):
+                name = html_lib.escape(m["name"])
+                # nazwisko i tytuł muszą być sąsiadami (parse_staff_generic_block)
+                parts.append(f'<div class="sidearm-coach-card"><p class="name"><a href="/sports/baseball/coaches/'
+                             f'{i + 100}">{name}</a></p><p class="title">{m["title"]}</p>')
+                if m["email"]:
+                    parts.append(f'<a href="mailto:{m["email"]}">{m["email"]}</a>')
+                parts.append(self._noise_block())
+                parts.append("</div>\n")
+            parts.append("</div>\n")
+        else:
+            parts.append('<h2>Baseball Coaching Staff</h2>\n<table class="sidearm-table"><thead><tr>'
+                         "<th>Name</th><th>Title</th><th>Phone</th><th>Email</th></tr></thead><tbody>\n")
+            for i, m in enumerate(members):
+                name = html_lib.escape(m["name"])
+                if not m["phone"]:
+                    phone = ""
+                elif m["tel_link"]:
+                    phone = f'<a href="tel:{m["phone"]}">{m["phone"]}</a>'
+                else:
+                    phone = m["phone"]
+                email = f'<a href="mailto:{m["email"]}?subject=Baseball">Email</a>' if m["email"] else ""
+                parts.append(f'<tr><td><a href="/staff-directory/{i + 100}">{name}</a></td><td>{m["title"]}</td>'
+                             f"<td>{phone}</td><td>{email}</td></tr>\n")
+            parts.append("</tbody></table>\n")
+        parts.append(PAGE_FOOT)
+
+        expected: Dict[str, List[Dict]] = {"coaches": [], "support": []}
+        for m in members:
+            expected["coaches" if m["coach"] else "support"].append({
+                "fullName": m["name"],
+                "role": m["title"],
+                "email": m["email"],
+                # karty nie mają wierszy <tr>, więc parser nie szuka tam telefonu
+                "phone": "" if cards else m["phone"],
+            })
+        return "".join(parts), expected
+
+    def page(self, layout: str, n: int):
+        if layout == "roster-list":
+            return self.roster_list_page(n)
+        if layout == "roster-view2":
+            return self.roster_view2_page(n)
+        return self.staff_page(n, cards=layout == "staff-cards")
+
+
+def _split_combined(hometown: str, school: str) -> Tuple[str, str]:
+    """Jak parse_home_and_school dla kolumny 'Hometown / High School'."""
+    if hometown and school:
+        return hometown, school
+    text = hometown or school
+    city, _, tail = text.partition(",")
+    tokens = tail.split()
+    for i, tok in enumerate(tokens):
+        if tok.endswith("."):
+            return f"{city.strip()}, {' '.join(tokens[:i + 1])}", " ".join(tokens[i + 1:])
+    return text, ""
+
+
+def _dedupe(players: List[Dict]) -> List[Dict]:
+    """Parsery zostawiają pierwszy rekord dla każdej pary (imię, numer)."""
+    seen = set()
+    out = []
+    for p in players:
+        key = (p["full_name"], p["jersey"])
+        if key not in seen:
+            seen.add(key)
+            out.append(p)
+    return out
+
+
+def write_page(out_dir: str, layout: str, name: str, page: str, expected) -> str:
+    path = os.path.join(out_dir, PARSER_DIRS[layout], f"{name}.html")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(page)
+    with open(os.path.splitext(path)[0] + ".json", "w", encoding="utf-8") as f:
+        json.dump(expected, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Sidearm pages with expected parser output.")
+    parser.add_argument("--out", required=True, help="output directory (fixtures layout)")
+    parser.add_argument("--layout", choices=LAYOUTS, action="append",
+                        help="layouts to generate (default: all, can be repeated)")
+    parser.add_argument("--players", type=int, default=40, help="players per roster page")
+    parser.add_argument("--staff", type=int, default=10, help="people per staff page")
+    parser.add_argument("--pages", type=int, default=1, help="pages per layout")
+    parser.add_argument("--noise", type=float, default=0.3, help="probability of noise markup per element")
+    parser.add_argument("--missing", type=float, default=0.2, help="probability of a missing field")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    synth = Synth(seed=args.seed, noise=args.noise, missing=args.missing)
+    for layout in args.layout or LAYOUTS:
+        n = args.staff if layout.startswith("staff") else args.players
+        for i in range(args.pages):
+            page, expected = synth.page(layout, n)
+            path = write_page(args.out, layout, f"synth-{layout}-{n}-{i + 1}", page, expected)
+            print(f"{path} ({len(page) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,23 @@
+import argparse
 import json
 import os
 import re
-
-INPUT_PATH = "all_schools_ontology.json"
+import sys
+import time
+from functools import lru_cache
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from metrics import MetricsRecorder, add_metrics_arguments, metrics_options, METRICS_DIR  # noqa: E402
+from ndjson import JsonArrayWriter, iter_records  # noqa: E402
+import profiling  # noqa: E402
+from profiling import start_profiling, add_profile_arguments, profile_options  # noqa: E402
+from incremental import (CleanManifest, MANIFEST_PATH, WORKERS, code_version,  # noqa: E402
+                         run_cleaning, add_incremental_arguments, incremental_options)
+
+INPUT_PATH = "all_schools_ontology.jsonl"  # NDJSON ze scraperów (stary format – tablica JSON – też przejdzie)
 OUTPUT_PATH = "all_schools_ontology_clean.json"
 PER_SCHOOL_DIR = "clean_schools"  # opcjonalnie: osobne pliki per uczelnia
+NORMALIZE_CACHE_SIZE = 16384      # różnych surowych wartości na pole (LRU)
 
 
 def normalize_height(h: str) -> str:
@@ -156,52 +169,135 @@ def clean_player(player: dict) -> dict:
     return player
 
 
+# ---------- KOLUMNOWO, Z CACHE ----------
+# Te same funkcje co wyżej, ale każda różna surowa wartość ("6' 2''", "Fr.",
+# "R-So.") jest normalizowana raz na przebieg; typed=True, żeby 1 / 1.0 / True
+# nie dzieliły wyniku.
 
-def main():
-    if not os.path.exists(INPUT_PATH):
-        raise FileNotFoundError(f"Nie znalazłam pliku {INPUT_PATH}")
-
-    with open(INPUT_PATH, "r", encoding="utf-8") as f:
-        all_schools = json.load(f)
-
-    # upewnij się, że mamy listę szkół
-    if not isinstance(all_schools, list):
-        raise ValueError("Oczekiwałam listy szkół w all_schools_ontology.json")
-
-    cleaned = []
+_class_year = lru_cache(maxsize=NORMALIZE_CACHE_SIZE, typed=True)(normalize_class_year)
+_height = lru_cache(maxsize=NORMALIZE_CACHE_SIZE, typed=True)(normalize_height)
+_weight = lru_cache(maxsize=NORMALIZE_CACHE_SIZE, typed=True)(normalize_weight)
 
-    for school in all_schools:
-        school_name = school.get("School", {}).get("name", "UNKNOWN")
-        players = school.get("Players", [])
 
-        new_players = []
-        for p in players:
-            new_players.append(clean_player(p.copy()))
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE, typed=True)
+def _places(pair):
+    return split_hometown_lastschool(*pair)
 
-        school["Players"] = new_players
-        cleaned.append(school)
 
-    # zapis całości
-    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
-        json.dump(cleaned, f, indent=2, ensure_ascii=False)
+def _column(fn, values):
+    try:
+        return [fn(v) for v in values]
+    except TypeError:
+        # niehashowalna wartość (lista/dict w polu) – bez cache, jak clean_player
+        return [fn.__wrapped__(v) for v in values]
 
-    print(f"Zapisano oczyszczone dane do: {OUTPUT_PATH}")
 
-    # opcjonalnie: zapisz osobne pliki per szkoła (w podobnym formacie jak wcześniej)
+def clean_players(players: list) -> list:
+    """
+    To samo co [clean_player(p.copy()) for p in players], ale kolumnami:
+    zbiera każde pole ze wszystkich zawodników, normalizuje je przez cache
+    (koszt rośnie z liczbą różnych wartości, nie wierszy) i rozpisuje wyniki
+    z powrotem. Zmienia dicty zawodników w miejscu – bez kopii.
+    """
+    class_years = _column(_class_year, [p.get("classYear", "") for p in players])
+    heights = _column(_height, [p.get("height", "") for p in players])
+    weights = _column(_weight, [p.get("weight", "") for p in players])
+    places = _column(_places, [(p.get("hometown", ""), p.get("lastSchool", "")) for p in players])
+
+    # kolejność przypisań jak w clean_player – nowe klucze lądują w tym samym miejscu
+    for p, class_year, height, (weight_str, weight_num), (hometown, last_school) in zip(
+            players, class_years, heights, weights, places):
+        p["classYear"] = class_year
+        p["height"] = height
+        p["weight"] = weight_str
+        p["weightLbs"] = weight_num
+        p["hometown"] = hometown
+        p["lastSchool"] = last_school
+    return players
+
+
+def load_records(path, metrics):
+    """Szkoły z pliku zbiorczego, po jednej – czas wczytania każdej to etap "load"."""
+    records = iter_records(path)
+    while True:
+        t0 = time.perf_counter()
+        with profiling.stage("load"):
+            school = next(records, None)
+        if school is None:
+            return
+        metrics.record("load", time.perf_counter() - t0,
+                       school=school.get("School", {}).get("name", "UNKNOWN"),
+                       season=school.get("Season", {}).get("seasonYear"))
+        yield school
+
+
+def team_of(school):
+    """Klucz drużyny w manifeście."""
+    # upewnij się, że mamy obiekt szkoły
+    if not isinstance(school, dict):
+        raise ValueError("Oczekiwałam obiektów szkół w pliku zbiorczym")
+    return school.get("School", {}).get("name", "UNKNOWN"), school.get("Season", {}).get("seasonYear")
+
+
+def clean_school_job(school):
+    """Czyści jedną szkołę (w procesie z puli); zapis robi główny proces."""
+    school_name = school.get("School", {}).get("name", "UNKNOWN")
+    season_year = school.get("Season", {}).get("seasonYear")
+
+    t0 = time.perf_counter()
+    with profiling.stage("clean"):
+        school["Players"] = clean_players(school.get("Players", []))
+    t1 = time.perf_counter()
+    with profiling.stage("serialize"):
+        text = json.dumps(school, indent=2, ensure_ascii=False)
+    t2 = time.perf_counter()
+
+    # osobny plik per szkoła (w podobnym formacie jak wcześniej)
+    name = school["School"]["name"]
+    safe_name = name.replace(" ", "_").replace("/", "_")
+    out_path = os.path.join(
+        PER_SCHOOL_DIR,
+        f"{safe_name.lower()}_baseball_{school['Season']['seasonYear']}_ontology_clean.json"
+    )
+    return {"path": out_path, "text": text, "records": len(school["Players"]),
+            "labels": {"school": school_name, "season": season_year},
+            "timings": {"clean": t1 - t0, "serialize": t2 - t1}}
+
+
+def main(input_path=INPUT_PATH, manifest_path=MANIFEST_PATH, full=False, workers=WORKERS,
+         metrics_dir=METRICS_DIR, profile_dir=""):
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"Nie znalazłam pliku {input_path}")
+
+    metrics = MetricsRecorder("clean_rosters", metrics_dir)
+    profiler = start_profiling("clean_rosters", profile_dir)
+    if profiler is not None:
+        workers = 0  # cProfile nie widzi procesów z puli
     os.makedirs(PER_SCHOOL_DIR, exist_ok=True)
-    for school in cleaned:
-        name = school["School"]["name"]
-        season_year = school["Season"]["seasonYear"]
-        safe_name = name.replace(" ", "_").replace("/", "_")
-        out_path = os.path.join(
-            PER_SCHOOL_DIR,
-            f"{safe_name.lower()}_baseball_{season_year}_ontology_clean.json"
-        )
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(school, f, indent=2, ensure_ascii=False)
+    manifest = CleanManifest("rosters", code_version(os.path.abspath(__file__)), manifest_path, full)
+
+    # strumieniowo: w pamięci jest tylko okno bieżących szkół, plik zbiorczy rośnie po kolei;
+    # drużyny bez zmian (manifest) nie są ani czyszczone, ani zapisywane
+    with JsonArrayWriter(OUTPUT_PATH, keep_unchanged=True) as cleaned:
+        run_cleaning(load_records(input_path, metrics), team_of, clean_school_job,
+                     manifest, cleaned, metrics, workers=workers)
+    manifest.save()
 
+    print(manifest.summary())
+    print(f"Zapisano oczyszczone dane do: {OUTPUT_PATH}" + ("" if cleaned.replaced else " (bez zmian)"))
     print(f"Oczyszczone pliki per szkoła zapisane w katalogu: {PER_SCHOOL_DIR}")
+    metrics.close()
+    if profiler is not None:
+        profiler.close()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Clean the aggregated roster file.")
+    parser.add_argument("--input", default=INPUT_PATH,
+                        help="aggregated roster file (NDJSON, or a legacy JSON array)")
+    add_incremental_arguments(parser)
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser, note="cleans in the main process")
+    args = parser.parse_args()
+    main(input_path=args.input, **incremental_options(args), **metrics_options(args),
+         **profile_options(args))
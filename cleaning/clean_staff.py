@@ -1,10 +1,21 @@
+import argparse
 import json
 import os
 import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from metrics import MetricsRecorder, add_metrics_arguments, metrics_options, METRICS_DIR  # noqa: E402
+from ndjson import JsonArrayWriter, iter_records  # noqa: E402
+import profiling  # noqa: E402
+from profiling import start_profiling, add_profile_arguments, profile_options  # noqa: E402
+from incremental import (CleanManifest, MANIFEST_PATH, WORKERS, code_version,  # noqa: E402
+                         run_cleaning, add_incremental_arguments, incremental_options)
 
 # --- konfiguracja ---
 RAW_DIR = "raw_staff"                     # katalog z plikami *_staff.json
-ALL_FILE = "all_schools_staff.json"       # zbiorczy plik
+ALL_FILE = "all_schools_staff.jsonl"      # zbiorczy plik (NDJSON)
 OUT_DIR = "clean_staff"
 os.makedirs(OUT_DIR, exist_ok=True)
 
@@ -83,8 +94,7 @@ def clean_entry(entry):
 
 
 def load_from_raw_dir():
-    """Przeczytaj wszystkie pliki JSON z raw_staff/ (jeśli tak chcesz)."""
-    all_entries = []
+    """Przeczytaj wszystkie pliki JSON z raw_staff/ (jeśli tak chcesz) – po jednym."""
     for filename in os.listdir(RAW_DIR):
         if not filename.endswith(".json"):
             continue
@@ -94,67 +104,108 @@ def load_from_raw_dir():
 
         # pojedynczy obiekt lub lista
         if isinstance(data, list):
-            entries = data
+            yield from data
         else:
-            entries = [data]
-
-        all_entries.extend(entries)
-    return all_entries
+            yield data
 
 
 def load_from_all_file():
-    """Przeczytaj zbiorczy all_schools_staff.json."""
-    with open(ALL_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    # zakładamy listę
-    return data
+    """Przeczytaj zbiorczy all_schools_staff.jsonl strumieniowo (rekord po rekordzie)."""
+    return iter_records(ALL_FILE)
+
+
+def load_records(entries, metrics):
+    """Wpisy po jednym – czas wczytania każdego to etap "load"."""
+    entries = iter(entries)
+    while True:
+        t0 = time.perf_counter()
+        with profiling.stage("load"):
+            entry = next(entries, None)
+        if entry is None:
+            return
+        metrics.record("load", time.perf_counter() - t0,
+                       school=entry.get("School", {}).get("name"),
+                       season=entry.get("Team", {}).get("seasonYear"))
+        yield entry
+
+
+def team_of(entry):
+    """Klucz drużyny w manifeście (surowe, jeszcze nieoczyszczone pola)."""
+    return entry.get("School", {}).get("name"), entry.get("Team", {}).get("seasonYear")
+
+
+def clean_entry_job(entry):
+    """Czyści jeden wpis (w procesie z puli); zapis robi główny proces."""
+    t0 = time.perf_counter()
+    with profiling.stage("clean"):
+        cleaned = clean_entry(entry)
+    t1 = time.perf_counter()
+    with profiling.stage("serialize"):
+        text = json.dumps(cleaned, ensure_ascii=False, indent=2)
+    t2 = time.perf_counter()
+
+    school_obj = cleaned.get("School", {})
+    team_obj = cleaned.get("Team", {})
+
+    school_id = school_obj.get("schoolId", "unknown_school")
+    school_name = school_obj.get("name", school_id)
+    season_year = team_obj.get("seasonYear", "unknown_year")
+
+    # stringowo, żeby łatwo poszło do nazwy pliku
+    season_year_str = str(season_year)
+
+    # taki sam wzór nazwy jak w clean_rosters.py
+    safe_name = school_name.replace(" ", "_").replace("/", "_")
+
+    out_path = os.path.join(
+        OUT_DIR,
+        f"{safe_name.lower()}_baseball_{season_year_str}_staff_clean.json",
+    )
+    return {"path": out_path, "text": text,
+            "records": len(cleaned.get("Coaches", [])) + len(cleaned.get("SupportStaff", [])),
+            "labels": {"school": school_name, "season": season_year},
+            "timings": {"clean": t1 - t0, "serialize": t2 - t1}}
 
 
-def main(use_raw_dir=False):
+def main(use_raw_dir=False, manifest_path=MANIFEST_PATH, full=False, workers=WORKERS,
+         metrics_dir=METRICS_DIR, profile_dir=""):
     """
-    use_raw_dir = False  -> czytaj tylko all_schools_staff.json
+    use_raw_dir = False  -> czytaj tylko all_schools_staff.jsonl
     use_raw_dir = True   -> czytaj wszystkie pliki z raw_staff/
     """
+    metrics = MetricsRecorder("clean_staff", metrics_dir)
+    profiler = start_profiling("clean_staff", profile_dir)
+    if profiler is not None:
+        workers = 0  # cProfile nie widzi procesów z puli
     if use_raw_dir:
         entries = load_from_raw_dir()
     else:
         entries = load_from_all_file()
+    manifest = CleanManifest("staff", code_version(os.path.abspath(__file__)), manifest_path, full)
 
-    cleaned_all = []
-
-    for entry in entries:
-        cleaned = clean_entry(entry)
-        cleaned_all.append(cleaned)
-
-        school_obj = cleaned.get("School", {})
-        team_obj = cleaned.get("Team", {})
-
-        school_id = school_obj.get("schoolId", "unknown_school")
-        school_name = school_obj.get("name", school_id)
-        season_year = team_obj.get("seasonYear", "unknown_year")
-
-        # stringowo, żeby łatwo poszło do nazwy pliku
-        season_year_str = str(season_year)
-
-        # taki sam wzór nazwy jak w clean_rosters.py
-        safe_name = school_name.replace(" ", "_").replace("/", "_")
-
-        out_path = os.path.join(
-            OUT_DIR,
-            f"{safe_name.lower()}_baseball_{season_year_str}_staff_clean.json",
-        )
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(cleaned, f, ensure_ascii=False, indent=2)
-
-    # zbiorczy, oczyszczony JSON
+    # strumieniowo: w pamięci jest tylko okno bieżących wpisów, plik zbiorczy rośnie po kolei;
+    # drużyny bez zmian (manifest) nie są ani czyszczone, ani zapisywane
     out_all = "all_schools_staff_clean.json"
-    with open(out_all, "w", encoding="utf-8") as f:
-        json.dump(cleaned_all, f, ensure_ascii=False, indent=2)
+    with JsonArrayWriter(out_all, keep_unchanged=True) as cleaned_all:
+        run_cleaning(load_records(entries, metrics), team_of, clean_entry_job,
+                     manifest, cleaned_all, metrics, workers=workers)
+    manifest.save()
 
-    print(f"Zapisano {len(cleaned_all)} szkół do katalogu {OUT_DIR}/")
-    print(f"Zbiorczy plik: {out_all}")
+    print(manifest.summary())
+    print(f"Zapisano {cleaned_all.count} szkół do katalogu {OUT_DIR}/")
+    print(f"Zbiorczy plik: {out_all}" + ("" if cleaned_all.replaced else " (bez zmian)"))
+    metrics.close()
+    if profiler is not None:
+        profiler.close()
 
 
 if __name__ == "__main__":
-    # jeśli chcesz czytać z katalogu raw_staff, zmień na True
-    main(use_raw_dir=False)
+    parser = argparse.ArgumentParser(description="Clean the aggregated staff file.")
+    parser.add_argument("--raw-dir", action="store_true",
+                        help=f"read every file in {RAW_DIR}/ instead of {ALL_FILE}")
+    add_incremental_arguments(parser)
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser, note="cleans in the main process")
+    args = parser.parse_args()
+    main(use_raw_dir=args.raw_dir, **incremental_options(args), **metrics_options(args),
+         **profile_options(args))
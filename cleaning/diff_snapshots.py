@@ -0,0 +1,256 @@
+# diff_snapshots.py
+"""
+Zmiany między kolejnymi przebiegami (change data capture): porównuje nowy,
+oczyszczony snapshot z poprzednim i zapisuje tylko różnice – dodane, zmienione
+i usunięte encje – osobno dla każdego typu:
+
+    teams           teamId         teamName, schoolId, schoolName, conference, seasonYear
+    players         playerId       pola zawodnika z *_ontology_clean.json + teamId
+    coaches         coachId        pola trenera z *_staff_clean.json + teamId
+    support_staff   staffId        pola osoby ze staffu + teamId
+
+Poprzedni snapshot to katalog snapshot_state/ (albo --state-dir) z plikami
+<typ>.jsonl: {"key", "hash", "row"} dla każdej encji z ostatniego przebiegu.
+Porównanie idzie po kluczu i hashu wiersza – słownik klucz -> (hash, wiersz)
+ze starego stanu, jeden przebieg strumieniowy po nowym snapshocie – więc czas
+jest liniowy, a pola porównujemy tylko tam, gdzie hash się różni. Stabilne
+id z entity_ids.py sprawiają, że dopisany zawodnik to jeden "add", a nie
+przenumerowana drużyna.
+
+Wynik w deltas/<run_id>/ (NDJSON, jeden plik na typ, także pusty):
+
+    {"op": "add",    "key": ..., "row": {...}}
+    {"op": "update", "key": ..., "row": {...}, "changed": {"position": ["C", "1B"]}}
+    {"op": "remove", "key": ..., "row": {...ostatnia znana wersja...}}
+
+plus summary.json z licznikami. Na końcu stan jest podmieniany na nowy
+snapshot (--dry-run zostawia stary). Pierwszy przebieg – bez stanu – daje same
+"add".
+
+Drużyna, której nie ma w nowym snapshocie (np. przebieg tylko dla części
+szkół, --shard, albo nieudany scrape), nie jest usuwana – jej encje
+przechodzą do nowego stanu bez zmian. Liczy się to osobno dla każdego pliku:
+drużyna obecna w rosterach, ale nie w staffie, zachowuje swoich trenerów
+i staff (i odwrotnie – zawodników). --drop-missing-teams traktuje brakującą
+drużynę jak usuniętą.
+
+Użycie:
+    python cleaning/diff_snapshots.py
+    python cleaning/diff_snapshots.py --dry-run --out /tmp/deltas
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+from typing import Dict, Iterator, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from metrics import MetricsRecorder, add_metrics_arguments, metrics_options, METRICS_DIR  # noqa: E402
+from ndjson import HAS_ORJSON, NdjsonWriter, iter_records  # noqa: E402
+import profiling  # noqa: E402
+from profiling import start_profiling, add_profile_arguments, profile_options  # noqa: E402
+
+if HAS_ORJSON:
+    import orjson
+
+ROSTERS_PATH = "all_schools_ontology_clean.json"
+STAFF_PATH = "all_schools_staff_clean.json"
+STATE_DIR = "snapshot_state"
+DELTAS_DIR = "deltas"
+
+# typ encji -> klucz
+ENTITIES = {"teams": "teamId", "players": "playerId", "coaches": "coachId", "support_staff": "staffId"}
+OPS = ("add", "update", "remove")
+# plik wejściowy -> typy encji, które z niego pochodzą
+SOURCES = {"rosters": ("teams", "players"), "staff": ("teams", "coaches", "support_staff")}
+
+
+def row_hash(row: Dict) -> str:
+    """Hash wiersza niezależny od kolejności kluczy."""
+    if HAS_ORJSON:
+        data = orjson.dumps(row, option=orjson.OPT_SORT_KEYS)
+    else:
+        data = json.dumps(row, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def team_row(entry: Dict, conference) -> Dict:
+    team = entry.get("Team", {})
+    school = entry.get("School", {})
+    return {"teamId": team.get("teamId"), "teamName": team.get("teamName"),
+            "schoolId": school.get("schoolId"), "schoolName": school.get("name"),
+            "conference": conference, "seasonYear": team.get("seasonYear")}
+
+
+def roster_rows(entry: Dict) -> Iterator[Tuple[str, Dict]]:
+    team_id = entry.get("Team", {}).get("teamId")
+    yield "teams", team_row(entry, entry.get("Conference", {}).get("conferenceName"))
+    for p in entry.get("Players", []):
+        yield "players", dict(p, teamId=team_id)
+
+
+def staff_rows(entry: Dict) -> Iterator[Tuple[str, Dict]]:
+    team_id = entry.get("Team", {}).get("teamId")
+    yield "teams", team_row(entry, entry.get("School", {}).get("conference"))
+    for kind, items in (("coaches", entry.get("Coaches", [])),
+                        ("support_staff", entry.get("SupportStaff", []))):
+        for person in items:
+            yield kind, dict(person, teamId=team_id)
+
+
+def load_state(state_dir: str, kind: str) -> Dict[str, Tuple[str, Dict]]:
+    path = os.path.join(state_dir, f"{kind}.jsonl")
+    if not os.path.exists(path):
+        return {}
+    return {item["key"]: (item["hash"], item["row"]) for item in iter_records(path)}
+
+
+def changed_fields(old: Dict, new: Dict) -> Dict[str, List]:
+    return {k: [old.get(k), new.get(k)] for k in {**old, **new} if old.get(k) != new.get(k)}
+
+
+class SnapshotDiff:
+    """Strumieniowe porównanie nowego snapshotu ze stanem z poprzedniego przebiegu."""
+
+    def __init__(self, state_dir: str, out_dir: str, write_state: bool = True):
+        self.state_dir = state_dir
+        self.write_state = write_state
+        self.old = {kind: load_state(state_dir, kind) for kind in ENTITIES}
+        self.seen: Dict[str, set] = {kind: set() for kind in ENTITIES}
+        # drużyny widziane w każdym pliku osobno – brak w jednym nie usuwa encji z drugiego
+        self.teams_seen: Dict[str, set] = {source: set() for source in SOURCES}
+        self.loaded: set = set()    # pliki, które wczytano w tym przebiegu
+        self.counts: Counter = Counter()
+        self.deltas = {kind: NdjsonWriter(os.path.join(out_dir, f"{kind}.jsonl")) for kind in ENTITIES}
+        self.state = {}
+        if write_state:
+            os.makedirs(state_dir, exist_ok=True)
+            self.state = {kind: NdjsonWriter(os.path.join(state_dir, f"{kind}.jsonl")) for kind in ENTITIES}
+
+    def _emit(self, kind: str, op: str, key: str, row: Dict, **extra) -> None:
+        self.deltas[kind].write({"op": op, "key": key, "row": row, **extra})
+        self.counts[kind, op] += 1
+
+    def _keep(self, kind: str, key: str, digest: str, row: Dict) -> None:
+        if self.write_state:
+            self.state[kind].write({"key": key, "hash": digest, "row": row})
+
+    def add(self, source: str, kind: str, row: Dict) -> None:
+        key = row.get(ENTITIES[kind])
+        if kind == "teams" and key is not None:
+            self.teams_seen[source].add(key)
+        if key is None or key in self.seen[kind]:
+            return   # drużyna jest i w rosterach, i w staffie – liczy się pierwsze wystąpienie
+        self.seen[kind].add(key)
+        digest = row_hash(row)
+        previous = self.old[kind].get(key)
+        if previous is None:
+            self._emit(kind, "add", key, row)
+        elif previous[0] != digest:
+            self._emit(kind, "update", key, row, changed=changed_fields(previous[1], row))
+        else:
+            self.counts[kind, "unchanged"] += 1
+        self._keep(kind, key, digest, row)
+
+    def _team_present(self, kind: str, team_id) -> bool:
+        """Czy drużyna jest w którymś z wczytanych plików, z których pochodzi ten typ."""
+        return any(team_id in self.teams_seen[source] for source in self.loaded
+                   if kind in SOURCES[source])
+
+    def finish(self, drop_missing_teams: bool = False) -> None:
+        """
+        Usunięte encje. Typy bez wczytanego pliku i encje drużyn, których nie ma
+        w ich pliku źródłowym, przechodzą do stanu bez zmian (te drugie – chyba
+        że drop_missing_teams).
+        """
+        for kind in ENTITIES:
+            covered = any(kind in SOURCES[source] for source in self.loaded)
+            for key, (digest, row) in self.old[kind].items():
+                if key in self.seen[kind]:
+                    continue
+                team_id = key if kind == "teams" else row.get("teamId")
+                if not covered or (not drop_missing_teams and not self._team_present(kind, team_id)):
+                    self.counts[kind, "carried"] += 1
+                    self._keep(kind, key, digest, row)
+                else:
+                    self._emit(kind, "remove", key, row)
+        for writer in (*self.deltas.values(), *self.state.values()):
+            writer.close()
+
+    def abort(self) -> None:
+        for writer in (*self.deltas.values(), *self.state.values()):
+            writer.abort()
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        return {kind: {op: self.counts[kind, op] for op in OPS + ("unchanged", "carried")}
+                for kind in ENTITIES}
+
+
+def main(rosters_path=ROSTERS_PATH, staff_path=STAFF_PATH, state_dir=STATE_DIR, deltas_dir=DELTAS_DIR,
+         dry_run=False, drop_missing_teams=False, metrics_dir=METRICS_DIR, profile_dir=""):
+    metrics = MetricsRecorder("diff_snapshots", metrics_dir)
+    profiler = start_profiling("diff_snapshots", profile_dir)
+    out_dir = os.path.join(deltas_dir, metrics.run_id)
+
+    t0 = time.perf_counter()
+    with profiling.stage("load"):
+        diff = SnapshotDiff(state_dir, out_dir, write_state=not dry_run)
+    metrics.record("load", time.perf_counter() - t0, records=sum(len(v) for v in diff.old.values()))
+
+    try:
+        for source, path, rows in (("rosters", rosters_path, roster_rows),
+                                   ("staff", staff_path, staff_rows)):
+            if not path:
+                continue
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Nie znalazłam pliku {path}")
+            diff.loaded.add(source)
+            with metrics.stage("diff", nbytes=os.path.getsize(path)) as extra, profiling.stage("diff"):
+                count = 0
+                for entry in iter_records(path):
+                    for kind, row in rows(entry):
+                        diff.add(source, kind, row)
+                    count += 1
+                extra["records"] = count
+        with metrics.stage("write") as extra, profiling.stage("write"):
+            diff.finish(drop_missing_teams)
+            extra["records"] = sum(diff.counts[kind, op] for kind in ENTITIES for op in OPS)
+    except BaseException:
+        diff.abort()
+        raise
+
+    summary = diff.summary()
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump({"run_id": metrics.run_id, "rosters": rosters_path, "staff": staff_path,
+                   "counts": summary}, f, indent=2, ensure_ascii=False)
+
+    for kind, counts in summary.items():
+        print(f"  {kind:<14} +{counts['add']} ~{counts['update']} -{counts['remove']}"
+              f"  (unchanged {counts['unchanged']}"
+              + (f", kept from missing teams {counts['carried']}" if counts["carried"] else "") + ")")
+    print(f"Zapisano zmiany do katalogu {out_dir}/"
+          + (" (dry run – stan bez zmian)" if dry_run else f"; stan: {state_dir}/"))
+    metrics.close()
+    if profiler is not None:
+        profiler.close()
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write add/update/remove deltas against the previous snapshot.")
+    parser.add_argument("--rosters", default=ROSTERS_PATH, help="cleaned roster file ('' to skip)")
+    parser.add_argument("--staff", default=STAFF_PATH, help="cleaned staff file ('' to skip)")
+    parser.add_argument("--state-dir", default=STATE_DIR, help="previous snapshot (key, hash, row per entity)")
+    parser.add_argument("--out", default=DELTAS_DIR, help="deltas go to <out>/<run_id>/")
+    parser.add_argument("--dry-run", action="store_true", help="write deltas but keep the previous state")
+    parser.add_argument("--drop-missing-teams", action="store_true",
+                        help="treat teams absent from the new snapshot as removed")
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    main(rosters_path=args.rosters, staff_path=args.staff, state_dir=args.state_dir,
+         deltas_dir=args.out, dry_run=args.dry_run, drop_missing_teams=args.drop_missing_teams,
+         **metrics_options(args), **profile_options(args))
@@ -0,0 +1,271 @@
+# export_columnar.py
+"""
+Eksport oczyszczonych danych do płaskich, typowanych tabel kolumnowych
+(Parquet i/lub Arrow IPC) – do analiz bez ręcznego spłaszczania JSON-ów.
+
+Wejście: all_schools_ontology_clean.json i all_schools_staff_clean.json
+(tablice JSON z clean_rosters.py / clean_staff.py; NDJSON też przejdzie).
+Wyjście w columnar/ (albo --out), po jednym pliku na tabelę:
+
+    teams          teamId, teamName, schoolId, schoolName, conferenceId, conference, seasonYear
+    players        playerId, teamId, schoolId, seasonYear, fullName, jersey, classYear,
+                   position, batsThrows, height, heightIn, weight, weightLbs,
+                   hometown, lastSchool
+    coaches        coachId, teamId, schoolId, seasonYear, fullName, role, email, phone
+    support_staff  staffId, teamId, schoolId, seasonYear, fullName, role, email, phone
+    relationships  relType, fromId, toId, seasonYear
+                   (HAS_TEAM, MEMBER_OF, PARTICIPATES_IN, PLAYS_FOR z rosterów
+                    + COACHES / WORKS_FOR ze staffu – jak w grafie Neo4j)
+
+Typy: seasonYear/heightIn/weightLbs to liczby całkowite (null, gdy brak),
+a pola kategoryczne (classYear, position, batsThrows, conference, role,
+relType) są kodowane słownikowo.
+
+Formaty:
+  - .parquet – skompresowany (domyślnie zstd), do archiwum i narzędzi typu
+    DuckDB / Spark / pandas,
+  - .arrow   – Arrow IPC bez kompresji; open_table() czyta go przez mmap,
+    bez kopiowania – skan wszystkich sezonów bez ładowania pliku do RAM-u.
+
+Wymaga pyarrow (pip install pyarrow).
+
+Użycie:
+    python cleaning/export_columnar.py                       # parquet + arrow
+    python cleaning/export_columnar.py --format arrow --out /tmp/columnar
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from metrics import MetricsRecorder, add_metrics_arguments, metrics_options, METRICS_DIR  # noqa: E402
+from ndjson import iter_records  # noqa: E402
+import profiling  # noqa: E402
+from profiling import start_profiling, add_profile_arguments, profile_options  # noqa: E402
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+ROSTERS_PATH = "all_schools_ontology_clean.json"
+STAFF_PATH = "all_schools_staff_clean.json"
+OUT_DIR = "columnar"
+FORMATS = ("parquet", "arrow")
+COMPRESSION = "zstd"
+
+HEIGHT_RE = re.compile(r"^(\d+)-(\d+)$")
+
+# tabela -> [(kolumna, typ)]; typ: "str", "int" albo "cat" (słownikowo)
+TABLES: Dict[str, List] = {
+    "teams": [("teamId", "str"), ("teamName", "str"), ("schoolId", "str"),
+              ("schoolName", "str"), ("conferenceId", "str"), ("conference", "cat"),
+              ("seasonYear", "int")],
+    "players": [("playerId", "str"), ("teamId", "str"), ("schoolId", "str"),
+                ("seasonYear", "int"), ("fullName", "str"), ("jersey", "str"),
+                ("classYear", "cat"), ("position", "cat"), ("batsThrows", "cat"),
+                ("height", "str"), ("heightIn", "int"), ("weight", "str"),
+                ("weightLbs", "int"), ("hometown", "str"), ("lastSchool", "str")],
+    "coaches": [("coachId", "str"), ("teamId", "str"), ("schoolId", "str"),
+                ("seasonYear", "int"), ("fullName", "str"), ("role", "cat"),
+                ("email", "str"), ("phone", "str")],
+    "support_staff": [("staffId", "str"), ("teamId", "str"), ("schoolId", "str"),
+                      ("seasonYear", "int"), ("fullName", "str"), ("role", "cat"),
+                      ("email", "str"), ("phone", "str")],
+    "relationships": [("relType", "cat"), ("fromId", "str"), ("toId", "str"),
+                      ("seasonYear", "int")],
+}
+
+
+def height_inches(height) -> Optional[int]:
+    """"6-2" (format z clean_rosters.normalize_height) -> 74; inaczej None."""
+    m = HEIGHT_RE.match(height or "")
+    if not m:
+        return None
+    return int(m.group(1)) * 12 + int(m.group(2))
+
+
+def _int(value) -> Optional[int]:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
+
+
+def _str(value) -> Optional[str]:
+    if value is None:
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+class ColumnarTables:
+    """Zbiera wiersze wszystkich tabel kolumnami (lista na kolumnę)."""
+
+    def __init__(self):
+        self.columns = {name: {col: [] for col, _ in cols} for name, cols in TABLES.items()}
+        self._teams = set()
+
+    def _add(self, table: str, **row) -> None:
+        for col, values in self.columns[table].items():
+            values.append(row.get(col))
+
+    def rows(self, table: str) -> int:
+        return len(next(iter(self.columns[table].values())))
+
+    def _add_team(self, team_id, team_name, school_id, school_name, conference, season) -> None:
+        if team_id in self._teams:
+            return
+        self._teams.add(team_id)
+        self._add("teams", teamId=team_id, teamName=team_name, schoolId=school_id,
+                  schoolName=school_name,
+                  conferenceId=conference.replace(" ", "_") if conference else None,
+                  conference=conference, seasonYear=season)
+
+    def add_roster(self, entry: Dict) -> None:
+        school = entry.get("School", {})
+        team = entry.get("Team", {})
+        conference = entry.get("Conference", {}).get("conferenceName")
+        team_id = team.get("teamId")
+        school_id = school.get("schoolId")
+        season = _int(team.get("seasonYear", entry.get("Season", {}).get("seasonYear")))
+        self._add_team(team_id, team.get("teamName"), school_id, school.get("name"),
+                       conference, season)
+
+        for p in entry.get("Players", []):
+            height = _str(p.get("height"))
+            self._add("players", playerId=p.get("playerId"), teamId=team_id, schoolId=school_id,
+                      seasonYear=season, fullName=p.get("fullName"), jersey=_str(p.get("jersey")),
+                      classYear=p.get("classYear") or None, position=p.get("position") or None,
+                      batsThrows=p.get("batsThrows") or None, height=height,
+                      heightIn=height_inches(height), weight=_str(p.get("weight")),
+                      weightLbs=_int(p.get("weightLbs")), hometown=p.get("hometown"),
+                      lastSchool=p.get("lastSchool"))
+
+        for rel_type, links in entry.get("Relationships", {}).items():
+            for link in links:
+                # {"<od>Id": ..., "<do>Id": ...} – kolejność kluczy jak w scraperze
+                ids = list(link.values())
+                if len(ids) == 2:
+                    self._add("relationships", relType=rel_type, fromId=_str(ids[0]),
+                              toId=_str(ids[1]), seasonYear=season)
+
+    def add_staff(self, entry: Dict) -> None:
+        school = entry.get("School", {})
+        team = entry.get("Team", {})
+        team_id = team.get("teamId")
+        school_id = school.get("schoolId")
+        season = _int(team.get("seasonYear"))
+        self._add_team(team_id, team.get("teamName"), school_id, school.get("name"),
+                       school.get("conference"), season)
+
+        for table, id_key, items, rel_type in (
+                ("coaches", "coachId", entry.get("Coaches", []), "COACHES"),
+                ("support_staff", "staffId", entry.get("SupportStaff", []), "WORKS_FOR")):
+            for person in items:
+                self._add(table, **{id_key: person.get(id_key)}, teamId=team_id, schoolId=school_id,
+                          seasonYear=season, fullName=person.get("fullName"),
+                          role=person.get("role") or None, email=person.get("email"),
+                          phone=person.get("phone"))
+                self._add("relationships", relType=rel_type, fromId=person.get(id_key),
+                          toId=team_id, seasonYear=season)
+
+    def table(self, name: str) -> "pa.Table":
+        arrays = []
+        fields = []
+        for col, kind in TABLES[name]:
+            values = self.columns[name][col]
+            if kind == "int":
+                array = pa.array(values, type=pa.int16())
+            else:
+                array = pa.array(values, type=pa.string())
+                if kind == "cat":
+                    array = array.dictionary_encode()
+            arrays.append(array)
+            fields.append(pa.field(col, array.type))
+        return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def write_table(table: "pa.Table", path: str, fmt: str, compression: str = COMPRESSION) -> int:
+    """Zapisuje tabelę; zwraca rozmiar pliku w bajtach."""
+    tmp_path = path + ".tmp"
+    if fmt == "parquet":
+        pq.write_table(table, tmp_path, compression=compression, use_dictionary=True)
+    else:
+        # bez kompresji – tylko taki plik da się czytać przez mmap bez kopiowania
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def open_table(path: str) -> "pa.Table":
+    """Czyta tabelę: .arrow przez mmap (zero-copy), .parquet zwyczajnie."""
+    if path.endswith(".parquet"):
+        return pq.read_table(path, memory_map=True)
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def main(rosters_path=ROSTERS_PATH, staff_path=STAFF_PATH, out_dir=OUT_DIR, formats=FORMATS,
+         compression=COMPRESSION, metrics_dir=METRICS_DIR, profile_dir=""):
+    if not HAS_PYARROW:
+        raise RuntimeError("export_columnar needs the pyarrow package (pip install pyarrow)")
+
+    metrics = MetricsRecorder("export_columnar", metrics_dir)
+    profiler = start_profiling("export_columnar", profile_dir)
+    tables = ColumnarTables()
+
+    for path, add in ((rosters_path, tables.add_roster), (staff_path, tables.add_staff)):
+        if not path:
+            continue
+        if not os.path.exists(path):
+            print(f"  [WARN] missing {path}, skipped")
+            continue
+        with metrics.stage("load", nbytes=os.path.getsize(path)) as extra, profiling.stage("load"):
+            count = 0
+            for entry in iter_records(path):
+                add(entry)
+                count += 1
+            extra["records"] = count
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name in TABLES:
+        t0 = time.perf_counter()
+        with profiling.stage("build"):
+            table = tables.table(name)
+        metrics.record("build", time.perf_counter() - t0, records=table.num_rows)
+        for fmt in formats:
+            path = os.path.join(out_dir, f"{name}.{fmt}")
+            with metrics.stage("write", records=table.num_rows) as extra, profiling.stage("write"):
+                extra["nbytes"] = write_table(table, path, fmt, compression)
+            print(f"  {path}: {table.num_rows} rows, {os.path.getsize(path) / 1024:.0f} KB")
+
+    print(f"Zapisano tabele kolumnowe do katalogu {out_dir}/")
+    metrics.close()
+    if profiler is not None:
+        profiler.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export cleaned rosters and staff to Parquet / Arrow tables.")
+    parser.add_argument("--rosters", default=ROSTERS_PATH, help="cleaned roster file ('' to skip)")
+    parser.add_argument("--staff", default=STAFF_PATH, help="cleaned staff file ('' to skip)")
+    parser.add_argument("--out", default=OUT_DIR, help="output directory")
+    parser.add_argument("--format", choices=FORMATS + ("both",), default="both",
+                        help="parquet (compressed), arrow (IPC, memory-mappable) or both")
+    parser.add_argument("--compression", default=COMPRESSION,
+                        help="Parquet codec: zstd, snappy, gzip, none")
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    if not HAS_PYARROW:
+        parser.error("export_columnar needs the pyarrow package (pip install pyarrow)")
+    main(rosters_path=args.rosters, staff_path=args.staff, out_dir=args.out,
+         formats=FORMATS if args.format == "both" else (args.format,),
+         compression=args.compression, **metrics_options(args), **profile_options(args))
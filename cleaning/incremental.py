@@ -0,0 +1,235 @@
+# incremental.py
+"""
+Cleaning przyrostowy i równoległy – wspólny dla clean_rosters.py i clean_staff.py.
+
+Manifest (clean_manifest.json) pamięta dla każdej drużyny (cleaner|school|season):
+  - version     – hash kodu cleanera razem z incremental.py i ndjson.py
+                  (zmiana w którymkolwiek = wszystko od nowa),
+  - input_hash  – sha256 rekordu wejściowego (linia NDJSON),
+  - output      – ścieżka pliku per szkoła i output_hash – jego sha256.
+
+Drużyna, której wejście i kod się nie zmieniły, a plik wyjściowy ma zapisany
+hash, nie jest czyszczona ani zapisywana – do pliku zbiorczego idzie treść
+istniejącego pliku. Pozostałe lecą do puli procesów (--workers); wyniki są
+zbierane w kolejności wejścia, z oknem najwyżej max_pending drużyn w locie.
+
+Zapis jest atomowy (plik tymczasowy + os.replace) i tylko wtedy, gdy treść
+faktycznie się zmieniła – mtime niezmienionych plików zostaje, więc loadery
+mogą po nim wykrywać zmiany. To samo dotyczy pliku zbiorczego (keep_unchanged
+w JsonArrayWriter).
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import ndjson
+import profiling
+from ndjson import JsonArrayWriter, dumps_line
+
+MANIFEST_PATH = "clean_manifest.json"
+MANIFEST_VERSION = 1
+WORKERS = os.cpu_count() or 1
+# moduły, od których zależy treść wyjścia każdego cleanera (zapis, serializacja)
+SHARED_SOURCES = (os.path.abspath(__file__), os.path.abspath(ndjson.__file__))
+
+
+def code_version(*paths: str) -> str:
+    """Hash źródeł cleanera i SHARED_SOURCES – każda zmiana kodu unieważnia manifest."""
+    sha = hashlib.sha256()
+    for path in paths + SHARED_SOURCES:
+        with open(path, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()[:16]
+
+
+def record_hash(record: Dict) -> str:
+    return hashlib.sha256(dumps_line(record)).hexdigest()
+
+
+def write_if_changed(path: str, text: str) -> bool:
+    """Zapis atomowy; False (bez zapisu), gdy plik ma już dokładnie tę treść."""
+    data = text.encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(path) + ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return True
+
+
+class CleanManifest:
+    """
+    Manifest z poprzednich przebiegów. path="" wyłącza tryb przyrostowy;
+    full=True czyści wszystko od nowa, ale manifest i tak jest aktualizowany.
+    """
+
+    def __init__(self, cleaner: str, version: str, path: str = MANIFEST_PATH, full: bool = False):
+        self.cleaner = cleaner
+        self.version = version
+        self.path = path
+        self.full = full
+        self.changes: Counter = Counter()
+        self._entries = self._load()
+        self._updated: Dict[str, Dict] = {}
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("teams", {})
+
+    def key(self, school, season) -> str:
+        return f"{self.cleaner}|{school}|{season}"
+
+    def check(self, key: str, input_hash: str) -> Optional[str]:
+        """Treść pliku wyjściowego z poprzedniego przebiegu albo None (trzeba czyścić)."""
+        entry = self._entries.get(key)
+        if (not self.path or self.full or entry is None or entry.get("version") != self.version
+                or entry.get("input_hash") != input_hash):
+            return None
+        try:
+            with open(entry["output"], "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if hashlib.sha256(data).hexdigest() != entry.get("output_hash"):
+            return None
+        self.changes["unchanged"] += 1
+        self._updated[key] = entry
+        return data.decode("utf-8")
+
+    def done(self, key: str, input_hash: str, out_path: str, text: str, written: bool) -> None:
+        self.changes["cleaned"] += 1
+        if written:
+            self.changes["written"] += 1
+        if self.path:
+            self._updated[key] = {
+                "version": self.version,
+                "input_hash": input_hash,
+                "output": out_path,
+                "output_hash": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            }
+
+    def save(self) -> None:
+        """Zapis atomowy; wpisy drugiego cleanera z pliku zostają."""
+        if not self.path:
+            return
+        entries = self._load()
+        prefix = self.cleaner + "|"
+        # drużyny, których nie ma już na wejściu, wypadają z manifestu
+        entries = {k: v for k, v in entries.items() if not k.startswith(prefix)}
+        entries.update(self._updated)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".clean_manifest.")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "teams": entries}, f,
+                      indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def summary(self) -> str:
+        c = self.changes
+        return (f"Teams cleaned: {c['cleaned']} (files rewritten: {c['written']}), "
+                f"unchanged (skipped): {c['unchanged']}")
+
+
+def run_cleaning(records: Iterable[Dict],
+                 team_of: Callable[[Dict], Tuple[str, object]],
+                 job: Callable[[Dict], Dict],
+                 manifest: CleanManifest,
+                 aggregate: JsonArrayWriter,
+                 metrics,
+                 workers: int = WORKERS,
+                 max_pending: Optional[int] = None) -> None:
+    """
+    Dla każdego rekordu: pominięcie (manifest) albo job(record) w puli procesów.
+    job zwraca {"path", "text", "labels", "records", "timings"} – text to
+    json.dumps(..., indent=2) pliku per szkoła. Pliki per szkoła i plik
+    zbiorczy są pisane w kolejności wejścia.
+    """
+    window: deque = deque()
+    aggregate_seconds = 0.0
+
+    def emit() -> None:
+        nonlocal aggregate_seconds
+        key, input_hash, result = window.popleft()
+        if isinstance(result, Future):
+            result = result.result()
+        if isinstance(result, str):
+            text = result   # bez zmian – treść istniejącego pliku
+        else:
+            text = result["text"]
+            labels = result["labels"]
+            metrics.record("clean", result["timings"]["clean"], records=result["records"], **labels)
+            metrics.record("serialize", result["timings"]["serialize"], **labels)
+            t0 = time.perf_counter()
+            with profiling.stage("write"):
+                written = write_if_changed(result["path"], text)
+            metrics.record("write", time.perf_counter() - t0,
+                           nbytes=len(text.encode("utf-8")) if written else 0, **labels)
+            manifest.done(key, input_hash, result["path"], text, written)
+        t0 = time.perf_counter()
+        with profiling.stage("write"):
+            aggregate.write_text(text)
+        aggregate_seconds += time.perf_counter() - t0
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    max_pending = max_pending or 2 * max(workers, 1)
+    try:
+        for record in records:
+            key = manifest.key(*team_of(record))
+            input_hash = record_hash(record)
+            kept = manifest.check(key, input_hash)
+            if kept is not None:
+                result = kept
+            elif executor is not None:
+                result = executor.submit(job, record)
+            else:
+                result = job(record)
+            window.append((key, input_hash, result))
+            # wynik z początku okna gotowy albo okno pełne – zapisujemy po kolei
+            while window and (len(window) > max_pending or not isinstance(window[0][2], Future)
+                              or window[0][2].done()):
+                emit()
+        while window:
+            emit()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    # plik zbiorczy: serializacja i zapis przeplatane, liczone razem
+    metrics.record("write", aggregate_seconds, nbytes=aggregate.nbytes, records=aggregate.count)
+
+
+def add_incremental_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--manifest", default=MANIFEST_PATH,
+                        help="per-team input/output hashes from previous runs ('' disables incremental mode)")
+    parser.add_argument("--full", action="store_true",
+                        help="clean every team even if its input and the cleaner did not change")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="cleaning processes (0 = clean in the main process)")
+
+
+def incremental_options(args: argparse.Namespace) -> Dict:
+    return {"manifest_path": args.manifest, "full": args.full, "workers": args.workers}
@@ -0,0 +1,175 @@
+# migrate_ids.py
+"""
+Migracja starych, pozycyjnych identyfikatorów (<teamId>_player_7,
+<teamId>_coach_2, <teamId>_staff_3) na stabilne z entity_ids.py.
+
+Czyta istniejące pliki – NDJSON ze scraperów, tablice *_clean.json, pliki
+per szkoła z raw_*/ i clean_*/ – i dla każdej osoby liczy nowy id z jej pól
+(fullName, jersey). Wynik:
+
+  - id_migration.csv   entity,teamId,oldId,newId (tylko zmienione id) –
+                       do przepięcia węzłów w Neo4j bez przeładowania grafu:
+
+        LOAD CSV WITH HEADERS FROM "file:///id_migration.csv" AS row
+        WITH row WHERE row.entity = "player"
+        MATCH (p:Player {playerId: row.oldId}) SET p.playerId = row.newId
+
+  - z --apply: te same pliki przepisane na miejscu (atomowo, w tym samym
+    formacie), razem z PLAYS_FOR w Relationships. Pliki bez zmian zostają
+    nietknięte; drugi przebieg niczego już nie zmienia.
+
+Mapowanie jest zapisywane przed przepisaniem plików i tylko wtedy, gdy jest
+co migrować – po --apply kolejny przebieg zgłasza "already migrated" i nie
+rusza id_migration.csv (to jedyna kopia starych id). Istniejącego, innego
+mapowania nie nadpisujemy bez --force.
+
+Użycie:
+    python cleaning/migrate_ids.py                 # domyślne pliki i katalogi, tylko mapowanie
+    python cleaning/migrate_ids.py --apply
+    python cleaning/migrate_ids.py clean_schools/ all_schools_ontology_clean.json
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from typing import Dict, Iterator, List, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scraping"))
+from entity_ids import player_ids, staff_ids  # noqa: E402
+from incremental import write_if_changed  # noqa: E402
+from ndjson import JsonArrayWriter, NdjsonWriter, iter_records  # noqa: E402
+
+MAPPING_PATH = "id_migration.csv"
+DEFAULT_PATHS = [
+    "all_schools_ontology.jsonl", "all_schools_staff.jsonl", "raw_schools", "raw_staff",
+    "all_schools_ontology_clean.json", "all_schools_staff_clean.json", "clean_schools", "clean_staff",
+]
+
+# (klucz listy, klucz id, rodzaj w id)
+STAFF_LISTS = (("Coaches", "coachId", "coach"), ("SupportStaff", "staffId", "staff"))
+
+
+def migrate_record(record: Dict) -> List[Tuple[str, str, str, str]]:
+    """Podmienia id w rekordzie (w miejscu); zwraca [(entity, teamId, oldId, newId)]."""
+    team_id = record.get("Team", {}).get("teamId")
+    changes = []
+
+    if "Players" in record:
+        players = record["Players"]
+        renamed = {}
+        for p, new_id in zip(players, player_ids(team_id, players, name_key="fullName")):
+            old_id = p.get("playerId")
+            if old_id != new_id:
+                renamed[old_id] = new_id
+                p["playerId"] = new_id
+                changes.append(("player", team_id, old_id, new_id))
+        for link in record.get("Relationships", {}).get("PLAYS_FOR", []):
+            if link.get("playerId") in renamed:
+                link["playerId"] = renamed[link["playerId"]]
+
+    for list_key, id_key, kind in STAFF_LISTS:
+        people = record.get(list_key, [])
+        for person, new_id in zip(people, staff_ids(team_id, kind, people)):
+            old_id = person.get(id_key)
+            if old_id != new_id:
+                person[id_key] = new_id
+                changes.append((kind, team_id, old_id, new_id))
+    return changes
+
+
+def iter_files(paths: List[str]) -> Iterator[str]:
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith((".json", ".jsonl")):
+                    yield os.path.join(path, name)
+        elif os.path.exists(path):
+            yield path
+
+
+def migrate_file(path: str, apply: bool) -> Tuple[List[Tuple[str, str, str, str]], bool]:
+    """(zmiany, czy plik przepisano). Format pliku zostaje: NDJSON / tablica / jeden obiekt."""
+    if path.endswith(".jsonl"):
+        changes = [c for record in iter_records(path) for c in migrate_record(record)]
+        if not (apply and changes):
+            return changes, False
+        # drugi przebieg strumieniowo – bez trzymania całego pliku w pamięci
+        with NdjsonWriter(path) as writer:
+            for record in iter_records(path):
+                migrate_record(record)
+                writer.write(record)
+        return changes, True
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    records = [data] if isinstance(data, dict) else data
+    changes = [c for record in records for c in migrate_record(record)]
+    if not (apply and changes):
+        return changes, False
+    if isinstance(data, dict):
+        return changes, write_if_changed(path, json.dumps(data, indent=2, ensure_ascii=False))
+    with JsonArrayWriter(path) as writer:
+        for record in data:
+            writer.write(record)
+    return changes, True
+
+
+def read_mapping(path: str) -> List[List[str]]:
+    """Wiersze istniejącego mapowania (bez nagłówka); [] gdy pliku nie ma."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))[1:]
+
+
+def main(paths=None, mapping_path=MAPPING_PATH, apply=False, force=False):
+    mapping: Dict[Tuple[str, str], Tuple[str, str]] = {}
+    conflicts = 0
+    files = list(iter_files(paths or DEFAULT_PATHS))
+
+    # najpierw tylko mapowanie – pliki przepisujemy dopiero, gdy jest zapisane
+    for path in files:
+        changes, _ = migrate_file(path, apply=False)
+        for entity, team_id, old_id, new_id in changes:
+            known = mapping.setdefault((entity, old_id), (team_id, new_id))
+            if known[1] != new_id:
+                conflicts += 1
+                print(f"  [WARN] {old_id}: {known[1]} vs {new_id} in {path}")
+
+    if not mapping:
+        print(f"{len(files)} files checked, all ids already migrated"
+              + (f"; {mapping_path} left as is" if os.path.exists(mapping_path) else ""))
+        return
+
+    rows = [[entity, team_id, old_id, new_id]
+            for (entity, old_id), (team_id, new_id) in mapping.items()]
+    existing = read_mapping(mapping_path)
+    if existing and existing != rows and not force:
+        raise FileExistsError(f"{mapping_path} already holds a different mapping ({len(existing)} ids); "
+                              "move it away or use --force to overwrite it")
+    with open(mapping_path, "w", encoding="utf-8", newline="") as f:
+        out = csv.writer(f)
+        out.writerow(["entity", "teamId", "oldId", "newId"])
+        out.writerows(rows)
+
+    rewritten = sum(migrate_file(path, apply=True)[1] for path in files) if apply else 0
+    print(f"{len(files)} files checked, {len(mapping)} ids to migrate"
+          + (f", {conflicts} conflicting" if conflicts else "")
+          + (f", {rewritten} files rewritten" if apply else " (use --apply to rewrite the files)"))
+    print(f"Mapping: {mapping_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Map positional player/coach/staff ids to stable ones.")
+    parser.add_argument("paths", nargs="*",
+                        help="files or directories to migrate (default: the usual scraper and cleaner outputs)")
+    parser.add_argument("--mapping", default=MAPPING_PATH, help="where to write the old -> new id CSV")
+    parser.add_argument("--apply", action="store_true", help="rewrite the files in place with the new ids")
+    parser.add_argument("--force", action="store_true",
+                        help="overwrite an existing mapping file that holds different ids")
+    args = parser.parse_args()
+    try:
+        main(paths=args.paths, mapping_path=args.mapping, apply=args.apply, force=args.force)
+    except FileExistsError as e:
+        parser.error(str(e))
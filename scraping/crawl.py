@@ -0,0 +1,184 @@
+# crawl.py
+"""
+Jednoprzebiegowy crawl: dla każdego (school, season) z rejestru pobiera
+naraz stronę rosteru i stronę z coachami.
+
+Oba adresy tej samej szkoły są na tym samym hoście, więc lecą przez jedną
+sesję keep-alive (jeden handshake TLS zamiast dwóch osobnych scraperów).
+Wyniki są identyczne jak z scrape_rosters.py + scrape_staff.py; parsowanie
+idzie potokiem w puli procesów (pipeline.py), tak jak w obu scraperach.
+
+Użycie:
+    python scraping/crawl.py [--offline] [--workers N] ...
+"""
+import argparse
+import os
+from collections import Counter
+
+import scrape_rosters
+import scrape_staff
+from fetcher import (HostPool, iter_fetch, add_fetch_arguments, fetch_options, host_of,
+                     MAX_WORKERS, PER_HOST_LIMIT, MIN_HOST_INTERVAL, MAX_RETRIES)
+from resilience import RetryPolicy
+from http_cache import HttpCache, CACHE_DIR
+from html_archive import HtmlArchive, ARCHIVE_DIR
+from registry import SCHOOLS, add_matrix_arguments, matrix_options, shard_path
+from embedded_json import format_tier_summary
+from html_parsing import add_backend_argument, apply_backend_argument
+from metrics import MetricsRecorder, add_metrics_arguments, metrics_options, METRICS_DIR
+from ndjson import NdjsonWriter, OrderedWriter
+from profiling import start_profiling, add_profile_arguments, profile_options
+from pipeline import (run_pipeline, add_pipeline_arguments, pipeline_options,
+                      PARSE_WORKERS, QUEUE_SIZE)
+from scrape_state import (ScrapeState, state_key, add_state_arguments, state_options,
+                          STATE_PATH)
+
+
+def crawl_job(kind: str, cfg, html: str, layout=None):
+    """Zadanie dla puli procesów: parser rosteru (z layoutem z głównego procesu) albo staffu."""
+    if kind == "roster":
+        return scrape_rosters.parse_roster_job(cfg, html, layout)
+    return scrape_staff.parse_staff_job(cfg, html)
+
+
+def main(max_workers=MAX_WORKERS,
+         per_host_limit=PER_HOST_LIMIT,
+         min_interval=MIN_HOST_INTERVAL,
+         cache_dir=CACHE_DIR,
+         offline=False,
+         max_age=0.0,
+         archive_dir=ARCHIVE_DIR,
+         max_retries=MAX_RETRIES,
+         parse_workers=PARSE_WORKERS,
+         queue_size=QUEUE_SIZE,
+         state_path=STATE_PATH,
+         full=False,
+         schools=None,
+         shard=None,
+         metrics_dir=METRICS_DIR,
+         profile_dir=""):
+    schools = SCHOOLS if schools is None else schools
+    metrics = MetricsRecorder("crawl", metrics_dir)
+    profiler = start_profiling("crawl", profile_dir)
+    if profiler is not None:
+        parse_workers = 0  # cProfile nie widzi procesów z puli
+    cache = HttpCache(cache_dir) if cache_dir else None
+    archive = HtmlArchive(archive_dir) if archive_dir else None
+
+    os.makedirs(scrape_rosters.OUTPUT_DIR, exist_ok=True)
+    os.makedirs(scrape_staff.OUTPUT_DIR, exist_ok=True)
+
+    urls = {
+        "roster": [scrape_rosters.roster_page_url(cfg) for cfg in schools],
+        "staff": [scrape_staff.staff_page_url(cfg) for cfg in schools],
+    }
+    finish = {
+        "roster": scrape_rosters.finish_roster_page,
+        "staff": scrape_staff.finish_staff_page,
+    }
+    output_path = {
+        "roster": scrape_rosters.roster_output_path,
+        "staff": scrape_staff.staff_output_path,
+    }
+    state = ScrapeState(shard_path(state_path, shard), full=full)
+    fingerprints = {}
+    tiers = {"roster": Counter(), "staff": Counter()}
+    # pliki zbiorcze rosną w trakcie przebiegu, w kolejności rejestru
+    writers = {
+        "roster": NdjsonWriter(shard_path(scrape_rosters.ALL_SCHOOLS_PATH, shard)),
+        "staff": NdjsonWriter(shard_path(scrape_staff.ALL_STAFF_PATH, shard)),
+    }
+    ordered = {kind: OrderedWriter(writer) for kind, writer in writers.items()}
+
+    # ten sam URL może być i rosterem, i staffem (staff_url puste) – stąd lista
+    keys_by_url = {}
+    for kind, kind_urls in urls.items():
+        for i, url in enumerate(kind_urls):
+            keys_by_url.setdefault(url, []).append((kind, i))
+
+    def on_fetch(url, seconds, nbytes, source):
+        cfg = schools[keys_by_url[url][0][1]]
+        metrics.record("fetch", seconds, school=cfg["school_name"], season=cfg["season_year"],
+                       nbytes=nbytes, host=host_of(url), outcome=source)
+
+    # jedna pula = jedna sesja na host dla obu rodzajów stron
+    pool = HostPool(scrape_rosters.HEADERS,
+                    per_host_limit=per_host_limit,
+                    min_interval=min_interval,
+                    cache=cache,
+                    offline=offline,
+                    max_age=max_age,
+                    retry=RetryPolicy(max_retries),
+                    observer=on_fetch)
+    print(f"Fetching {len(urls['roster'])} roster + {len(urls['staff'])} staff pages "
+          f"(workers={max_workers}, per host={per_host_limit}, "
+          f"parse workers={parse_workers})...")
+
+    def tasks():
+        fetched = iter_fetch(urls["roster"] + urls["staff"],
+                             headers=scrape_rosters.HEADERS,
+                             timeout=25,
+                             max_workers=max_workers,
+                             pool=pool,
+                             queue_size=queue_size)
+        for url, html in fetched:
+            for kind, i in keys_by_url[url]:
+                cfg = schools[i]
+                if isinstance(html, Exception):
+                    finish[kind](cfg, url, html, tiers[kind])
+                    state.done(state_key(cfg, kind), "", "", None)
+                    ordered[kind].put(i)
+                    continue
+                if archive is not None:
+                    archive.record(html, cfg["school_name"], cfg["season_year"], kind, url)
+                kept, fingerprints[kind, i] = state.check(state_key(cfg, kind), html,
+                                                          output_path[kind](cfg))
+                if kept is not None:
+                    print(f"\n=== {cfg['school_name']} ({cfg['season_year']}, {kind}) === "
+                          f"unchanged, kept {output_path[kind](cfg)}")
+                    ordered[kind].put(i, kept)
+                    continue
+                layout = scrape_rosters.roster_layout(cfg, html) if kind == "roster" else None
+                yield (kind, i), (kind, cfg, html, layout)
+
+    def on_result(key, result):
+        kind, i = key
+        cfg = schools[i]
+        page_json = finish[kind](cfg, urls[kind][i], result, tiers[kind], metrics)
+        ordered[kind].put(i, page_json)
+        state.done(state_key(cfg, kind), fingerprints.pop(key),
+                   output_path[kind](cfg), page_json)
+
+    try:
+        with writers["roster"], writers["staff"]:
+            run_pipeline(tasks(), crawl_job, on_result, parse_workers=parse_workers)
+            for buffer in ordered.values():
+                buffer.flush()
+    finally:
+        pool.close()
+
+    state.save()
+    print("\nRosters – " + format_tier_summary(tiers["roster"]))
+    print("Staff – " + format_tier_summary(tiers["staff"]))
+    print(state.summary())
+    for kind in ("roster", "staff"):
+        print(f"\nDone. Wrote {writers[kind].path} ({writers[kind].count} teams)")
+    metrics.close()
+    if profiler is not None:
+        profiler.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl roster and coaches pages for every school in one pass.")
+    add_fetch_arguments(parser)
+    add_pipeline_arguments(parser)
+    add_state_arguments(parser)
+    add_matrix_arguments(parser)
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser, note="parses in the main process")
+    add_backend_argument(parser)
+    args = parser.parse_args()
+    apply_backend_argument(args)
+    main(**fetch_options(args), **pipeline_options(args), **state_options(args),
+         **matrix_options(args), **metrics_options(args),
+         **profile_options(args))
@@ -0,0 +1,240 @@
+# embedded_json.py
+"""
+Szybka ścieżka: dane rosteru / staffu z JSON-a osadzonego w <script>.
+
+Strony Sidearm często mają te same dane co w HTML także jako JSON-LD
+(<script type="application/ld+json">) albo stan aplikacji
+(<script type="application/json">, window.__STATE__ = {...}).
+Wyciągamy je regexem z surowego HTML i parsujemy json.loads – bez budowania
+drzewa BeautifulSoup. Jeśli nic sensownego nie ma, zwracamy None i scraper
+wraca do parserów DOM.
+
+Każdy parser strony raportuje "tier", którym dane zostały wyciągnięte:
+  embedded-json | dom-list | dom-table | dom-staff
+"""
+import json
+import re
+from collections import Counter
+from typing import Dict, Iterator, List, Optional
+
+TIER_EMBEDDED_JSON = "embedded-json"
+TIER_DOM_LIST = "dom-list"
+TIER_DOM_TABLE = "dom-table"
+TIER_DOM_STAFF = "dom-staff"
+
+SCRIPT_RE = re.compile(r"<script\b([^>]*)>(.*?)</script\s*>", re.I | re.S)
+SCRIPT_TYPE_RE = re.compile(r"""type\s*=\s*["']?([^"'\s>]+)""", re.I)
+ASSIGNMENT_RE = re.compile(r"^\s*(?:(?:var|let|const)\s+)?[\w$.\[\]\"']+\s*=\s*([\[{].*[\]}])\s*;?\s*$", re.S)
+BATS_THROWS_RE = re.compile(r"^[LRSB]/[LRSB]$", re.I)
+
+# minimalny odsetek rekordów na liście, które muszą wyglądać na zawodnika/osobę
+MIN_VALID_RATIO = 0.8
+
+NAME_KEYS = ("full_name", "fullName", "name", "displayName", "title_name")
+FIRST_NAME_KEYS = ("firstName", "first_name", "givenName")
+LAST_NAME_KEYS = ("lastName", "last_name", "familyName")
+JERSEY_KEYS = ("jersey", "jerseyNumber", "jersey_number", "uniform", "uniformNumber", "number")
+POSITION_KEYS = ("position", "positionShort", "position_short", "positionLong", "position_long")
+CLASS_YEAR_KEYS = ("academicYear", "academic_year", "academicYearShort", "academic_year_short",
+                   "classYear", "class_year", "eligibility")
+HEIGHT_KEYS = ("height",)
+WEIGHT_KEYS = ("weight",)
+HOMETOWN_KEYS = ("hometown", "homeTown", "home_town")
+LAST_SCHOOL_KEYS = ("previousSchool", "previous_school", "lastSchool", "last_school",
+                    "highSchool", "high_school")
+BATS_THROWS_KEYS = ("batsThrows", "bats_throws", "custom1", "custom_1")
+TITLE_KEYS = ("jobTitle", "title", "role")
+EMAIL_KEYS = ("email", "emailAddress", "email_address")
+PHONE_KEYS = ("telephone", "phone", "phoneNumber", "phone_number")
+
+
+def _norm(s) -> str:
+    if s is None:
+        return ""
+    return " ".join(str(s).split())
+
+
+def iter_script_payloads(html: str) -> Iterator[object]:
+    """Wszystkie dające się sparsować obiekty JSON z tagów <script>."""
+    for m in SCRIPT_RE.finditer(html):
+        attrs, body = m.group(1), m.group(2).strip()
+        if not body:
+            continue
+        type_m = SCRIPT_TYPE_RE.search(attrs)
+        script_type = type_m.group(1).lower() if type_m else ""
+
+        # zwykły JS (analytics, reklamy) pomijamy, chyba że to przypisanie obiektu
+        if script_type not in ("application/ld+json", "application/json"):
+            if script_type and "javascript" not in script_type:
+                continue
+            assign = ASSIGNMENT_RE.match(body)
+            if not assign:
+                continue
+            body = assign.group(1)
+
+        body = body.replace("<!--", "").replace("-->", "").strip()
+        if body.startswith("<![CDATA["):
+            body = body[len("<![CDATA["):]
+            if body.endswith("]]>"):
+                body = body[:-3]
+        try:
+            yield json.loads(body)
+        except ValueError:
+            continue
+
+
+def _iter_lists(obj) -> Iterator[List]:
+    """Rekurencyjnie: każda lista w payloadzie."""
+    stack = [obj]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            stack.extend(cur.values())
+        elif isinstance(cur, list):
+            yield cur
+            stack.extend(cur)
+
+
+def _unwrap(item):
+    # JSON-LD ItemList: {"@type": "ListItem", "item": {...}}
+    if isinstance(item, dict) and isinstance(item.get("item"), dict):
+        return item["item"]
+    return item
+
+
+def _first(record: Dict, keys) -> str:
+    for key in keys:
+        value = record.get(key)
+        if isinstance(value, dict):
+            # np. {"abbreviation": "RHP", "name": "Right-Handed Pitcher"}
+            value = value.get("abbreviation") or value.get("name") or value.get("value")
+        if value not in (None, "", [], {}):
+            return _norm(value)
+    return ""
+
+
+def _record_name(record: Dict) -> str:
+    name = _first(record, NAME_KEYS)
+    if name:
+        return name
+    first = _first(record, FIRST_NAME_KEYS)
+    last = _first(record, LAST_NAME_KEYS)
+    return _norm(f"{first} {last}")
+
+
+def _height(record: Dict) -> str:
+    feet = _first(record, ("heightFeet", "height_feet"))
+    inches = _first(record, ("heightInches", "height_inches"))
+    if feet:
+        return f"{feet}-{inches or 0}"
+    return _first(record, HEIGHT_KEYS)
+
+
+def _bats_throws(record: Dict) -> str:
+    value = _first(record, BATS_THROWS_KEYS)
+    if value and BATS_THROWS_RE.match(value):
+        return value.upper()
+    bats = _first(record, ("bats",))
+    throws = _first(record, ("throws",))
+    if bats and throws:
+        return f"{bats[0]}/{throws[0]}".upper()
+    return ""
+
+
+def _player_from_record(record: Dict) -> Optional[Dict]:
+    name = _record_name(record)
+    jersey = _first(record, JERSEY_KEYS).lstrip("#")
+    if not name or not jersey:
+        return None
+    weight = _first(record, WEIGHT_KEYS)
+    # tak jak w parserze view2: sama liczba -> 'NNN lbs'
+    if weight and weight.isdigit():
+        weight = weight + " lbs"
+    return {
+        "full_name": name,
+        "jersey": jersey,
+        "position": _first(record, POSITION_KEYS),
+        "class_year": _first(record, CLASS_YEAR_KEYS),
+        "height": _height(record),
+        "weight": weight,
+        "hometown": _first(record, HOMETOWN_KEYS),
+        "last_school": _first(record, LAST_SCHOOL_KEYS),
+        "bats_throws": _bats_throws(record),
+    }
+
+
+def _staff_from_record(record: Dict) -> Optional[Dict]:
+    name = _record_name(record)
+    title = _first(record, TITLE_KEYS)
+    if not name or not title:
+        return None
+    email = _first(record, EMAIL_KEYS)
+    if email.lower().startswith("mailto:"):
+        email = email.split(":", 1)[1]
+    phone = _first(record, PHONE_KEYS)
+    if phone.lower().startswith("tel:"):
+        phone = phone.split(":", 1)[1]
+    return {
+        "fullName": name,
+        "role": title,
+        "email": email.split("?", 1)[0].strip(),
+        "phone": phone.strip(),
+    }
+
+
+def _best_list(html: str, convert) -> Optional[List[Dict]]:
+    """Największa lista rekordów, z której `convert` wyciąga poprawne wpisy."""
+    best: Optional[List[Dict]] = None
+    for payload in iter_script_payloads(html):
+        for candidate in _iter_lists(payload):
+            items = [_unwrap(x) for x in candidate]
+            records = [x for x in items if isinstance(x, dict)]
+            if not records or len(records) != len(items):
+                continue
+            converted = [convert(r) for r in records]
+            valid = [c for c in converted if c is not None]
+            if len(valid) < MIN_VALID_RATIO * len(records):
+                continue
+            if best is None or len(valid) > len(best):
+                best = valid
+    return best
+
+
+def extract_roster_from_scripts(html: str) -> Optional[List[Dict]]:
+    """
+    Zawodnicy z osadzonego JSON-a, w formacie parserów DOM
+    (full_name, jersey, position, ...). None = brak payloadu.
+    """
+    players = _best_list(html, _player_from_record)
+    if not players:
+        return None
+    unique = {}
+    for p in players:
+        key = (p["full_name"], p["jersey"])
+        if key not in unique:
+            unique[key] = p
+    return list(unique.values())
+
+
+def extract_staff_from_scripts(html: str) -> Optional[List[Dict]]:
+    """Staff z osadzonego JSON-a: lista dictów fullName/role/email/phone."""
+    staff = _best_list(html, _staff_from_record)
+    if not staff:
+        return None
+    seen = set()
+    unique = []
+    for s in staff:
+        key = (s["fullName"], s["role"])
+        if key not in seen:
+            seen.add(key)
+            unique.append(s)
+    return unique
+
+
+def format_tier_summary(tiers: Counter) -> str:
+    total = sum(tiers.values())
+    if not total:
+        return "Parser tiers: no pages parsed"
+    parts = [f"{tier} {count}/{total} ({100.0 * count / total:.0f}%)"
+             for tier, count in tiers.most_common()]
+    return "Parser tiers: " + ", ".join(parts)
@@ -0,0 +1,71 @@
+# entity_ids.py
+"""
+Stabilne identyfikatory zawodników, trenerów i staffu – wyliczane z treści,
+a nie z pozycji na liście.
+
+Wcześniej playerId = "<teamId>_player_<n>": jeden dopisany albo usunięty
+zawodnik przenumerowywał wszystkich po nim, a MERGE / diff widział prawie
+całą drużynę jako zmienioną. Teraz:
+
+    <teamId>_player_<sha1(fullName, jersey)[:12]>
+    <teamId>_coach_<sha1(fullName)[:12]>
+    <teamId>_staff_<sha1(fullName)[:12]>
+
+teamId niesie szkołę i sezon. Pola tożsamości są normalizowane: małe litery,
+bez akcentów i interpunkcji, pojedyncze spacje, numer bez "#" ("José  Díaz"
+i "jose diaz" to ten sam człowiek). Rola trenera nie wchodzi do
+identyfikatora – awans asystenta to zmiana atrybutu, nie nowa osoba.
+
+Kolizje (ten sam zawodnik dwa razy na stronie, dwie osoby bez nazwiska)
+dostają kolejne przyrostki w kolejności na stronie: <id>, <id>_2, <id>_3...
+
+Stare identyfikatory pozycyjne przenosi cleaning/migrate_ids.py.
+"""
+import hashlib
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List
+
+ID_DIGEST_LENGTH = 12   # znaków hex sha1 – 48 bitów, kolizje w drużynie praktycznie wykluczone
+
+_DROP_RE = re.compile(r"['’.]")        # O'Neil = ONeil, Jr. = Jr
+_NOT_WORD_RE = re.compile(r"[^\w\s]")  # reszta interpunkcji (myślniki, przecinki) = spacja
+
+
+def normalize_identity(value) -> str:
+    """"  José  Díaz Jr. " -> "jose diaz jr"; None -> ""."""
+    if value is None:
+        return ""
+    text = unicodedata.normalize("NFKD", str(value))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _NOT_WORD_RE.sub(" ", _DROP_RE.sub("", text.casefold()))
+    return " ".join(text.split())
+
+
+def entity_id(team_id: str, kind: str, *identity) -> str:
+    key = "|".join(normalize_identity(part) for part in identity)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:ID_DIGEST_LENGTH]
+    return f"{team_id}_{kind}_{digest}"
+
+
+def assign_ids(team_id: str, kind: str, identities: Iterable[tuple]) -> List[str]:
+    """Identyfikatory dla całej listy jednej drużyny, z przyrostkami przy kolizjach."""
+    seen: Counter = Counter()
+    ids = []
+    for identity in identities:
+        base = entity_id(team_id, kind, *identity)
+        seen[base] += 1
+        ids.append(base if seen[base] == 1 else f"{base}_{seen[base]}")
+    return ids
+
+
+def player_ids(team_id: str, players: List[Dict], name_key: str = "full_name",
+               jersey_key: str = "jersey") -> List[str]:
+    return assign_ids(team_id, "player",
+                      ((p.get(name_key, ""), p.get(jersey_key, "")) for p in players))
+
+
+def staff_ids(team_id: str, kind: str, people: List[Dict], name_key: str = "fullName") -> List[str]:
+    """kind: "coach" albo "staff"."""
+    return assign_ids(team_id, kind, ((p.get(name_key, ""),) for p in people))
@@ -0,0 +1,348 @@
+# fetcher.py
+"""
+Współbieżny silnik pobierania stron dla scraperów.
+
+- globalny limit równoległych requestów (rozmiar puli wątków),
+- osobny limit "grzecznościowy" dla każdego hosta (ile naraz + odstęp między requestami),
+- jedna sesja keep-alive (pula połączeń) na domenę,
+- opcjonalny cache na dysku (http_cache.py) z warunkowymi GET-ami i trybem offline,
+- ponowienia z backoffem, adaptacyjny timeout i circuit breaker per host
+  (resilience.py); URL-e hosta z otwartym breakerem idą na koniec przebiegu.
+
+Każdy host dostaje własne "pasy" (lanes) – kolejki URL-i pobieranych po kolei.
+Pasy różnych hostów lecą równolegle, więc czas całego crawla jest zbliżony
+do czasu najwolniejszego hosta, a nie do sumy wszystkich.
+"""
+import argparse
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import profiling
+from http_cache import CacheMiss, HttpCache, CACHE_DIR
+from html_archive import ARCHIVE_DIR
+from resilience import (CircuitBreaker, CircuitOpen, LatencyTracker, RetryPolicy,
+                        parse_retry_after, is_retryable_error,
+                        MAX_RETRIES, RETRY_STATUSES)
+
+MAX_WORKERS = 8          # globalny limit równoległych requestów
+PER_HOST_LIMIT = 1       # ile requestów naraz do jednego hosta
+MIN_HOST_INTERVAL = 1.0  # minimalny odstęp (s) między requestami do tego samego hosta
+
+FetchObserver = Callable[[str, float, int, str], None]
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+class HostPool:
+    """
+    Trzyma po jednej sesji requests.Session na host i pilnuje odstępu
+    między kolejnymi requestami do tego samego hosta. Dla każdego hosta
+    liczy też czasy odpowiedzi (adaptacyjny timeout) i trzyma circuit breaker.
+    """
+
+    def __init__(self, headers: Dict[str, str],
+                 per_host_limit: int = PER_HOST_LIMIT,
+                 min_interval: float = MIN_HOST_INTERVAL,
+                 cache: Optional[HttpCache] = None,
+                 offline: bool = False,
+                 max_age: float = 0.0,
+                 retry: Optional[RetryPolicy] = None,
+                 observer: Optional[FetchObserver] = None):
+        self.headers = dict(headers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.min_interval = max(0.0, min_interval)
+        self.cache = cache
+        self.offline = offline
+        self.max_age = max_age  # ile sekund wpis w cache jest "świeży" bez pytania serwera
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._host_locks: Dict[str, threading.Lock] = {}
+        self._last_request: Dict[str, float] = {}
+        self.retry = retry if retry is not None else RetryPolicy()
+        # observer(url, sekundy, bajty, źródło) po każdym fetch – np. metryki
+        self.observer = observer
+        self._latency: Dict[str, LatencyTracker] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker_for(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(host)
+                self._latency[host] = LatencyTracker()
+            return breaker
+
+    def session_for(self, host: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.headers.update(self.headers)
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=self.per_host_limit)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+                self._host_locks[host] = threading.Lock()
+                self._last_request[host] = 0.0
+            return session
+
+    def _wait_turn(self, host: str) -> None:
+        # odstęp liczymy od startu poprzedniego requestu do tego hosta
+        with self._host_locks[host]:
+            now = time.monotonic()
+            wait = self._last_request[host] + self.min_interval - now
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request[host] = time.monotonic()
+
+    def fetch(self, url: str, timeout: float = 20) -> str:
+        with profiling.stage("fetch"):
+            return self._observed_fetch(url, timeout)
+
+    def _observed_fetch(self, url: str, timeout: float) -> str:
+        if self.observer is None:
+            return self._fetch(url, timeout)[0]
+        started = time.perf_counter()
+        try:
+            text, source = self._fetch(url, timeout)
+        except Exception as e:
+            self.observer(url, time.perf_counter() - started, 0, f"error:{type(e).__name__}")
+            raise
+        self.observer(url, time.perf_counter() - started, len(text.encode("utf-8")), source)
+        return text
+
+    def _fetch(self, url: str, timeout: float) -> Tuple[str, str]:
+        """Zwraca (html, źródło): "cache", "not-modified" (304) albo "network"."""
+        cached = self.cache.get(url) if self.cache is not None else None
+
+        if self.offline:
+            if cached is None:
+                raise CacheMiss(f"not in cache (offline mode): {url}")
+            return cached.text, "cache"
+        if cached is not None and self.max_age and time.time() - cached.fetched_at < self.max_age:
+            return cached.text, "cache"
+
+        host = host_of(url)
+        session = self.session_for(host)
+        breaker = self.breaker_for(host)
+        latency = self._latency[host]
+        extra_headers = cached.conditional_headers() if cached is not None else {}
+
+        attempt = 0
+        while True:
+            breaker.before_request()
+            self._wait_turn(host)
+            started = time.monotonic()
+            retry_after = None
+            try:
+                resp = session.get(url, headers=extra_headers,
+                                   timeout=latency.timeout(timeout, attempt))
+            except Exception as e:
+                if is_retryable_error(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()  # np. zły URL – host tu nic nie zawinił
+                if not is_retryable_error(e) or attempt >= self.retry.max_retries:
+                    raise
+            else:
+                latency.observe(time.monotonic() - started)
+                if resp.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    break
+                breaker.record_failure()
+                if attempt >= self.retry.max_retries:
+                    resp.raise_for_status()
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                if retry_after is not None and retry_after > self.retry.max_retry_after:
+                    # serwer każe czekać długo – nie blokujemy wątku, host idzie na koniec
+                    breaker.trip(retry_after)
+                    raise CircuitOpen(host, breaker.open_until)
+            time.sleep(self.retry.delay(attempt, retry_after))
+            attempt += 1
+
+        if resp.status_code == 304 and cached is not None:
+            # strona się nie zmieniła – bierzemy treść z cache
+            self.cache.touch(cached,
+                             etag=resp.headers.get("ETag", ""),
+                             last_modified=resp.headers.get("Last-Modified", ""))
+            return cached.text, "not-modified"
+
+        resp.raise_for_status()
+        if self.cache is not None:
+            self.cache.put(url, resp.text,
+                           etag=resp.headers.get("ETag", ""),
+                           last_modified=resp.headers.get("Last-Modified", ""))
+        return resp.text, "network"
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+def _split_into_lanes(urls: Iterable[str], per_host_limit: int) -> List[List[str]]:
+    """Grupuje URL-e po hoście i dzieli każdy host na max `per_host_limit` pasów."""
+    by_host: Dict[str, List[str]] = {}
+    for url in urls:
+        by_host.setdefault(host_of(url), []).append(url)
+
+    lanes: List[List[str]] = []
+    for host_urls in by_host.values():
+        n = min(per_host_limit, len(host_urls))
+        for i in range(n):
+            lanes.append(host_urls[i::n])
+    # najdłuższe pasy najpierw, żeby nie czekały na końcu kolejki
+    lanes.sort(key=len, reverse=True)
+    return lanes
+
+
+def iter_fetch(urls: Iterable[str],
+               headers: Dict[str, str],
+               timeout: float = 20,
+               max_workers: int = MAX_WORKERS,
+               per_host_limit: int = PER_HOST_LIMIT,
+               min_interval: float = MIN_HOST_INTERVAL,
+               cache: Optional[HttpCache] = None,
+               offline: bool = False,
+               max_age: float = 0.0,
+               pool: Optional[HostPool] = None,
+               queue_size: int = 0,
+               max_retries: int = MAX_RETRIES,
+               observer: Optional[FetchObserver] = None) -> Iterator[Tuple[str, Union[str, Exception]]]:
+    """
+    Pobiera URL-e współbieżnie i oddaje pary (url, html albo wyjątek)
+    w kolejności, w jakiej się pobrały.
+
+    Wyniki idą przez kolejkę o rozmiarze `queue_size` (0 = bez limitu).
+    Gdy konsument nie nadąża, pełna kolejka wstrzymuje wątki pobierające
+    (backpressure) – w pamięci nie leży więcej niż queue_size stron.
+
+    URL-e hosta z otwartym circuit breakerem nie blokują wątków: odkładamy je
+    i pobieramy w drugiej rundzie, po wszystkich pozostałych (po cooldownie
+    breakera). Jeśli host dalej nie działa, wynikiem jest CircuitOpen.
+    """
+    urls = list(dict.fromkeys(urls))  # bez duplikatów, kolejność zachowana
+    own_pool = pool is None
+    if own_pool:
+        pool = HostPool(headers, per_host_limit=per_host_limit,
+                        min_interval=min_interval, cache=cache,
+                        offline=offline, max_age=max_age,
+                        retry=RetryPolicy(max_retries), observer=observer)
+
+    results: "queue.Queue" = queue.Queue(maxsize=max(0, queue_size))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run_lane(lane: List[str], final: bool) -> List[str]:
+        """Zwraca URL-e odłożone na koniec (otwarty breaker)."""
+        deferred: List[str] = []
+        for i, url in enumerate(lane):
+            if stop.is_set():
+                break
+            if final and i == 0:
+                # jeden request próbny po cooldownie; jeśli padnie, reszta pasa
+                # od razu dostaje CircuitOpen zamiast czekać na kolejne cooldowny
+                pool.breaker_for(host_of(url)).wait_until_closed(stop)
+            try:
+                value: Union[str, Exception] = pool.fetch(url, timeout=timeout)
+            except CircuitOpen as e:
+                if not final:
+                    deferred.append(url)
+                    continue
+                value = e
+            except Exception as e:  # błąd jednego URL-a nie zatrzymuje pasa
+                value = e
+            if not put((url, value)):
+                break
+        return deferred
+
+    def run_rounds() -> None:
+        deferred: List[str] = []
+        for future in [executor.submit(run_lane, lane, False)
+                       for lane in _split_into_lanes(urls, pool.per_host_limit)]:
+            deferred += future.result()
+        if deferred and not stop.is_set():
+            for future in [executor.submit(run_lane, lane, True)
+                           for lane in _split_into_lanes(deferred, pool.per_host_limit)]:
+                future.result()
+
+    # +1 wątek na koordynatora rund
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers) + 1)
+    try:
+        coordinator = executor.submit(run_rounds)
+        received = 0
+        while received < len(urls):
+            try:
+                item = results.get(timeout=0.5)
+            except queue.Empty:
+                # pas padł poza try (np. host_of / breaker) – koordynator ma wyjątek,
+                # a wyników już nie będzie; nie czekamy na nie w nieskończoność
+                if coordinator.done():
+                    coordinator.result()
+                    if results.empty():
+                        raise RuntimeError(f"fetch lanes finished with {len(urls) - received} "
+                                           f"of {len(urls)} results missing")
+                continue
+            received += 1
+            yield item
+        coordinator.result()
+    finally:
+        # konsument mógł przerwać wcześniej – odblokowujemy wątki i sprzątamy
+        stop.set()
+        executor.shutdown(wait=True)
+        if own_pool:
+            pool.close()
+
+
+# --- wspólne opcje CLI dla scraperów ----------------------------------------
+
+def add_fetch_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="global limit of concurrent requests")
+    parser.add_argument("--per-host", type=int, default=PER_HOST_LIMIT,
+                        help="concurrent requests allowed per host")
+    parser.add_argument("--delay", type=float, default=MIN_HOST_INTERVAL,
+                        help="minimum seconds between requests to the same host")
+    parser.add_argument("--cache-dir", default=CACHE_DIR,
+                        help="on-disk HTTP cache directory ('' disables the cache)")
+    parser.add_argument("--offline", action="store_true",
+                        help="serve every page from the cache, never touch the network")
+    parser.add_argument("--max-age", type=float, default=0.0,
+                        help="seconds a cached page is used without revalidation")
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES,
+                        help="retries per page on timeouts, connection errors, 429 and 5xx")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR,
+                        help="content-addressed raw HTML archive ('' disables archiving)")
+
+
+def fetch_options(args: argparse.Namespace) -> Dict:
+    """Zamienia sparsowane opcje z add_fetch_arguments na kwargs dla main()."""
+    return {
+        "max_workers": args.workers,
+        "per_host_limit": args.per_host,
+        "min_interval": args.delay,
+        "cache_dir": args.cache_dir,
+        "offline": args.offline,
+        "max_age": args.max_age,
+        "archive_dir": args.archive_dir,
+        "max_retries": args.retries,
+    }
@@ -0,0 +1,133 @@
+# html_archive.py
+"""
+Archiwum surowego HTML, adresowane treścią (content-addressed).
+
+Każda pobrana strona trafia do:
+  html_archive/objects/<xx>/<sha256>.html.zst   (albo .html.gz, gdy brak zstandard)
+– ta sama treść zapisywana jest tylko raz.
+
+Do tego manifest html_archive/manifest.jsonl, po jednej linii na pobranie:
+  {"school": ..., "season": ..., "kind": "roster"|"staff", "url": ..., "fetched_at": ..., "hash": ...}
+Strona identyczna z ostatnim wpisem dla (school, season, kind) – np. z cache
+HTTP albo w --offline – nie dopisuje nowej linii.
+
+Dzięki temu po zmianie parsera można odbudować raw_schools/ i raw_staff/
+bez ponownego crawla (patrz reparse.py).
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd jest opcjonalny, gzip jest zawsze
+    zstandard = None
+
+ARCHIVE_DIR = "html_archive"
+MANIFEST_NAME = "manifest.jsonl"
+
+_EXTENSIONS = (".html.zst", ".html.gz")
+
+
+def content_hash(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+def _compress(data: bytes) -> Tuple[bytes, str]:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(data), ".html.zst"
+    return gzip.compress(data, compresslevel=9), ".html.gz"
+
+
+def _decompress(data: bytes, ext: str) -> bytes:
+    if ext == ".html.zst":
+        if zstandard is None:
+            raise RuntimeError("archive object is zstd-compressed but 'zstandard' is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class HtmlArchive:
+    def __init__(self, archive_dir: str = ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self.manifest_path = os.path.join(archive_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self._latest_hashes: Optional[Dict[Tuple[str, int, str], str]] = None
+
+    def _object_base(self, digest: str) -> str:
+        return os.path.join(self.archive_dir, "objects", digest[:2], digest)
+
+    def _find_object(self, digest: str) -> Optional[Tuple[str, str]]:
+        base = self._object_base(digest)
+        for ext in _EXTENSIONS:
+            if os.path.exists(base + ext):
+                return base + ext, ext
+        return None
+
+    def put(self, html: str) -> str:
+        """Zapisuje treść (jeśli jeszcze jej nie ma) i zwraca jej hash."""
+        digest = content_hash(html)
+        if self._find_object(digest) is None:
+            data, ext = _compress(html.encode("utf-8"))
+            path = self._object_base(digest) + ext
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return digest
+
+    def load(self, digest: str) -> str:
+        found = self._find_object(digest)
+        if found is None:
+            raise KeyError(f"no archived page with hash {digest}")
+        path, ext = found
+        with open(path, "rb") as f:
+            return _decompress(f.read(), ext).decode("utf-8")
+
+    def record(self, html: str, school: str, season: int, kind: str, url: str) -> str:
+        """Archiwizuje stronę i dopisuje wpis do manifestu (chyba że treść się nie zmieniła)."""
+        digest = self.put(html)
+        key = (school, season, kind)
+        entry = {
+            "school": school,
+            "season": season,
+            "kind": kind,
+            "url": url,
+            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "hash": digest,
+        }
+        with self._lock:
+            if self._latest_hashes is None:
+                self._latest_hashes = {k: e["hash"] for k, e in self.latest_entries().items()}
+            if self._latest_hashes.get(key) == digest:
+                return digest
+            os.makedirs(self.archive_dir, exist_ok=True)
+            with open(self.manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._latest_hashes[key] = digest
+        return digest
+
+    def iter_manifest(self) -> Iterator[Dict]:
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    def latest_entries(self, kind: Optional[str] = None) -> Dict[Tuple[str, int, str], Dict]:
+        """Ostatni wpis dla każdego (school, season, kind)."""
+        latest: Dict[Tuple[str, int, str], Dict] = {}
+        for entry in self.iter_manifest():
+            if kind is not None and entry["kind"] != kind:
+                continue
+            key = (entry["school"], entry["season"], entry["kind"])
+            # manifest jest dopisywany chronologicznie, więc późniejsza linia wygrywa
+            latest[key] = entry
+        return latest
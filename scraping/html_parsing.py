@@ -0,0 +1,100 @@
+# html_parsing.py
+"""
+Wspólne budowanie drzewa BeautifulSoup dla parserów rosteru.
+
+1) Wybór backendu: "html.parser" (domyślny, czysty Python) albo "lxml"
+   (szybszy, w C). Domyślny backend można ustawić zmienną środowiskową
+   SCRAPER_HTML_PARSER albo opcją --html-parser w scraperach.
+
+2) Parsowanie tylko fragmentu strony z rosterem zamiast całego dokumentu
+   (nawigacja, stopka, reklamy, skrypty):
+     - layout listy ('Jersey Number'): wycinamy surowy HTML od pierwszego
+       linku 'Jersey Number' do tekstu 'Coaching Staff',
+     - layout view=2: SoupStrainer("table") – budujemy tylko tabele.
+"""
+import argparse
+import os
+import re
+from typing import Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+BACKEND_ENV = "SCRAPER_HTML_PARSER"
+BACKENDS = ("html.parser", "lxml")
+
+TABLE_STRAINER = SoupStrainer("table")
+
+JERSEY_TEXT = "Jersey Number"
+ANCHOR_OPEN_RE = re.compile(r"<a[\s>]", re.I)
+# tekst (nie atrybut) zawierający 'Coaching Staff' – tu kończy się lista zawodników
+COACHING_STAFF_TEXT_RE = re.compile(r">[^<]*Coaching Staff")
+
+
+def default_backend() -> str:
+    backend = os.environ.get(BACKEND_ENV, "html.parser")
+    if backend not in BACKENDS:
+        raise ValueError(f"{BACKEND_ENV}={backend!r}: expected one of {BACKENDS}")
+    return backend
+
+
+def set_default_backend(backend: str) -> None:
+    """Ustawia backend także dla procesów potomnych (ProcessPoolExecutor)."""
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown HTML parser backend {backend!r}: expected one of {BACKENDS}")
+    if backend == "lxml" and not HAS_LXML:
+        raise RuntimeError("the 'lxml' backend needs the lxml package (pip install lxml)")
+    os.environ[BACKEND_ENV] = backend
+
+
+def add_backend_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--html-parser", choices=BACKENDS, default=None,
+                        help="BeautifulSoup backend for roster pages (default: html.parser)")
+
+
+def apply_backend_argument(args: argparse.Namespace) -> None:
+    if args.html_parser:
+        set_default_backend(args.html_parser)
+
+
+def make_soup(html: str, backend: Optional[str] = None,
+              parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    backend = backend or default_backend()
+    if backend == "lxml" and not HAS_LXML:
+        backend = "html.parser"
+    return BeautifulSoup(html, backend, parse_only=parse_only)
+
+
+def _last_anchor_open_before(html: str, idx: int) -> int:
+    start = -1
+    for m in ANCHOR_OPEN_RE.finditer(html, 0, idx):
+        start = m.start()
+    return start
+
+
+def roster_list_region(html: str) -> str:
+    """
+    Fragment surowego HTML, który wystarcza parserowi listy 'Jersey Number':
+    od <a> z pierwszym 'Jersey Number' do końca tekstu 'Coaching Staff'
+    (o ile za nim nie ma już żadnych zawodników). Gdy nie umiemy bezpiecznie
+    wyciąć fragmentu, zwracamy cały dokument.
+    """
+    idx = html.find(JERSEY_TEXT)
+    if idx == -1:
+        return html
+    start = _last_anchor_open_before(html, idx)
+    if start == -1:
+        return html
+
+    end = len(html)
+    stop = COACHING_STAFF_TEXT_RE.search(html, idx)
+    if stop and html.find(JERSEY_TEXT, stop.end()) == -1:
+        # do końca tego węzła tekstowego
+        text_end = html.find("<", stop.end())
+        end = text_end if text_end != -1 else len(html)
+    return html[start:end]
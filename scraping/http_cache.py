@@ -0,0 +1,101 @@
+# http_cache.py
+"""
+Prosty dyskowy cache odpowiedzi HTTP, kluczowany URL-em.
+
+Dla każdego URL-a trzymamy:
+  - http_cache/<xx>/<sha256>.html  – treść strony,
+  - http_cache/<xx>/<sha256>.json  – metadane (url, ETag, Last-Modified, fetched_at).
+
+ETag / Last-Modified służą do warunkowych GET-ów (If-None-Match /
+If-Modified-Since), a tryb offline serwuje wszystko prosto z dysku.
+"""
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+CACHE_DIR = "http_cache"
+
+
+class CacheMiss(Exception):
+    """Brak strony w cache w trybie offline."""
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    text: str
+    etag: str = ""
+    last_modified: str = ""
+    fetched_at: float = 0.0
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _atomic_write(path: str, data: str) -> None:
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class HttpCache:
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        folder = os.path.join(self.cache_dir, key[:2])
+        return folder, os.path.join(folder, key + ".html"), os.path.join(folder, key + ".json")
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        _, body_path, meta_path = self._paths(url)
+        if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except (OSError, ValueError):
+            # uszkodzony wpis traktujemy jak brak wpisu
+            return None
+        return CachedResponse(
+            url=url,
+            text=text,
+            etag=meta.get("etag", ""),
+            last_modified=meta.get("last_modified", ""),
+            fetched_at=meta.get("fetched_at", 0.0),
+        )
+
+    def _write_meta(self, meta_path: str, entry: CachedResponse) -> None:
+        _atomic_write(meta_path, json.dumps({
+            "url": entry.url,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "fetched_at": entry.fetched_at,
+        }, ensure_ascii=False))
+
+    def put(self, url: str, text: str, etag: str = "", last_modified: str = "") -> CachedResponse:
+        folder, body_path, meta_path = self._paths(url)
+        os.makedirs(folder, exist_ok=True)
+        entry = CachedResponse(url, text, etag or "", last_modified or "", time.time())
+        _atomic_write(body_path, text)
+        self._write_meta(meta_path, entry)
+        return entry
+
+    def touch(self, entry: CachedResponse, etag: str = "", last_modified: str = "") -> None:
+        """Odpowiedź 304 – treść aktualna, odświeżamy tylko metadane."""
+        _, _, meta_path = self._paths(entry.url)
+        entry.fetched_at = time.time()
+        entry.etag = etag or entry.etag
+        entry.last_modified = last_modified or entry.last_modified
+        self._write_meta(meta_path, entry)
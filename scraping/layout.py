@@ -0,0 +1,92 @@
+# layout.py
+"""
+Tani "sniffer" layoutu strony rosteru – zamiast ręcznej listy szkół.
+
+Klasyfikuje surowy HTML (same regexy, bez BeautifulSoup) jako:
+  - embedded-json   – dane zawodników w JSON-ie w <script> (embedded_json.py),
+  - accessible-list – klasyczna lista Sidearm z linkami 'Jersey Number NN',
+  - view2-table     – tabela z nagłówkami Jersey/Name/Pos/Ht/Wt/Yr/Hometown,
+  - unknown         – nic z powyższych.
+
+Decyzja jest zapamiętywana per host (wszystkie sezony jednej szkoły mają
+zwykle ten sam layout), więc dla kolejnych stron nie trzeba nawet sniffować.
+Cache (LAYOUT_CACHE) żyje w głównym procesie scrapera: tam layout jest
+wybierany i tam trafiają wyniki parserów z puli procesów (scrape_rosters.py:
+roster_layout / remember_layout).
+"""
+import re
+import threading
+from typing import Dict, Optional
+
+LAYOUT_EMBEDDED_JSON = "embedded-json"
+LAYOUT_ACCESSIBLE_LIST = "accessible-list"
+LAYOUT_VIEW2_TABLE = "view2-table"
+LAYOUT_UNKNOWN = "unknown"
+
+# stare nazwy z schools.json
+LAYOUT_ALIASES = {"view2": LAYOUT_VIEW2_TABLE, "list": LAYOUT_ACCESSIBLE_LIST}
+
+# <a ...> + ewentualne tagi w środku (<span class="sr-only">) + tekst 'Jersey Number'
+JERSEY_ANCHOR_RE = re.compile(r"<a\b[^>]*>(?:\s*<(?!/?a\b)[^>]*>)*\s*Jersey Number", re.I)
+# pierwszy wiersz każdej tabeli (do pierwszego </tr>)
+TABLE_HEAD_RE = re.compile(r"<table\b.*?</tr\s*>", re.I | re.S)
+TAG_RE = re.compile(r"<[^>]+>")
+# JSON-owe klucze, które w praktyce pojawiają się tylko przy danych rosteru
+ROSTER_JSON_RE = re.compile(r"\"(?:jerseyNumber|jersey_number|uniformNumber)\"\s*:", re.I)
+
+ROSTER_HEADER_KEYWORDS = ("jersey", "name", "pos", "ht", "height", "wt", "weight",
+                          "yr", "class", "hometown", "high school", "previous school")
+MIN_HEADER_SCORE = 4
+
+
+def normalize_layout(layout: Optional[str]) -> str:
+    if not layout:
+        return ""
+    return LAYOUT_ALIASES.get(layout, layout)
+
+
+def _has_roster_table(html: str) -> bool:
+    for m in TABLE_HEAD_RE.finditer(html):
+        header = " ".join(TAG_RE.sub(" ", m.group(0)).lower().split())
+        score = sum(1 for kw in ROSTER_HEADER_KEYWORDS if kw in header)
+        if score >= MIN_HEADER_SCORE:
+            return True
+    return False
+
+
+def sniff_dom_layout(html: str) -> str:
+    """Tylko layouty DOM: lista z 'Jersey Number' ma pierwszeństwo przed tabelą."""
+    if JERSEY_ANCHOR_RE.search(html):
+        return LAYOUT_ACCESSIBLE_LIST
+    if _has_roster_table(html):
+        return LAYOUT_VIEW2_TABLE
+    return LAYOUT_UNKNOWN
+
+
+def sniff_roster_layout(html: str) -> str:
+    if "<script" in html and ROSTER_JSON_RE.search(html):
+        return LAYOUT_EMBEDDED_JSON
+    return sniff_dom_layout(html)
+
+
+class LayoutCache:
+    """Zapamiętany layout dla każdego hosta (bezpieczne dla wątków)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_host: Dict[str, str] = {}
+
+    def get(self, host: str) -> Optional[str]:
+        with self._lock:
+            return self._by_host.get(host)
+
+    def set(self, host: str, layout: str) -> None:
+        with self._lock:
+            self._by_host[host] = layout
+
+    def forget(self, host: str) -> None:
+        with self._lock:
+            self._by_host.pop(host, None)
+
+
+LAYOUT_CACHE = LayoutCache()
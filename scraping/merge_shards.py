@@ -0,0 +1,127 @@
+# merge_shards.py
+"""
+Łączy pliki zbiorcze z crawla w shardach (--shard i/n) w jeden
+all_schools_ontology.jsonl / all_schools_staff.jsonl.
+
+Każdy shard zapisuje własny plik *.shard-i-of-n.jsonl. Po skopiowaniu ich
+(i katalogów raw_schools/, raw_staff/) z maszyn do jednego katalogu:
+
+    python scraping/merge_shards.py                  # rostery + staff
+    python scraping/merge_shards.py --years 2016-2025
+
+Kolejność w pliku wynikowym jest taka jak w rejestrze (szkoła, potem sezon),
+czyli taka sama, jak przy crawlu bez shardów. Jeśli ten sam (school, season)
+jest w kilku shardach (np. powtórzony shard), wygrywa plik zmodyfikowany
+najpóźniej. Brakujące shardy są zgłaszane, ale nie przerywają łączenia.
+
+Łączenie idzie w dwóch przejściach, bez wczytywania shardów do pamięci:
+najpierw indeks (school, season) -> (plik, offset linii), potem rekordy są
+czytane po jednym w kolejności rejestru i dopisywane do wyniku.
+"""
+import argparse
+import glob
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import scrape_rosters
+import scrape_staff
+from ndjson import NdjsonWriter, loads_line
+from registry import SCHOOLS, BASE_SCHOOLS, expand_schools, parse_years
+
+SHARD_FILE_RE = re.compile(r"\.shard-(\d+)-of-(\d+)\.jsonl$")
+
+
+def shard_files(path: str) -> List[str]:
+    """Pliki shardów dla danego pliku zbiorczego, od najstarszego."""
+    root, ext = os.path.splitext(path)
+    files = [f for f in glob.glob(f"{glob.escape(root)}.shard-*-of-*{ext}")
+             if SHARD_FILE_RE.search(f)]
+    return sorted(files, key=os.path.getmtime)
+
+
+def _missing_shards(files: List[str]) -> List[str]:
+    seen: Dict[int, set] = {}
+    for f in files:
+        index, count = map(int, SHARD_FILE_RE.search(f).groups())
+        seen.setdefault(count, set()).add(index)
+    missing = []
+    for count, indexes in seen.items():
+        missing += [f"{i}/{count}" for i in range(1, count + 1) if i not in indexes]
+    return missing
+
+
+def _entry_key(item: Dict) -> Tuple[str, int]:
+    return item["School"]["name"], item["Team"]["seasonYear"]
+
+
+def merge(path: str, schools: List[Dict], files: Optional[List[str]] = None) -> int:
+    files = shard_files(path) if files is None else files
+    if not files:
+        print(f"No shard files for {path}")
+        return 0
+    missing = _missing_shards(files)
+    if missing:
+        print(f"  [WARN] {path}: missing shards {', '.join(missing)}")
+
+    # (school, season) -> (plik, offset); późniejszy plik nadpisuje wcześniejszy
+    index: Dict[Tuple[str, int], Tuple[str, int]] = {}
+    for f in files:
+        for offset, item in _scan(f):
+            index[_entry_key(item)] = (f, offset)
+
+    order = []
+    for cfg in schools:
+        location = index.pop((cfg["school_name"], cfg["season_year"]), None)
+        if location is not None:
+            order.append(location)
+    # wpisy spoza rejestru (np. inne --years) na końcu, w kolejności z plików
+    order.extend(index.values())
+
+    handles: Dict[str, object] = {}
+    try:
+        with NdjsonWriter(path) as writer:
+            for f, offset in order:
+                fh = handles.get(f)
+                if fh is None:
+                    fh = handles[f] = open(f, "rb")
+                fh.seek(offset)
+                writer.write(loads_line(fh.readline()))
+    finally:
+        for fh in handles.values():
+            fh.close()
+    print(f"Merged {len(files)} shard files -> {path} ({writer.count} teams)")
+    return writer.count
+
+
+def _scan(path: str) -> Iterator[Tuple[int, Dict]]:
+    """(offset linii, rekord) dla każdej linii pliku NDJSON."""
+    with open(path, "rb") as fh:
+        offset = 0
+        for line in fh:
+            if line.strip():
+                yield offset, loads_line(line)
+            offset += len(line)
+
+
+def main(kind: str = "all", schools: Optional[List[Dict]] = None):
+    schools = SCHOOLS if schools is None else schools
+    if kind in ("all", "roster"):
+        merge(scrape_rosters.ALL_SCHOOLS_PATH, schools)
+    if kind in ("all", "staff"):
+        merge(scrape_staff.ALL_STAFF_PATH, schools)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge sharded aggregate files into the full ones.")
+    parser.add_argument("--kind", choices=["all", "roster", "staff"], default="all")
+    parser.add_argument("--years", default="",
+                        help="seasons the shards were crawled for (default: schools.json)")
+    args = parser.parse_args()
+    schools = SCHOOLS
+    if args.years:
+        try:
+            schools = expand_schools(BASE_SCHOOLS, parse_years(args.years))
+        except ValueError as e:
+            parser.error(str(e))
+    main(kind=args.kind, schools=schools)
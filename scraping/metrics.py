@@ -0,0 +1,216 @@
+# metrics.py
+"""
+Metryki etapów pipeline'u (scraping + cleaning).
+
+Każdy pomiar to jedno zdarzenie: etap (fetch / parse / build / serialize /
+write, w cleaningu load / clean / serialize / write), szkoła, sezon, czas
+w sekundach i opcjonalnie: bajty, liczba rekordów, tier parsera, host.
+
+Wyniki:
+  - metrics/metrics.jsonl   – jedna linia JSON na zdarzenie, dopisywana przy
+                              każdym uruchomieniu (run_id + component), plus
+                              linia podsumowania runu – do porównań między runami,
+  - metrics/<component>.prom – snapshot w formacie tekstowym Prometheusa
+                              (np. dla textfile collectora node_exportera),
+                              nadpisywany na końcu runu.
+
+metrics_dir="" wyłącza zapis (recorder nic nie robi).
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+METRICS_DIR = "metrics"
+EVENTS_FILE = "metrics.jsonl"
+PROM_PREFIX = "ncaa_pipeline"
+
+
+class StageStats:
+    __slots__ = ("count", "seconds", "max_seconds", "bytes", "records")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.bytes = 0
+        self.records = 0
+
+
+class MetricsRecorder:
+    def __init__(self, component: str, metrics_dir: str = METRICS_DIR):
+        self.component = component
+        self.metrics_dir = metrics_dir
+        self.enabled = bool(metrics_dir)
+        self.run_id = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime()) + "-" + uuid.uuid4().hex[:6]
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, StageStats] = defaultdict(StageStats)
+        self._hosts: Dict[str, StageStats] = defaultdict(StageStats)
+        self._outcomes: Counter = Counter()
+        self._tiers: Counter = Counter()
+        self._events = None
+        if self.enabled:
+            os.makedirs(metrics_dir, exist_ok=True)
+            self._events = open(os.path.join(metrics_dir, EVENTS_FILE), "a", encoding="utf-8")
+
+    def record(self, stage: str, seconds: float,
+               school: Optional[str] = None, season: Optional[int] = None,
+               nbytes: int = 0, records: Optional[int] = None,
+               tier: Optional[str] = None, host: Optional[str] = None,
+               outcome: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        event = {
+            "type": "stage",
+            "run_id": self.run_id,
+            "component": self.component,
+            "ts": round(time.time(), 3),
+            "stage": stage,
+            "seconds": round(seconds, 6),
+        }
+        for key, value in (("school", school), ("season", season), ("bytes", nbytes or None),
+                           ("records", records), ("tier", tier), ("host", host),
+                           ("outcome", outcome)):
+            if value is not None:
+                event[key] = value
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            stats = self._stages[stage]
+            stats.count += 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.bytes += nbytes
+            stats.records += records or 0
+            if host is not None:
+                host_stats = self._hosts[host]
+                host_stats.count += 1
+                host_stats.seconds += seconds
+                host_stats.max_seconds = max(host_stats.max_seconds, seconds)
+                host_stats.bytes += nbytes
+            if outcome is not None:
+                self._outcomes[stage, outcome] += 1
+            if tier is not None:
+                self._tiers[tier] += 1
+            self._events.write(line)
+            self._events.flush()
+
+    @contextmanager
+    def stage(self, stage: str, **labels) -> Iterator[Dict]:
+        """
+        with metrics.stage("write", school=..., season=...) as extra:
+            ...; extra["nbytes"] = n
+        """
+        extra: Dict = {}
+        started = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            self.record(stage, time.perf_counter() - started, **labels, **extra)
+
+    # --- wyjście ---------------------------------------------------------
+
+    def _prom_lines(self) -> List[str]:
+        c = self.component
+        p = PROM_PREFIX
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples) -> None:
+            samples = list(samples)
+            if not samples:
+                return
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in (("component", c),) + labels)
+                lines.append(f"{p}_{name}{{{label_str}}} {_number(value)}")
+
+        stages = sorted(self._stages.items())
+        hosts = sorted(self._hosts.items())
+        metric("stage_seconds_total", "counter", "Time spent in each pipeline stage.",
+               [((("stage", s),), st.seconds) for s, st in stages])
+        metric("stage_events_total", "counter", "Stage executions (one per school and page).",
+               [((("stage", s),), st.count) for s, st in stages])
+        metric("stage_seconds_max", "gauge", "Slowest single execution of each stage.",
+               [((("stage", s),), st.max_seconds) for s, st in stages])
+        metric("stage_bytes_total", "counter", "Bytes downloaded or written per stage.",
+               [((("stage", s),), st.bytes) for s, st in stages if st.bytes])
+        metric("stage_records_total", "counter", "Records (players, staff) produced per stage.",
+               [((("stage", s),), st.records) for s, st in stages if st.records])
+        metric("host_fetch_seconds_total", "counter", "Fetch time per host.",
+               [((("host", h),), st.seconds) for h, st in hosts])
+        metric("host_fetch_seconds_max", "gauge", "Slowest fetch per host.",
+               [((("host", h),), st.max_seconds) for h, st in hosts])
+        metric("host_fetch_bytes_total", "counter", "Bytes downloaded per host.",
+               [((("host", h),), st.bytes) for h, st in hosts])
+        metric("host_fetches_total", "counter", "Fetches per host.",
+               [((("host", h),), st.count) for h, st in hosts])
+        metric("stage_outcomes_total", "counter", "Stage results by outcome (network, cache, error...).",
+               [((("stage", s), ("outcome", o)), n) for (s, o), n in sorted(self._outcomes.items())])
+        metric("parser_tier_total", "counter", "Pages parsed by each parser tier.",
+               [((("tier", t),), n) for t, n in sorted(self._tiers.items())])
+        metric("run_duration_seconds", "gauge", "Wall-clock duration of the last run.",
+               [((), time.time() - self.started)])
+        metric("run_timestamp_seconds", "gauge", "Unix time when the last run finished.",
+               [((), time.time())])
+        return lines
+
+    def summary(self) -> str:
+        with self._lock:
+            parts = [f"{s} {st.seconds:.2f}s/{st.count}" for s, st in self._stages.items()]
+        return "Stage times: " + (", ".join(parts) if parts else "none")
+
+    def close(self) -> None:
+        """Linia podsumowania w JSONL + snapshot .prom (zapis atomowy)."""
+        if not self.enabled or self._events is None:
+            return
+        with self._lock:
+            run = {
+                "type": "run",
+                "run_id": self.run_id,
+                "component": self.component,
+                "ts": round(time.time(), 3),
+                "seconds": round(time.time() - self.started, 3),
+                "stages": {s: {"count": st.count, "seconds": round(st.seconds, 6),
+                               "bytes": st.bytes, "records": st.records}
+                           for s, st in sorted(self._stages.items())},
+                "tiers": dict(self._tiers),
+            }
+            self._events.write(json.dumps(run, ensure_ascii=False) + "\n")
+            self._events.close()
+            self._events = None
+            text = "\n".join(self._prom_lines()) + "\n"
+
+        prom_path = os.path.join(self.metrics_dir, f"{self.component}.prom")
+        fd, tmp = tempfile.mkstemp(dir=self.metrics_dir, prefix=f".{self.component}.prom.")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, prom_path)
+        print(self.summary())
+        print(f"Metrics: {os.path.join(self.metrics_dir, EVENTS_FILE)}, {prom_path}")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def add_metrics_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--metrics-dir", default=METRICS_DIR,
+                        help="where to write metrics.jsonl and the .prom snapshot ('' disables)")
+
+
+def metrics_options(args: argparse.Namespace) -> Dict:
+    return {"metrics_dir": args.metrics_dir}
@@ -0,0 +1,214 @@
+# ndjson.py
+"""
+Pliki zbiorcze w formacie NDJSON (JSON Lines): jeden obiekt szkoły/sezonu
+w jednej linii, dopisywany, gdy tylko strona zostanie sparsowana.
+
+    {"School": {...}, "Season": {...}, "Team": {...}, "Players": [...], ...}
+    {"School": {...}, ...}
+
+Zamiast trzymać całą listę w pamięci i robić json.dump na końcu:
+  - scraper ma w pamięci najwyżej jeden wynik naraz,
+  - cleaning czyta plik strumieniowo (iter_records) – też po jednej szkole,
+  - w trakcie przebiegu plik rośnie jako <plik>.tmp (widać postęp, a wiersze
+    da się już czytać); na końcu przebiegu podmieniamy go atomowo (os.replace),
+    więc po przerwanym przebiegu zostaje poprzednia, kompletna wersja.
+
+Serializacja przez orjson, jeśli jest zainstalowany (kilka razy szybszy),
+w przeciwnym razie json z biblioteki standardowej – wynik jest ten sam
+(zwarty zapis, UTF-8 bez \\u-escape'ów).
+
+Strony kończą się w dowolnej kolejności; OrderedWriter przepuszcza rekordy
+do pliku w kolejności rejestru (indeksy 0..n-1), więc plik zbiorczy jest taki
+sam przy każdym przebiegu i taki jak z merge_shards.py.
+
+JsonArrayWriter zapisuje strumieniowo zwykłą tablicę JSON, bajt w bajt taką
+jak json.dump(lista, indent=2, ensure_ascii=False) – dla plików, które
+czytają inne narzędzia (np. *_clean.json ładowane do Neo4j).
+"""
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def dumps_line(obj: Any) -> bytes:
+    """Jeden rekord jako linia NDJSON (z końcowym \\n)."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def loads_line(line: bytes) -> Any:
+    if HAS_ORJSON:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+class NdjsonWriter:
+    """Dopisuje rekordy do <path>.tmp; close() podmienia plik docelowy."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.count = 0
+        self.nbytes = 0
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._f = open(self.tmp_path, "wb")
+
+    def write(self, record: Dict) -> int:
+        line = dumps_line(record)
+        self._f.write(line)
+        self._f.flush()   # czytelne na bieżąco (tail -f, drugi proces)
+        self.count += 1
+        self.nbytes += len(line)
+        return len(line)
+
+    def write_all(self, records: Iterable[Dict]) -> int:
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        self._f.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        """Przerwany przebieg: zostawia <path>.tmp do wglądu, plik docelowy bez zmian."""
+        self._f.close()
+
+    def __enter__(self) -> "NdjsonWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class OrderedWriter:
+    """
+    Bufor przestawiający przed NdjsonWriterem: put(i, rekord) w dowolnej
+    kolejności, zapis w kolejności i. Gdy tylko kolejny indeks jest gotowy,
+    cały ciągły odcinek idzie do pliku – w pamięci czekają tylko rekordy
+    skończone przed wolniejszą stroną o niższym indeksie.
+
+    Każdy indeks trzeba zgłosić dokładnie raz; rekord None (strona nie
+    wyszła) tylko przesuwa kolejkę.
+    """
+
+    def __init__(self, writer: NdjsonWriter):
+        self.writer = writer
+        self.next_index = 0
+        self.peak = 0   # najwięcej rekordów czekających naraz
+        self._waiting: Dict[int, Optional[Dict]] = {}
+
+    def put(self, index: int, record: Optional[Dict] = None) -> None:
+        if index < self.next_index or index in self._waiting:
+            raise ValueError(f"index {index} reported twice")
+        self._waiting[index] = record
+        self.peak = max(self.peak, len(self._waiting))
+        while self.next_index in self._waiting:
+            record = self._waiting.pop(self.next_index)
+            if record is not None:
+                self.writer.write(record)
+            self.next_index += 1
+
+    def flush(self) -> None:
+        """Koniec przebiegu: zapisuje to, co zostało (luka = brakujący indeks)."""
+        for index in sorted(self._waiting):
+            record = self._waiting.pop(index)
+            if record is not None:
+                self.writer.write(record)
+            self.next_index = index + 1
+
+
+def _file_sha256(path: str):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def iter_records(path: str) -> Iterator[Dict]:
+    """
+    Rekordy z pliku zbiorczego, po jednym. Przyjmuje też stary format (jedna
+    tablica JSON) – wtedy niestety cały plik ląduje w pamięci.
+    """
+    with open(path, "rb") as f:
+        head = f.read(64).lstrip()
+        f.seek(0)
+        if head.startswith(b"["):
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield loads_line(line)
+
+
+class JsonArrayWriter:
+    """
+    Tablica JSON zapisywana element po elemencie (format jak json.dump(indent=2)).
+
+    keep_unchanged=True: jeśli wynik jest bajt w bajt taki jak istniejący plik,
+    plik nie jest podmieniany (zostaje jego mtime – dla loaderów, które po nim
+    poznają zmiany).
+    """
+
+    def __init__(self, path: str, indent: int = 2, keep_unchanged: bool = False):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.indent = indent
+        self.keep_unchanged = keep_unchanged
+        self.count = 0
+        self.nbytes = 0
+        self.replaced = False
+        self._sha = hashlib.sha256()
+        self._f = open(self.tmp_path, "w", encoding="utf-8")
+
+    def _put(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self._f.write(text)
+        self._sha.update(data)
+        self.nbytes += len(data)
+
+    def write(self, item: Any) -> None:
+        self.write_text(json.dumps(item, indent=self.indent, ensure_ascii=False))
+
+    def write_text(self, text: str) -> None:
+        """Element już zserializowany przez json.dumps(..., indent=self.indent)."""
+        pad = " " * self.indent
+        # w stringach JSON nie ma surowych \n, więc wcięcie jest bezpieczne
+        self._put(("[\n" if not self.count else ",\n") + pad + text.replace("\n", "\n" + pad))
+        self.count += 1
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        self._put("\n]" if self.count else "[]")
+        self._f.close()
+        if self.keep_unchanged and _file_sha256(self.path) == self._sha.hexdigest():
+            os.remove(self.tmp_path)
+            return
+        os.replace(self.tmp_path, self.path)
+        self.replaced = True
+
+    def __enter__(self) -> "JsonArrayWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._f.close()
@@ -1,6 +1,8 @@
 # parser_sidearm_view2.py
 from bs4 import BeautifulSoup
 
+from html_parsing import make_soup, TABLE_STRAINER
+
 def norm(s: str) -> str:
     if not s:
         return ""
@@ -92,13 +94,14 @@ def parse_home_and_school(text: str):
     last_school = " ".join(tail_tokens[state_end_idx + 1:]).strip()
     return hometown, last_school
 
-def parse_sidearm_roster_view2(html: str):
+def parse_sidearm_roster_view2(html: str, backend=None, restrict: bool = True):
     """
     Parser tabelowy dla layoutu view=2 (Fullerton, UCSB, Evansville, Wichita).
     Zakładamy, że jest tabela z nagłówkami w stylu:
       Jersey | Name | Pos. | Ht. | Wt. | Yr. | Hometown / High School
+    restrict=True -> drzewo budujemy tylko z tabel (SoupStrainer).
     """
-    soup = BeautifulSoup(html, "html.parser")
+    soup = make_soup(html, backend, parse_only=TABLE_STRAINER if restrict else None)
     table = pick_best_roster_table(soup)
     if table is None:
         return []
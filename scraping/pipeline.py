@@ -0,0 +1,95 @@
+# pipeline.py
+"""
+Potokowe wykonanie scraperów: pobieranie (I/O, wątki w fetcher.py) i
+parsowanie (CPU, BeautifulSoup) lecą jednocześnie.
+
+    iter_fetch ──(kolejka, queue_size)──> główny proces ──(max_pending)──> ProcessPoolExecutor
+                                               ^                                  |
+                                               └────── on_result (zapis pliku) <──┘
+
+Pobrane strony trafiają do puli procesów zaraz po pobraniu, a wynik każdej
+strony jest zapisywany, gdy tylko parser skończy. Backpressure:
+  - w puli jest najwyżej `max_pending` zadań – dopóki któreś się nie skończy,
+    nie bierzemy nowych stron z kolejki,
+  - pełna kolejka (queue_size) wstrzymuje wątki pobierające,
+więc w pamięci jest najwyżej queue_size + max_pending stron naraz,
+niezależnie od wielkości crawla.
+
+parse_workers=0 parsuje w głównym procesie (bez puli) – przydatne do debugowania.
+"""
+import argparse
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+PARSE_WORKERS = os.cpu_count() or 1   # procesy parsujące
+QUEUE_SIZE = 16                       # pobrane strony czekające na parser
+
+
+class JobFailed(Exception):
+    """Wyjątek rzucony przez zadanie w puli procesów (np. błąd parsera)."""
+
+    def __init__(self, error: BaseException):
+        super().__init__(f"{type(error).__name__}: {error}")
+        self.error = error
+
+
+def run_pipeline(tasks: Iterable[Tuple[Any, tuple]],
+                 job: Callable,
+                 on_result: Callable[[Any, Any], None],
+                 parse_workers: int = PARSE_WORKERS,
+                 max_pending: Optional[int] = None) -> None:
+    """
+    Dla każdego (key, args) z `tasks` liczy job(*args) w puli procesów i woła
+    on_result(key, wynik) w głównym procesie, w kolejności kończenia zadań.
+    Jeśli zadanie rzuci wyjątek, on_result dostaje JobFailed.
+
+    `job` i `args` muszą dać się przesłać przez pickle (funkcja na poziomie modułu).
+    """
+    if parse_workers <= 0:
+        for key, args in tasks:
+            try:
+                result = job(*args)
+            except Exception as e:
+                result = JobFailed(e)
+            on_result(key, result)
+        return
+
+    max_pending = max_pending or 2 * parse_workers
+    pending: Dict = {}
+
+    def drain(timeout: Optional[float] = None) -> None:
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            key = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                result = JobFailed(e)
+            on_result(key, result)
+
+    with ProcessPoolExecutor(max_workers=parse_workers) as executor:
+        for key, args in tasks:
+            # backpressure: nie bierzemy kolejnej strony, dopóki pula jest pełna
+            while len(pending) >= max_pending:
+                drain()
+            pending[executor.submit(job, *args)] = key
+            # przy okazji zapisujemy to, co już gotowe (bez czekania)
+            drain(timeout=0)
+        while pending:
+            drain()
+
+
+def add_pipeline_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS,
+                        help="parser processes (0 = parse in the main process)")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help="fetched pages allowed to wait for a parser")
+
+
+def pipeline_options(args: argparse.Namespace) -> Dict:
+    """Zamienia opcje z add_pipeline_arguments na kwargs dla main()."""
+    return {
+        "parse_workers": args.parse_workers,
+        "queue_size": args.queue_size,
+    }
@@ -0,0 +1,182 @@
+# profiling.py
+"""
+Profilowanie etapów pipeline'u bez zmian w kodzie: opcja --profile w scraperach,
+crawl.py i skryptach z cleaning/.
+
+Każdy etap (fetch / parse / build / serialize / write, w cleaningu load / clean /
+serialize / write) ma własny cProfile.Profile – wywołania z kolejnych szkół
+sumują się w jednym profilu etapu. Dodatkowo tracemalloc mierzy szczyt pamięci
+zaalokowanej w trakcie etapu.
+
+Wyniki w profiles/ (albo --profile-dir):
+  - <component>-<stage>.prof – do `python -m pstats`, snakeviz itp.,
+  - <component>-summary.txt  – dla każdego etapu: czas, liczba wywołań,
+                                szczyt pamięci i najgorętsze funkcje
+                                (czas własny, tottime).
+
+Uwagi:
+  - parsowanie idzie wtedy w głównym procesie (parse_workers=0), bo cProfile
+    nie widzi procesów z puli,
+  - fetch działa w wątkach – każdy wątek ma swój profil, łączony przy zapisie;
+    szczyt pamięci liczymy tylko dla etapów z głównego wątku (tracemalloc
+    jest globalny dla procesu),
+  - etap zagnieżdżony w innym liczy się do zewnętrznego.
+
+Kod pipeline'u woła po prostu `with profiling.stage("parse"): ...` – bez
+aktywnego profilera to pusty context manager.
+"""
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional
+
+PROFILE_DIR = "profiles"
+TOP_FUNCTIONS = 25        # funkcji na etap w podsumowaniu
+
+_active: Optional["StageProfiler"] = None
+_NULL = nullcontext()
+
+
+class StageProfiler:
+    def __init__(self, component: str, profile_dir: str = PROFILE_DIR,
+                 top: int = TOP_FUNCTIONS):
+        self.component = component
+        self.profile_dir = profile_dir
+        self.top = top
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiles: Dict[str, List[cProfile.Profile]] = defaultdict(list)
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._seconds: Dict[str, float] = defaultdict(float)
+        self._peaks: Dict[str, int] = defaultdict(int)
+        self._order: List[str] = []
+        self.started = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def _thread_profile(self, name: str) -> cProfile.Profile:
+        """Profil etapu dla bieżącego wątku (cProfile działa per wątek)."""
+        profiles = self._local.__dict__.setdefault("profiles", {})
+        prof = profiles.get(name)
+        if prof is None:
+            prof = profiles[name] = cProfile.Profile()
+            with self._lock:
+                self._profiles[name].append(prof)
+                if name not in self._order:
+                    self._order.append(name)
+        return prof
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if getattr(self._local, "current", None) is not None:
+            yield
+            return
+        prof = self._thread_profile(name)
+        main_thread = threading.current_thread() is threading.main_thread()
+        if main_thread:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._local.current = name
+        started = time.perf_counter()
+        try:
+            prof.enable()
+        except ValueError:
+            # inny profiler już działa (np. uruchomienie pod `python -m cProfile`)
+            prof = None
+        try:
+            yield
+        finally:
+            if prof is not None:
+                prof.disable()
+            elapsed = time.perf_counter() - started
+            self._local.current = None
+            with self._lock:
+                self._calls[name] += 1
+                self._seconds[name] += elapsed
+                if main_thread:
+                    peak = tracemalloc.get_traced_memory()[1] - base
+                    self._peaks[name] = max(self._peaks[name], peak)
+
+    # --- wyjście ---------------------------------------------------------
+
+    def _stats(self, name: str) -> Optional[pstats.Stats]:
+        profiles = [p for p in self._profiles[name] if p.getstats()]
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for prof in profiles[1:]:
+            stats.add(prof)
+        return stats
+
+    def summary_text(self) -> str:
+        out = io.StringIO()
+        total = time.perf_counter() - self.started
+        out.write(f"Profile of {self.component}: {total:.2f}s wall clock\n")
+        for name in self._order:
+            out.write(f"\n=== {name}: {self._seconds[name]:.3f}s in {self._calls[name]} calls")
+            if name in self._peaks:
+                out.write(f", peak +{self._peaks[name] / 2**20:.1f} MiB")
+            out.write(" ===\n")
+            stats = self._stats(name)
+            if stats is None:
+                out.write("  (no profile data)\n")
+                continue
+            stats.stream = out
+            stats.sort_stats(pstats.SortKey.TIME, pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        return out.getvalue()
+
+    def close(self) -> None:
+        """Zapisuje .prof każdego etapu i podsumowanie; wyłącza tracemalloc."""
+        global _active
+        if _active is self:
+            _active = None
+        os.makedirs(self.profile_dir, exist_ok=True)
+        for name in self._order:
+            stats = self._stats(name)
+            if stats is not None:
+                stats.dump_stats(os.path.join(self.profile_dir, f"{self.component}-{name}.prof"))
+        summary_path = os.path.join(self.profile_dir, f"{self.component}-summary.txt")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(self.summary_text())
+        tracemalloc.stop()
+
+        print(f"\nProfile ({self.component}):")
+        for name in self._order:
+            peak = f", peak +{self._peaks[name] / 2**20:.1f} MiB" if name in self._peaks else ""
+            print(f"  {name:<10} {self._seconds[name]:8.3f}s  {self._calls[name]:5d} calls{peak}")
+        print(f"Hot functions per stage: {summary_path}")
+
+
+def start_profiling(component: str, profile_dir: str) -> Optional[StageProfiler]:
+    """Włącza profiler dla procesu; profile_dir="" – profilowanie wyłączone (None)."""
+    global _active
+    if not profile_dir:
+        return None
+    _active = StageProfiler(component, profile_dir)
+    return _active
+
+
+def stage(name: str):
+    """Context manager etapu: profiluje, jeśli profiler jest aktywny."""
+    if _active is None:
+        return _NULL
+    return _active.stage(name)
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser, note: str = "") -> None:
+    """note: dopisek do --help, np. co skrypt robi inaczej podczas profilowania."""
+    parser.add_argument("--profile", action="store_true",
+                        help="profile each stage (cProfile + tracemalloc)" + (f"; {note}" if note else ""))
+    parser.add_argument("--profile-dir", default=PROFILE_DIR,
+                        help="where to write the .prof files and the hot-function summary")
+
+
+def profile_options(args: argparse.Namespace) -> Dict:
+    return {"profile_dir": args.profile_dir if args.profile else ""}
@@ -0,0 +1,192 @@
+# registry.py
+"""
+Wspólny rejestr szkół dla wszystkich scraperów.
+
+Dane siedzą w schools.json (jedna szkoła = jedna linia):
+  - school_name, conference,
+  - roster_url_template / staff_url_template (z {year} albo bez),
+  - opcjonalny "layout" – wymuszenie parsera rosteru ("view2-table",
+    "accessible-list", "embedded-json"); domyślnie layout wykrywa layout.py.
+
+Dodanie nowej szkoły to dopisanie jednej linii do schools.json.
+Kolejność linii to kolejność szkół w plikach zbiorczych – taka jak dawniej
+BASE_SCHOOLS w scrape_rosters.py (staff ma teraz tę samą kolejność).
+
+Macierz (school, season) można:
+  - rozszerzyć o inne sezony (--years 2016-2025),
+  - podzielić na rozłączne shardy (--shard i/n) – przydział zależy tylko od
+    sha1("school|season"), więc jest taki sam na każdej maszynie i przy
+    każdym uruchomieniu; shardy zapisują własne pliki zbiorcze
+    (*.shard-i-of-n.jsonl), które łączy merge_shards.py.
+
+--base-url http://127.0.0.1:8765 kieruje crawl na lokalny serwer testowy
+(benchmarks/mock_sidearm_server.py): każdy host szkoły dostaje własny port
+(bazowy + pozycja hosta na posortowanej liście), ścieżki zostają bez zmian.
+Dzięki temu limity i sesje per host działają tak jak na prawdziwych stronach.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse, urlunparse
+
+REGISTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schools.json")
+
+
+def load_registry(path: str = REGISTRY_PATH) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data.get("schools"), list):
+        raise ValueError(f"{path}: expected a 'schools' list")
+    return data
+
+
+def _format_for_year(template: Optional[str], year: int, first_year: int):
+    """
+    Zwraca (url, ok). Jeśli szablon nie ma {year}, adres jest tylko dla
+    pierwszego roku z YEARS (tak jak wcześniej w obu scraperach).
+    """
+    if not template:
+        return None, True
+    if "{year}" in template:
+        return template.format(year=year), True
+    if year != first_year:
+        return None, False
+    return template, True
+
+
+def expand_schools(base_schools: List[Dict], years: List[int]) -> List[Dict]:
+    """Rozwija szablony na listę wpisów (school, season) z gotowymi URL-ami."""
+    schools: List[Dict] = []
+    for base in base_schools:
+        for year in years:
+            roster_url, roster_ok = _format_for_year(base["roster_url_template"], year, years[0])
+            staff_url, staff_ok = _format_for_year(base.get("staff_url_template"), year, years[0])
+            if not (roster_ok and staff_ok):
+                continue
+            schools.append(
+                {
+                    "school_name": base["school_name"],
+                    "conference": base["conference"],
+                    "season_year": year,
+                    "roster_url": roster_url,
+                    "staff_url": staff_url,
+                    "layout": base.get("layout", ""),
+                }
+            )
+    return schools
+
+
+def school_hosts(base_schools: List[Dict]) -> List[str]:
+    """Posortowane hosty ze wszystkich szablonów URL (kolejność = porty serwera testowego)."""
+    hosts = set()
+    for base in base_schools:
+        for key in ("roster_url_template", "staff_url_template"):
+            if base.get(key):
+                hosts.add(urlparse(base[key]).netloc.lower())
+    return sorted(hosts)
+
+
+def rebase_url(url: Optional[str], base_url: str, hosts: List[str]) -> Optional[str]:
+    """https://seminoles.com/sports/... -> http://127.0.0.1:<port hosta>/sports/..."""
+    if not url:
+        return url
+    base = urlparse(base_url)
+    parsed = urlparse(url)
+    port = (base.port or 80) + hosts.index(parsed.netloc.lower())
+    return urlunparse(parsed._replace(scheme=base.scheme, netloc=f"{base.hostname}:{port}"))
+
+
+def rebase_schools(schools: List[Dict], base_url: str,
+                   hosts: Optional[List[str]] = None) -> List[Dict]:
+    hosts = school_hosts(BASE_SCHOOLS) if hosts is None else hosts
+    return [dict(cfg, roster_url=rebase_url(cfg["roster_url"], base_url, hosts),
+                 staff_url=rebase_url(cfg["staff_url"], base_url, hosts)) for cfg in schools]
+
+
+def parse_years(spec: str) -> List[int]:
+    """'2016-2025', '2024,2025' albo mieszanka: '2016-2018,2021'."""
+    years: List[int] = []
+    for part in spec.split(","):
+        part = part.strip()
+        m = re.fullmatch(r"(\d{4})\s*-\s*(\d{4})", part)
+        if m:
+            first, last = int(m.group(1)), int(m.group(2))
+            if first > last:
+                raise ValueError(f"bad year range {part!r}")
+            years.extend(range(first, last + 1))
+        elif re.fullmatch(r"\d{4}", part):
+            years.append(int(part))
+        else:
+            raise ValueError(f"bad year {part!r}: expected YYYY or YYYY-YYYY")
+    return sorted(set(years))
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """'i/n' -> (i, n); shardy numerujemy od 1 do n."""
+    m = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", spec)
+    if not m:
+        raise ValueError(f"bad shard {spec!r}: expected i/n, e.g. 1/4")
+    index, count = int(m.group(1)), int(m.group(2))
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"bad shard {spec!r}: need 1 <= i <= n")
+    return index, count
+
+
+def shard_of(cfg: Dict, count: int) -> int:
+    """Stabilny numer shardu (1..count) dla wpisu (school, season)."""
+    key = f"{cfg['school_name']}|{cfg['season_year']}".encode("utf-8")
+    return int.from_bytes(hashlib.sha1(key).digest()[:8], "big") % count + 1
+
+
+def select_shard(schools: List[Dict], shard: Optional[Tuple[int, int]]) -> List[Dict]:
+    if shard is None:
+        return list(schools)
+    index, count = shard
+    return [cfg for cfg in schools if shard_of(cfg, count) == index]
+
+
+def shard_path(path: str, shard: Optional[Tuple[int, int]]) -> str:
+    """all_schools_ontology.jsonl -> all_schools_ontology.shard-2-of-4.jsonl"""
+    if shard is None or not path:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard-{shard[0]}-of-{shard[1]}{ext}"
+
+
+def add_matrix_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--years", default="",
+                        help="seasons to crawl, e.g. 2016-2025 or 2024,2025 (default: schools.json)")
+    parser.add_argument("--shard", default="",
+                        help="crawl only slice i of n of the (school, season) matrix, e.g. 1/4")
+    parser.add_argument("--school", default="",
+                        help="only schools whose name contains this text (case-insensitive)")
+    parser.add_argument("--base-url", default="",
+                        help="send requests to a local mock server instead, e.g. http://127.0.0.1:8765")
+
+
+def matrix_options(args: argparse.Namespace) -> Dict:
+    """Zamienia --years / --shard / --school / --base-url na kwargs dla main(): schools + shard."""
+    try:
+        years = parse_years(args.years) if args.years else YEARS
+        shard = parse_shard(args.shard) if args.shard else None
+    except ValueError as e:
+        raise SystemExit(f"error: {e}")
+    schools = SCHOOLS if years == YEARS else expand_schools(BASE_SCHOOLS, years)
+    if args.school:
+        needle = args.school.lower()
+        schools = [cfg for cfg in schools if needle in cfg["school_name"].lower()]
+        if not schools:
+            raise SystemExit(f"error: no school matching {args.school!r} in the registry")
+    if args.base_url:
+        schools = rebase_schools(schools, args.base_url)
+    return {"schools": select_shard(schools, shard), "shard": shard}
+
+
+_REGISTRY = load_registry()
+
+YEARS: List[int] = list(_REGISTRY.get("years", []))
+BASE_SCHOOLS: List[Dict] = _REGISTRY["schools"]
+SCHOOLS: List[Dict] = expand_schools(BASE_SCHOOLS, YEARS)
@@ -0,0 +1,99 @@
+# reparse.py
+"""
+Tryb "reparse": odbudowuje raw_schools/ i raw_staff/ (oraz pliki zbiorcze)
+z archiwum HTML, bez żadnego ruchu sieciowego.
+
+Dla każdego (school, season, kind) bierzemy ostatnio pobraną wersję strony
+z html_archive/manifest.jsonl i puszczamy parser w puli procesów.
+
+Użycie:
+    python scraping/reparse.py              # rostery + staff
+    python scraping/reparse.py --kind roster
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import scrape_rosters
+import scrape_staff
+from html_archive import HtmlArchive, ARCHIVE_DIR
+from ndjson import NdjsonWriter
+from embedded_json import format_tier_summary
+from html_parsing import add_backend_argument, apply_backend_argument
+from registry import SCHOOLS, add_matrix_arguments, matrix_options, shard_path
+
+
+def reparse_roster(school: Dict, entry: Dict, archive_dir: str) -> Optional[Tuple[Dict, str]]:
+    html = HtmlArchive(archive_dir).load(entry["hash"])
+    players, tier, _ = scrape_rosters.parse_roster_for_school(school, html)
+    return scrape_rosters.build_ontology_json_for_school(school, players), tier
+
+
+def reparse_staff(cfg: Dict, entry: Dict, archive_dir: str) -> Optional[Tuple[Dict, str]]:
+    html = HtmlArchive(archive_dir).load(entry["hash"])
+    coaches, support, tier = scrape_staff.parse_staff_page(html)
+    return scrape_staff.build_staff_json_for_school(cfg, coaches, support), tier
+
+
+def _run(kind: str, configs: List[Dict], job, output_path, output_dir: str,
+         all_path: str, archive_dir: str, workers: Optional[int]) -> None:
+    latest = HtmlArchive(archive_dir).latest_entries(kind=kind)
+    # kolejność jak w konfiguracji scrapera, żeby plik zbiorczy wyglądał tak samo
+    entries = []
+    for cfg in configs:
+        entry = latest.get((cfg["school_name"], cfg["season_year"], kind))
+        if entry is not None:
+            entries.append((cfg, entry))
+
+    print(f"Reparsing {len(entries)} archived {kind} pages...")
+    os.makedirs(output_dir, exist_ok=True)
+    tiers = Counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor, NdjsonWriter(all_path) as writer:
+        futures = [executor.submit(job, cfg, entry, archive_dir) for cfg, entry in entries]
+        for (cfg, entry), future in zip(entries, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"  [ERROR] {cfg['school_name']} ({cfg['season_year']}): {e}")
+                continue
+            if result is None:
+                continue
+            school_json, tier = result
+            tiers[tier] += 1
+            writer.write(school_json)
+            with open(output_path(cfg, output_dir), "w", encoding="utf-8") as f:
+                json.dump(school_json, f, indent=2, ensure_ascii=False)
+
+    print("  " + format_tier_summary(tiers))
+    print(f"  Wrote {writer.count} files to {output_dir}/ and {all_path}")
+
+
+def main(kind: str = "all", archive_dir: str = ARCHIVE_DIR, workers: Optional[int] = None,
+         schools: Optional[List[Dict]] = None, shard=None):
+    schools = SCHOOLS if schools is None else schools
+    if kind in ("all", "roster"):
+        _run("roster", schools, reparse_roster,
+             scrape_rosters.roster_output_path, scrape_rosters.OUTPUT_DIR,
+             shard_path(scrape_rosters.ALL_SCHOOLS_PATH, shard), archive_dir, workers)
+    if kind in ("all", "staff"):
+        _run("staff", schools, reparse_staff,
+             scrape_staff.staff_output_path, scrape_staff.OUTPUT_DIR,
+             shard_path(scrape_staff.ALL_STAFF_PATH, shard), archive_dir, workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild raw_schools/ and raw_staff/ from the HTML archive.")
+    parser.add_argument("--kind", choices=["all", "roster", "staff"], default="all")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="parser processes (default: number of CPUs)")
+    add_matrix_arguments(parser)
+    add_backend_argument(parser)
+    args = parser.parse_args()
+    apply_backend_argument(args)
+    main(kind=args.kind, archive_dir=args.archive_dir, workers=args.workers,
+         **matrix_options(args))
@@ -0,0 +1,160 @@
+# resilience.py
+"""
+Odporność pobierania na wolne / padające serwisy szkół (używane przez fetcher.HostPool).
+
+- RetryPolicy     – ponowienia z wykładniczym backoffem i losowym jitterem
+                    ("full jitter"); szanuje nagłówek Retry-After,
+- LatencyTracker  – adaptacyjny timeout per host z obserwowanych czasów odpowiedzi
+                    (wygładzona średnia + 4 × odchylenie, jak RTO w TCP),
+- CircuitBreaker  – po serii błędów host jest "otwarty" (requesty od razu dostają
+                    CircuitOpen) przez `cooldown` sekund; potem jeden request
+                    próbny decyduje, czy host wraca, czy breaker otwiera się znowu.
+"""
+import email.utils
+import random
+import threading
+import time
+from typing import Optional
+
+import requests
+
+MAX_RETRIES = 3           # ponowienia po pierwszej próbie
+BACKOFF_BASE = 1.0        # s – górna granica pierwszego opóźnienia
+BACKOFF_MAX = 30.0        # s – maksymalne opóźnienie pojedynczego ponowienia
+MAX_RETRY_AFTER = 120.0   # s – dłuższe Retry-After: nie czekamy w wątku, tylko otwieramy breaker
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+MIN_TIMEOUT = 5.0         # s – dolna granica adaptacyjnego timeoutu
+BREAKER_THRESHOLD = 5     # kolejne błędy, po których otwieramy breaker
+BREAKER_COOLDOWN = 60.0   # s – jak długo breaker jest otwarty
+
+
+class CircuitOpen(Exception):
+    """Host jest chwilowo wyłączony przez circuit breaker."""
+
+    def __init__(self, host: str, until: float):
+        super().__init__(f"circuit open for {host} for {max(0.0, until - time.monotonic()):.0f}s")
+        self.host = host
+        self.until = until  # time.monotonic()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After w sekundach (liczba albo data HTTP); None, gdy brak/niepoprawny."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def is_retryable_error(error: Exception) -> bool:
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class RetryPolicy:
+    def __init__(self, max_retries: int = MAX_RETRIES,
+                 base: float = BACKOFF_BASE,
+                 cap: float = BACKOFF_MAX,
+                 max_retry_after: float = MAX_RETRY_AFTER):
+        self.max_retries = max(0, max_retries)
+        self.base = base
+        self.cap = cap
+        self.max_retry_after = max_retry_after
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Opóźnienie przed ponowieniem nr `attempt` (0 = pierwsze ponowienie)."""
+        backoff = random.uniform(0, min(self.cap, self.base * (2 ** attempt)))
+        if retry_after is not None:
+            return max(retry_after, backoff)
+        return backoff
+
+
+class LatencyTracker:
+    """Wygładzony czas odpowiedzi hosta -> timeout dla kolejnych requestów."""
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+
+    def __init__(self, min_timeout: float = MIN_TIMEOUT):
+        self.min_timeout = min_timeout
+        self._lock = threading.Lock()
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            if self.srtt is None:
+                self.srtt = seconds
+                self.rttvar = seconds / 2
+            else:
+                self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - seconds)
+                self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * seconds
+
+    def timeout(self, cap: float, attempt: int = 0) -> float:
+        """
+        Timeout dla próby `attempt`: z pomiarów (nie mniej niż min_timeout),
+        podwajany przy każdym ponowieniu, nigdy powyżej `cap` (timeout scrapera).
+        """
+        with self._lock:
+            if self.srtt is None:
+                return cap
+            estimate = max(self.min_timeout, self.srtt + 4 * self.rttvar)
+        return min(cap, estimate * (2 ** attempt))
+
+
+class CircuitBreaker:
+    def __init__(self, host: str,
+                 threshold: int = BREAKER_THRESHOLD,
+                 cooldown: float = BREAKER_COOLDOWN):
+        self.host = host
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.open_until = 0.0      # time.monotonic(); 0 = zamknięty
+        self._probing = False      # half-open: trwa request próbny
+
+    def before_request(self) -> None:
+        """Rzuca CircuitOpen, jeśli host jest wyłączony (albo trwa request próbny)."""
+        with self._lock:
+            if not self.open_until:
+                return
+            now = time.monotonic()
+            if now < self.open_until or self._probing:
+                raise CircuitOpen(self.host, max(self.open_until, now + 1.0))
+            self._probing = True   # half-open: przepuszczamy jeden request
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.open_until = 0.0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.threshold:
+                self.open_until = time.monotonic() + self.cooldown
+            self._probing = False
+
+    def trip(self, seconds: float) -> None:
+        """Otwiera breaker na co najmniej `seconds` (np. długie Retry-After)."""
+        with self._lock:
+            self.open_until = max(self.open_until, time.monotonic() + seconds)
+            self._probing = False
+
+    def wait_until_closed(self, stop: Optional[threading.Event] = None) -> None:
+        """Czeka do końca okresu otwarcia (do requestu próbnego)."""
+        while True:
+            with self._lock:
+                wait = self.open_until - time.monotonic() if self.open_until else 0.0
+            if wait <= 0 or (stop is not None and stop.is_set()):
+                return
+            time.sleep(min(wait, 0.5))
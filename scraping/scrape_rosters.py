@@ -1,139 +1,34 @@
-import requests
+import argparse
 from bs4 import BeautifulSoup, NavigableString, Tag
 import json
+import re
 from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
 from parse_sidearm_view2_roster import parse_sidearm_roster_view2
+from fetcher import (iter_fetch, add_fetch_arguments, fetch_options, host_of,
+                     MAX_WORKERS, PER_HOST_LIMIT, MIN_HOST_INTERVAL, MAX_RETRIES)
+from http_cache import HttpCache, CACHE_DIR
+from html_archive import HtmlArchive, ARCHIVE_DIR
+from registry import SCHOOLS, add_matrix_arguments, matrix_options, shard_path
+from embedded_json import (extract_roster_from_scripts, format_tier_summary,
+                           TIER_EMBEDDED_JSON, TIER_DOM_LIST, TIER_DOM_TABLE)
+from layout import (LAYOUT_CACHE, LayoutCache, LAYOUT_EMBEDDED_JSON, LAYOUT_VIEW2_TABLE,
+                    normalize_layout, sniff_roster_layout, sniff_dom_layout)
+from html_parsing import make_soup, roster_list_region, add_backend_argument, apply_backend_argument
+from pipeline import (run_pipeline, JobFailed, add_pipeline_arguments, pipeline_options,
+                      PARSE_WORKERS, QUEUE_SIZE)
+from scrape_state import (ScrapeState, state_key, add_state_arguments, state_options,
+                          STATE_PATH)
+from collections import Counter
 import os  # dodaj, jeśli jeszcze nie ma
+import time
+from metrics import MetricsRecorder, add_metrics_arguments, metrics_options, METRICS_DIR
+from ndjson import NdjsonWriter, OrderedWriter
+from entity_ids import player_ids
+import profiling
+from profiling import start_profiling, add_profile_arguments, profile_options
 
 OUTPUT_DIR = "raw_schools"
-
-YEARS = [2024, 2025]
-# ---------- CONFIG: YOUR 20 SCHOOLS ----------
-
-BASE_SCHOOLS = [
-    {
-        "school_name": "Duke University",
-        "conference": "Atlantic Coast Conference (ACC)",
-        "url": "https://goduke.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "Florida State University",
-        "conference": "Atlantic Coast Conference (ACC)",
-        "url": "https://seminoles.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "NC State University",
-        "conference": "Atlantic Coast Conference (ACC)",
-        "url": "https://gopack.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "University of Louisville",
-        "conference": "Atlantic Coast Conference (ACC)",
-        "url": "https://gocards.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "University of North Carolina",
-        "conference": "Atlantic Coast Conference (ACC)",
-        "url": "https://goheels.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "Cal Poly (California Polytechnic State University)",
-        "conference": "Big West Conference",
-        "url": "https://gopoly.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "CSUN (California State University, Northridge)",
-        "conference": "Big West Conference",
-        "url": "https://gomatadors.com/sports/baseball/roster/{year}",
-    },
-
-    # --- TU ZACZYNAJĄ SIĘ 4 SZKOŁY ZE SPECJALNYM PARSEREM (VIEW2) ---
-    {
-        "school_name": "Cal State Fullerton (California State University, Fullerton)",
-        "conference": "Big West Conference",
-        "url": "https://fullertontitans.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "UC Santa Barbara (University of California, Santa Barbara)",
-        "conference": "Big West Conference",
-        "url": "https://ucsbgauchos.com/sports/baseball/roster/{year}?view=2",
-    },
-    {
-        "school_name": "University of Evansville",
-        "conference": "Missouri Valley Conference (MVC)",
-        "url": "https://gopurpleaces.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "Wichita State University",
-        "conference": "Missouri Valley Conference (MVC)",
-        "url": "https://goshockers.com/sports/baseball/roster/{year}",
-    },
-    # --- KONIEC 4 SPECJALNYCH ---
-
-    {
-        "school_name": "Creighton University",
-        "conference": "Missouri Valley Conference (MVC)",
-        "url": "https://gocreighton.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "Murray State University",
-        "conference": "Missouri Valley Conference (MVC)",
-        "url": "https://goracers.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "Oregon State University",
-        "conference": "Pac-12 Conference",
-        "url": "https://osubeavers.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "UCLA (University of California, Los Angeles)",
-        "conference": "Pac-12 Conference",
-        "url": "https://uclabruins.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "University of Washington",
-        "conference": "Pac-12 Conference",
-        "url": "https://gohuskies.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "Mississippi State University",
-        "conference": "Southeastern Conference (SEC)",
-        "url": "https://hailstate.com/sports/baseball/roster/{year}",
-    },
-    {
-        "school_name": "University of Tennessee",
-        "conference": "Southeastern Conference (SEC)",
-        "url": "https://utsports.com/sports/baseball/roster/{year}",
-    },
-]
-
-SCHOOLS = []
-
-for base in BASE_SCHOOLS:
-    tmpl = base["url"]          # 👈 WAŻNE: 'url', nie 'url_template'
-
-    # jeśli URL ma {year} → generujemy wpis dla każdego roku
-    if "{year}" in tmpl:
-        for year in YEARS:
-            SCHOOLS.append(
-                {
-                    "school_name": base["school_name"],
-                    "conference": base["conference"],
-                    "url": tmpl.format(year=year),
-                    "season_year": year,
-                }
-            )
-    else:
-        # brak {year} w URL → używamy tylko pierwszego roku z YEARS
-        year = YEARS[0]
-        SCHOOLS.append(
-            {
-                "school_name": base["school_name"],
-                "conference": base["conference"],
-                "url": tmpl,
-                "season_year": year,
-            }
-        )
+ALL_SCHOOLS_PATH = "all_schools_ontology.jsonl"   # NDJSON, jedna drużyna na linię
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; ZuzannaScraper/1.0)"
@@ -154,11 +49,6 @@ def ensure_view2(url: str) -> str:
         return urlunparse(parsed)
     return url
 
-def fetch_html(url: str) -> str:
-    resp = requests.get(url, headers=HEADERS, timeout=20)
-    resp.raise_for_status()
-    return resp.text
-
 def normalize_space(s):
     if not s:
         return ""
@@ -166,7 +56,20 @@ def normalize_space(s):
 
 # ---------- PARSING HELPERS FOR TEXT BLOCKS ----------
 
-from bs4 import BeautifulSoup, NavigableString, Tag
+# Wzorce kompilujemy raz, na poziomie modułu.
+# Tekst po 'Position': [pozycja] Academic Year [rok] Height [wzrost] Weight [waga + reszta]
+# (każda część opcjonalna, zawsze do PIERWSZEGO wystąpienia słowa-klucza – jak str.split(kw, 1))
+POS_BLOCK_RE = re.compile(
+    r"Position(?:(?P<position>.*?)Academic Year)?(?:(?P<class_year>.*?)Height)?"
+    r"(?:(?P<height>.*?)Weight(?P<rest>.*))?",
+    re.S,
+)
+HOME_BLOCK_RE = re.compile(r"Hometown(?:(?P<hometown>.*?)Last School(?P<last_school>.*)|(?P<only>.*))", re.S)
+
+# segmenty w tekście bloku zawodnika: od 'Position' / 'Hometown' do najbliższego znacznika końca
+POS_SEGMENT_RE = re.compile(r"Position.*?(?=Hometown|Full Bio for|Expand for more info about|\Z)", re.S)
+HOME_SEGMENT_RE = re.compile(r"Hometown.*?(?=Full Bio for|Expand for more info about|\Z)", re.S)
+
 
 def parse_pos_block(text: str):
     """
@@ -176,24 +79,16 @@ def parse_pos_block(text: str):
     position = class_year = height = weight = ""
     bats_throws = ""  # np. "R/R", "L/R" itd.
 
-    if "Position" not in text:
+    m = POS_BLOCK_RE.search(text)
+    if not m:
         return position, class_year, height, weight, bats_throws
 
-    part = text.split("Position", 1)[1].strip()
-
-    if "Academic Year" in part:
-        position, part = part.split("Academic Year", 1)
-        position = position.strip()
-        part = part.strip()
-
-    if "Height" in part:
-        class_year, part = part.split("Height", 1)
-        class_year = class_year.strip().rstrip(".")
-        part = part.strip()
+    position = (m.group("position") or "").strip()
+    class_year = (m.group("class_year") or "").strip().rstrip(".")
 
-    if "Weight" in part:
-        height, rest = part.split("Weight", 1)
-        height = height.strip()
+    if m.group("rest") is not None:
+        height = m.group("height").strip()
+        rest = m.group("rest")
 
         # spróbuj wyciągnąć R/R z fragmentu po "Custom Field"
         if "Custom Field" in rest:
@@ -218,125 +113,104 @@ def parse_home_block(text: str):
     Przykład:
     'Hometown Jackson, Tenn.Last School Memphis'
     """
-    hometown = last_school = ""
+    m = HOME_BLOCK_RE.search(text)
+    if not m:
+        return "", ""
 
-    if "Hometown" not in text:
-        return hometown, last_school
+    if m.group("only") is not None:
+        return m.group("only").strip(), ""
+    return m.group("hometown").strip(), m.group("last_school").strip()
 
-    part = text.split("Hometown", 1)[1].strip()
 
-    if "Last School" in part:
-        hometown, rest = part.split("Last School", 1)
-        hometown = hometown.strip()
-        last_school = rest.strip()
-    else:
-        hometown = part.strip()
+def parse_player_block(jersey_text: str, full_name: str, block_parts):
+    """
+    Z tekstu jednego bloku zawodnika (od 'Jersey Number' do następnego)
+    wyciąga: numer, imię, position/class/height/weight, hometown/last school.
+    """
+    jersey = jersey_text.split()[-1]  # 'Jersey Number 24' -> '24'
+    block_text = " ".join(block_parts)
 
-    return hometown, last_school
+    # wyciągamy segment z Position... i Hometown...
+    m = POS_SEGMENT_RE.search(block_text)
+    pos_segment = m.group(0).strip() if m else ""
+    m = HOME_SEGMENT_RE.search(block_text)
+    home_segment = m.group(0).strip() if m else ""
 
+    position, class_year, height, weight, bats_throws = parse_pos_block(pos_segment)
+    hometown, last_school = parse_home_block(home_segment)
 
-def parse_player_from_jersey_anchor(jersey_anchor: Tag):
-    """
-    Dostaje <a>Jersey Number 24</a> i:
-      - bierze numer koszulki,
-      - z całej sekwencji elementów aż do następnego 'Jersey Number' składa tekst,
-      - wyciąga imię, position/class/height/weight, hometown/last school.
+    return {
+        "full_name": full_name,
+        "jersey": jersey,
+        "position": position,
+        "class_year": class_year,
+        "height": height,
+        "weight": weight,
+        "hometown": hometown,
+        "last_school": last_school,
+        "bats_throws": bats_throws,  # << NOWE POLE
+    }
+
+
+def segment_roster_blocks(soup: BeautifulSoup):
     """
-    # 1) numer
-    jersey_text = normalize_space(jersey_anchor.get_text(" ", strip=True))
-    jersey = jersey_text.split()[-1]  # '24'
+    Jeden przebieg po całym dokumencie (w kolejności DOM), dzielący go na bloki
+    zawodników. Każdy blok zaczyna się od linku 'Jersey Number NN' i kończy na
+    następnym takim linku albo na tekście 'Coaching Staff'.
 
-    full_name = ""
-    block_parts = []
+    Zwraca listę (jersey_text, full_name, block_parts), gdzie:
+      - full_name: pierwszy "normalny" link po numerze,
+      - block_parts: teksty linków i węzłów tekstowych bloku, po kolei.
+    """
+    blocks = []
+    current = None  # [jersey_text, full_name, block_parts]
 
-    # 2) iterujemy przez wszystkie kolejne elementy w DOM,
-    #    dopóki nie trafimy na kolejny 'Jersey Number' albo 'Coaching Staff'
-    for elem in jersey_anchor.next_elements:
-        if isinstance(elem, Tag) and elem.name == "a":
+    for elem in soup.descendants:
+        if isinstance(elem, Tag):
+            if elem.name != "a":
+                continue
             t = normalize_space(elem.get_text(" ", strip=True))
 
             if t.startswith("Jersey Number"):
-                # kolejny zawodnik -> koniec naszego bloku
-                break
+                # kolejny zawodnik -> nowy blok
+                current = [t, "", []]
+                blocks.append(current)
+                continue
+            if current is None:
+                continue
 
             # imię i nazwisko – pierwszy "normalny" link po jersey
-            if not full_name and not t.startswith("Full Bio for") and not t.startswith("Expand for more info"):
-                full_name = t
-                block_parts.append(t)
-                continue
+            if not current[1] and not t.startswith("Full Bio for") and not t.startswith("Expand for more info"):
+                current[1] = t
 
             # resztę anchorów też dorzucamy do tekstu (może się przyda)
-            block_parts.append(t)
+            current[2].append(t)
 
         elif isinstance(elem, NavigableString):
+            if current is None:
+                continue
             t = normalize_space(str(elem))
             if not t:
                 continue
             if "Coaching Staff" in t:
                 # koniec listy zawodników
-                break
-            block_parts.append(t)
-
-    block_text = " ".join(block_parts)
-
-    # 3) wyciągamy segment z Position... i Hometown...
-    pos_segment = ""
-    home_segment = ""
-
-    if "Position" in block_text:
-        start = block_text.find("Position")
-        end_candidates = []
-        for kw in ["Hometown", "Full Bio for", "Expand for more info about"]:
-            idx = block_text.find(kw, start)
-            if idx != -1:
-                end_candidates.append(idx)
-        end = min(end_candidates) if end_candidates else len(block_text)
-        pos_segment = block_text[start:end].strip()
-
-    if "Hometown" in block_text:
-        start = block_text.find("Hometown")
-        end_candidates = []
-        for kw in ["Full Bio for", "Expand for more info about"]:
-            idx = block_text.find(kw, start)
-            if idx != -1:
-                end_candidates.append(idx)
-        end = min(end_candidates) if end_candidates else len(block_text)
-        home_segment = block_text[start:end].strip()
-
-    position, class_year, height, weight, bats_throws = parse_pos_block(pos_segment)
-    hometown, last_school = parse_home_block(home_segment)
-
-    return {
-        "full_name": full_name,
-        "jersey": jersey,
-        "position": position,
-        "class_year": class_year,
-        "height": height,
-        "weight": weight,
-        "hometown": hometown,
-        "last_school": last_school,
-        "bats_throws": bats_throws,  # << NOWE POLE
-    }
+                current = None
+                continue
+            current[2].append(t)
 
+    return blocks
 
 
 def parse_sidearm_roster_accessible(soup: BeautifulSoup):
     """
-    Główna funkcja: znajduje wszystkie 'Jersey Number X' i dla każdego
-    wyciąga pełny blok zawodnika.
+    Główna funkcja: dzieli stronę na bloki 'Jersey Number X' (jeden przebieg)
+    i z każdego wyciąga pełne dane zawodnika.
     """
     players = []
-    anchors = soup.find_all("a")
-
-    for a in anchors:
-        txt = normalize_space(a.get_text(" ", strip=True))
-        if not txt.startswith("Jersey Number"):
-            continue
-
-        player = parse_player_from_jersey_anchor(a)
+    for jersey_text, full_name, block_parts in segment_roster_blocks(soup):
         # wymagamy przynajmniej imienia
-        if player["full_name"]:
-            players.append(player)
+        if full_name:
+            players.append(parse_player_block(jersey_text, full_name, block_parts))
 
     # deduplikacja (na wszelki wypadek)
     unique = {}
@@ -348,8 +222,14 @@ def parse_sidearm_roster_accessible(soup: BeautifulSoup):
     return list(unique.values())
 
 
-def parse_sidearm_roster(html: str):
-    soup = BeautifulSoup(html, "html.parser")
+def parse_sidearm_roster(html: str, backend=None, restrict: bool = True):
+    """
+    restrict=True  -> budujemy drzewo tylko z fragmentu z listą zawodników,
+    restrict=False -> stara ścieżka: cały dokument.
+    """
+    if restrict:
+        html = roster_list_region(html)
+    soup = make_soup(html, backend)
 
     # na razie pomijamy <table>, bo i tak wszystkie te rostery są w trybie listy
     players = parse_sidearm_roster_accessible(soup)
@@ -398,8 +278,8 @@ def build_ontology_json_for_school(school_cfg, players):
         "PLAYS_FOR": [],
     }
 
-    for idx, p in enumerate(players, start=1):
-        player_id = f"{team_id}_player_{idx}"
+    # id z nazwiska i numeru (entity_ids.py) – nie przesuwa się, gdy ktoś dojdzie/odejdzie
+    for player_id, p in zip(player_ids(team_id, players), players):
         node_player = {
             "playerId": player_id,
             "fullName": p.get("full_name", ""),
@@ -427,72 +307,284 @@ def build_ontology_json_for_school(school_cfg, players):
         "Relationships": relationships,
     }
 
-# ---------- MAIN DRIVER ----------
+# ---------- PARSER SELECTION / OUTPUT ----------
 
-def main():
-    all_schools_data = []
+def _parse_with_layout(layout: str, html: str):
+    if layout == LAYOUT_EMBEDDED_JSON:
+        players = extract_roster_from_scripts(html)
+        if players:
+            return players, TIER_EMBEDDED_JSON
+        # payload był, ale bez zawodników – wracamy do DOM
+        layout = sniff_dom_layout(html)
+    if layout == LAYOUT_VIEW2_TABLE:
+        # parser 2 – layout tabelowy view=2
+        return parse_sidearm_roster_view2(html), TIER_DOM_TABLE
+    # parser 1 – klasyczny layout sidearm z 'Jersey Number ...' (także gdy layout nieznany)
+    return parse_sidearm_roster(html), TIER_DOM_LIST
 
-    # utwórz katalog na surowe pliki z rosterami
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    # szkoły, które lecą przez parser 2 (parser_sidearm_view2)
-    special_layout_schools = {
-        "Wichita State University",
-        "University of Evansville",
-        "UC Santa Barbara (University of California, Santa Barbara)",
-        "Cal State Fullerton (California State University, Fullerton)",
-    }
+def roster_layout(school_cfg, html: str, layout_cache: LayoutCache = LAYOUT_CACHE) -> str:
+    """
+    Layout strony rosteru, wybierany tak:
+      1) "layout" z schools.json, jeśli ktoś go wpisał ręcznie,
+      2) layout zapamiętany dla hosta,
+      3) sniffer na surowym HTML (layout.py).
+
+    Wołane w głównym procesie (same regexy, tanie) – procesy z puli dostają
+    gotowy layout, więc cache hostów jest jeden na cały przebieg.
+    layout_cache=None: bez cache (zawsze sniffer).
+    """
+    forced = normalize_layout(school_cfg.get("layout"))
+    if forced:
+        return forced
+    cached = layout_cache.get(host_of(school_cfg["roster_url"])) if layout_cache is not None else None
+    return cached or sniff_roster_layout(html)
+
+
+def remember_layout(school_cfg, layout: str, found: bool,
+                    layout_cache: LayoutCache = LAYOUT_CACHE) -> None:
+    """Po sparsowaniu (w głównym procesie): layout, który dał zawodników, zostaje dla hosta."""
+    if normalize_layout(school_cfg.get("layout")):
+        return
+    host = host_of(school_cfg["roster_url"])
+    if found:
+        layout_cache.set(host, layout)
+    else:
+        layout_cache.forget(host)
 
-    for school in SCHOOLS:
-        print(f"\n=== {school['school_name']} ===")
-        roster_url = ensure_view2(school["url"])
-        print(f"Fetching: {roster_url}")
-
-        try:
-            html = fetch_html(roster_url)
-        except Exception as e:
-            print(f"  [ERROR] Failed to fetch {roster_url}: {e}")
-            continue
-
-        # WYBÓR PARSERA: 1 (jersey) albo 2 (view2)
-        if school["school_name"] in special_layout_schools:
-            # parser 2 – obsługa trudniejszych layoutów (Wichita, Evansville, UCSB, Fullerton)
-            players = parse_sidearm_roster_view2(html)
-        else:
-            # parser 1 – klasyczny layout sidearm z 'Jersey Number ...'
-            players = parse_sidearm_roster(html)
-
-        print(f"  Parsed {len(players)} players")
-
-        # quick debug: print first 3 players
-        for p in players[:3]:
-            print(
-                "   -",
-                p.get("jersey", ""),
-                p.get("full_name", ""),
-                "| pos:", p.get("position", ""),
-                "| class:", p.get("class_year", ""),
-                "| h:", p.get("height", ""),
-                "| htwn:", p.get("hometown", ""),
-            )
 
+def parse_roster_for_school(school_cfg, html: str, layout=None):
+    """
+    Zwraca (players, tier, layout) – tier mówi, którym sposobem wyciągnęliśmy
+    dane, layout – którego parsera faktycznie użyliśmy.
+
+    `layout` to wynik roster_layout (None = sniffer na tej stronie, bez cache).
+    Jeśli layout z cache hosta nie dał zawodników, sniffujemy jeszcze raz –
+    host mógł zmienić layout.
+    """
+    if layout is None:
+        layout = roster_layout(school_cfg, html, layout_cache=None)
+    players, tier = _parse_with_layout(layout, html)
+    if players or normalize_layout(school_cfg.get("layout")):
+        return players, tier, layout
+    fresh = sniff_roster_layout(html)
+    if fresh == layout:
+        return players, tier, layout
+    players, tier = _parse_with_layout(fresh, html)
+    return players, tier, fresh
+
+
+def roster_page_url(school_cfg) -> str:
+    return ensure_view2(school_cfg["roster_url"])
+
+
+def roster_output_path(school_cfg, output_dir: str = OUTPUT_DIR) -> str:
+    safe_name = school_cfg["school_name"].replace(" ", "_").replace("/", "_")
+    filename = f"{safe_name.lower()}_baseball_{school_cfg['season_year']}_ontology.json"
+    return os.path.join(output_dir, filename)
+
+
+# ---------- MAIN DRIVER ----------
+
+def parse_roster_job(school, html: str, layout=None):
+    """
+    Część CPU jednej strony (uruchamiana też w puli procesów):
+    parser + budowa JSON-a. Zwraca (school_json, tier, użyty layout, 3 pierwsze
+    rekordy do logu, liczba zawodników, czasy etapów {"parse": s, "build": s}).
+
+    `layout` wylicza roster_layout w głównym procesie; None = wylicz tutaj
+    (parsowanie w tym samym procesie, np. worker.py albo --parse-workers 0).
+    """
+    if layout is None:
+        layout = roster_layout(school, html)
+    t0 = time.perf_counter()
+    with profiling.stage("parse"):
+        players, tier, layout = parse_roster_for_school(school, html, layout)
+    t1 = time.perf_counter()
+    with profiling.stage("build"):
         school_json = build_ontology_json_for_school(school, players)
-        all_schools_data.append(school_json)
+    timings = {"parse": t1 - t0, "build": time.perf_counter() - t1}
+    return school_json, tier, layout, players[:3], len(players), timings
+
+
+def finish_roster_page(school, roster_url, result, tiers=None, metrics=None):
+    """
+    Loguje i zapisuje wynik parse_roster_job do raw_schools/.
+    `result` może być wyjątkiem (błąd pobierania albo JobFailed z parsera).
+    Zwraca JSON szkoły albo None.
+    """
+    print(f"\n=== {school['school_name']} ===")
+    print(f"Fetching: {roster_url}")
+
+    if isinstance(result, JobFailed):
+        print(f"  [ERROR] Failed to parse {roster_url}: {result}")
+        return None
+    if isinstance(result, Exception) or result is None:
+        print(f"  [ERROR] Failed to fetch {roster_url}: {result}")
+        return None
+
+    school_json, tier, layout, preview, n_players, timings = result
+    remember_layout(school, layout, n_players > 0)
+    if tiers is not None:
+        tiers[tier] += 1
+    labels = {"school": school["school_name"], "season": school["season_year"]}
+    if metrics is not None:
+        metrics.record("parse", timings["parse"], tier=tier, records=n_players, **labels)
+        metrics.record("build", timings["build"], records=n_players, **labels)
+
+    print(f"  Parsed {n_players} players [{tier}]")
+
+    # quick debug: print first 3 players
+    for p in preview:
+        print(
+            "   -",
+            p.get("jersey", ""),
+            p.get("full_name", ""),
+            "| pos:", p.get("position", ""),
+            "| class:", p.get("class_year", ""),
+            "| h:", p.get("height", ""),
+            "| htwn:", p.get("hometown", ""),
+        )
 
-        # ---- ZMIANA TUTAJ: zapis do katalogu raw_schools ----
-        safe_name = school["school_name"].replace(" ", "_").replace("/", "_")
-        filename = f"{safe_name.lower()}_baseball_{school['season_year']}_ontology.json"
-        out_path = os.path.join(OUTPUT_DIR, filename)
+    # ---- ZMIANA TUTAJ: zapis do katalogu raw_schools ----
+    out_path = roster_output_path(school)
 
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(school_json, f, indent=2, ensure_ascii=False)
-        print(f"  Saved to {out_path}")
+    t0 = time.perf_counter()
+    with profiling.stage("serialize"):
+        text = json.dumps(school_json, indent=2, ensure_ascii=False)
+    t1 = time.perf_counter()
+    with profiling.stage("write"), open(out_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    if metrics is not None:
+        metrics.record("serialize", t1 - t0, **labels)
+        metrics.record("write", time.perf_counter() - t1, nbytes=len(text.encode("utf-8")), **labels)
+    print(f"  Saved to {out_path}")
+    return school_json
 
+
+def write_all_schools(all_schools_data, path=ALL_SCHOOLS_PATH):
+    """Plik zbiorczy (NDJSON) z dowolnego iterowalnego źródła – np. generatora po raw_schools/."""
     # plik zbiorczy zostaje w katalogu głównym
-    with open("all_schools_ontology.json", "w", encoding="utf-8") as f:
-        json.dump(all_schools_data, f, indent=2, ensure_ascii=False)
-    print("\nDone. Wrote all_schools_ontology.json")
+    with NdjsonWriter(path) as writer:
+        writer.write_all(all_schools_data)
+    print(f"\nDone. Wrote {path} ({writer.count} teams)")
+
+
+def main(max_workers=MAX_WORKERS,
+         per_host_limit=PER_HOST_LIMIT,
+         min_interval=MIN_HOST_INTERVAL,
+         cache_dir=CACHE_DIR,
+         offline=False,
+         max_age=0.0,
+         archive_dir=ARCHIVE_DIR,
+         max_retries=MAX_RETRIES,
+         parse_workers=PARSE_WORKERS,
+         queue_size=QUEUE_SIZE,
+         state_path=STATE_PATH,
+         full=False,
+         schools=None,
+         shard=None,
+         metrics_dir=METRICS_DIR,
+         profile_dir=""):
+    # schools/shard: wycinek macierzy (school, season) – patrz registry.matrix_options
+    schools = SCHOOLS if schools is None else schools
+    tiers = Counter()
+    metrics = MetricsRecorder("scrape_rosters", metrics_dir)
+    profiler = start_profiling("scrape_rosters", profile_dir)
+    if profiler is not None:
+        parse_workers = 0  # cProfile nie widzi procesów z puli
+    state = ScrapeState(shard_path(state_path, shard), full=full)
+    fingerprints = {}
+    cache = HttpCache(cache_dir) if cache_dir else None
+    archive = HtmlArchive(archive_dir) if archive_dir else None
+
+    # utwórz katalog na surowe pliki z rosterami
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    # pobieranie (wątki) i parsowanie (procesy) idą potokiem: każda strona trafia
+    # do parsera zaraz po pobraniu, a plik szkoły zapisujemy, gdy parser skończy
+    roster_urls = [roster_page_url(school) for school in schools]
+    indexes_by_url = {}
+    for i, url in enumerate(roster_urls):
+        indexes_by_url.setdefault(url, []).append(i)
+    # plik zbiorczy rośnie w trakcie przebiegu, ale w kolejności rejestru (jak przed potokiem)
+    writer = NdjsonWriter(shard_path(ALL_SCHOOLS_PATH, shard))
+    ordered = OrderedWriter(writer)
+
+    def on_fetch(url, seconds, nbytes, source):
+        school = schools[indexes_by_url[url][0]]
+        metrics.record("fetch", seconds, school=school["school_name"],
+                       season=school["season_year"], nbytes=nbytes,
+                       host=host_of(url), outcome=source)
+
+    print(f"Fetching {len(roster_urls)} roster pages "
+          f"(workers={max_workers}, per host={per_host_limit}, "
+          f"parse workers={parse_workers})...")
+
+    def tasks():
+        for url, html in iter_fetch(roster_urls,
+                                    headers=HEADERS,
+                                    timeout=20,
+                                    max_workers=max_workers,
+                                    per_host_limit=per_host_limit,
+                                    min_interval=min_interval,
+                                    cache=cache,
+                                    offline=offline,
+                                    max_age=max_age,
+                                    queue_size=queue_size,
+                                    max_retries=max_retries,
+                                    observer=on_fetch):
+            for i in indexes_by_url[url]:
+                school = schools[i]
+                if isinstance(html, Exception):
+                    finish_roster_page(school, url, html, tiers)
+                    state.done(state_key(school, "roster"), "", "", None)
+                    ordered.put(i)
+                    continue
+                if archive is not None:
+                    archive.record(html, school["school_name"], school["season_year"],
+                                   "roster", url)
+                # strona bez zmian od ostatniego przebiegu – bez parsowania i zapisu
+                kept, fingerprints[i] = state.check(state_key(school, "roster"), html,
+                                                    roster_output_path(school))
+                if kept is not None:
+                    print(f"\n=== {school['school_name']} === unchanged, "
+                          f"kept {roster_output_path(school)}")
+                    ordered.put(i, kept)
+                    continue
+                yield i, (school, html, roster_layout(school, html))
+
+    def on_result(i, result):
+        school = schools[i]
+        school_json = finish_roster_page(school, roster_urls[i], result, tiers, metrics)
+        ordered.put(i, school_json)
+        state.done(state_key(school, "roster"), fingerprints.pop(i),
+                   roster_output_path(school), school_json)
+
+    with writer:
+        run_pipeline(tasks(), parse_roster_job, on_result, parse_workers=parse_workers)
+        ordered.flush()
+
+    state.save()
+    print("\n" + format_tier_summary(tiers))
+    print(state.summary())
+    print(f"\nDone. Wrote {writer.path} ({writer.count} teams)")
+    metrics.close()
+    if profiler is not None:
+        profiler.close()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape NCAA baseball rosters (Sidearm).")
+    add_fetch_arguments(parser)
+    add_pipeline_arguments(parser)
+    add_state_arguments(parser)
+    add_matrix_arguments(parser)
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser, note="parses in the main process")
+    add_backend_argument(parser)
+    args = parser.parse_args()
+    apply_backend_argument(args)
+    main(**fetch_options(args), **pipeline_options(args), **state_options(args),
+         **matrix_options(args), **metrics_options(args),
+         **profile_options(args))
@@ -1,180 +1,45 @@
 # staff_scraper.py
 
+import argparse
 import json
 import os
 import re
+import time
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import List, Dict, Tuple, Optional
+from typing import Iterable, List, Dict, Tuple, Optional
 
-import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urlunparse, parse_qs, urlencode
 
+from fetcher import (iter_fetch, add_fetch_arguments, fetch_options, host_of,
+                     MAX_WORKERS, PER_HOST_LIMIT, MIN_HOST_INTERVAL, MAX_RETRIES)
+from http_cache import HttpCache, CACHE_DIR
+from html_archive import HtmlArchive, ARCHIVE_DIR
+from registry import SCHOOLS, add_matrix_arguments, matrix_options, shard_path
+from embedded_json import (extract_staff_from_scripts, format_tier_summary,
+                           TIER_EMBEDDED_JSON, TIER_DOM_STAFF)
+from pipeline import (run_pipeline, JobFailed, add_pipeline_arguments, pipeline_options,
+                      PARSE_WORKERS, QUEUE_SIZE)
+from scrape_state import (ScrapeState, state_key, add_state_arguments, state_options,
+                          STATE_PATH)
+from metrics import MetricsRecorder, add_metrics_arguments, metrics_options, METRICS_DIR
+from ndjson import NdjsonWriter, OrderedWriter
+from entity_ids import staff_ids
+import profiling
+from profiling import start_profiling, add_profile_arguments, profile_options
+from collections import Counter
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; ZuzannaStaffScraper/1.0)"
 }
 
 OUTPUT_DIR = "raw_staff"
 
-YEARS = [2024, 2025]
-
-# --- 1) KONFIGURACJA SZKÓŁ (SZABLONY URL) ----------------------------------
-
-BASE_SCHOOLS: List[Dict] = [
-    # ACC
-    {
-        "school_name": "Duke University",
-        "conference": "Atlantic Coast Conference (ACC)",
-        "roster_url_template": "https://goduke.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://goduke.com/sports/baseball/coaches/{year}",
-    },
-    {
-        "school_name": "Florida State University",
-        "conference": "Atlantic Coast Conference (ACC)",
-        "roster_url_template": "https://seminoles.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://seminoles.com/sports/baseball/coaches/{year}",
-    },
-    {
-        "school_name": "NC State University",
-        "conference": "Atlantic Coast Conference (ACC)",
-        "roster_url_template": "https://gopack.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://gopack.com/sports/baseball/coaches/{year}",
-    },
-    {
-        "school_name": "University of Louisville",
-        "conference": "Atlantic Coast Conference (ACC)",
-        "roster_url_template": "https://gocards.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://gocards.com/sports/baseball/coaches/{year}",
-    },
-    {
-        "school_name": "University of North Carolina",
-        "conference": "Atlantic Coast Conference (ACC)",
-        "roster_url_template": "https://goheels.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://goheels.com/sports/baseball/coaches/{year}",
-    },
-
-    # Big West
-    {
-        "school_name": "Cal Poly (California Polytechnic State University)",
-        "conference": "Big West Conference",
-        "roster_url_template": "https://gopoly.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://gopoly.com/sports/baseball/coaches/{year}",
-    },
-    {
-        "school_name": "Cal State Fullerton (California State University, Fullerton)",
-        "conference": "Big West Conference",
-        "roster_url_template": "https://fullertontitans.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://fullertontitans.com/sports/baseball/coaches/{year}",
-    },
-    {
-        "school_name": "CSUN (California State University, Northridge)",
-        "conference": "Big West Conference",
-        "roster_url_template": "https://gomatadors.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://gomatadors.com/sports/baseball/coaches/{year}",
-    },
-    {
-        "school_name": "UC Santa Barbara (University of California, Santa Barbara)",
-        "conference": "Big West Conference",
-        "roster_url_template": "https://ucsbgauchos.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://ucsbgauchos.com/sports/baseball/coaches/{year}",
-    },
-
-    # MVC
-    {
-        "school_name": "Creighton University",
-        "conference": "Missouri Valley Conference (MVC)",
-        "roster_url_template": "https://gocreighton.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://gocreighton.com/sports/baseball/coaches/{year}",
-    },
-    {
-        "school_name": "Murray State University",
-        "conference": "Missouri Valley Conference (MVC)",
-        "roster_url_template": "https://goracers.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://goracers.com/sports/baseball/coaches/{year}",
-    },
-    {
-        "school_name": "University of Evansville",
-        "conference": "Missouri Valley Conference (MVC)",
-        "roster_url_template": "https://gopurpleaces.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://gopurpleaces.com/sports/baseball/coaches/{year}",
-    },
-    {
-        "school_name": "Wichita State University",
-        "conference": "Missouri Valley Conference (MVC)",
-        "roster_url_template": "https://goshockers.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://goshockers.com/sports/baseball/coaches/{year}",
-    },
-
-    # Pac-12 / etc.
-    {
-        "school_name": "Oregon State University",
-        "conference": "Pac-12 Conference",
-        "roster_url_template": "https://osubeavers.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://osubeavers.com/sports/baseball/coaches/{year}",
-    },
-    {
-        "school_name": "UCLA (University of California, Los Angeles)",
-        "conference": "Pac-12 Conference",
-        "roster_url_template": "https://uclabruins.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://uclabruins.com/sports/baseball/coaches/{year}",
-    },
-    {
-        "school_name": "University of Washington",
-        "conference": "Pac-12 Conference",
-        "roster_url_template": "https://gohuskies.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://gohuskies.com/sports/baseball/coaches/{year}",
-    },
-
-    # SEC
-    {
-        "school_name": "Mississippi State University",
-        "conference": "Southeastern Conference (SEC)",
-        "roster_url_template": "https://hailstate.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://hailstate.com/sports/baseball/coaches/{year}",
-    },
-    {
-        "school_name": "University of Tennessee",
-        "conference": "Southeastern Conference (SEC)",
-        "roster_url_template": "https://utsports.com/sports/baseball/roster/{year}",
-        "staff_url_template": "https://utsports.com/sports/baseball/coaches/{year}",
-    },
-]
-
-SCHOOLS: List[Dict] = []
-
-for base in BASE_SCHOOLS:
-    roster_t = base["roster_url_template"]
-    staff_t = base.get("staff_url_template")
-
-    for year in YEARS:
-        # roster url
-        if "{year}" in roster_t:
-            roster_url = roster_t.format(year=year)
-        else:
-            # jeśli roster URL nie ma {year}, bierzemy tylko pierwszy rok
-            if year != YEARS[0]:
-                continue
-            roster_url = roster_t
-
-        # staff url
-        staff_url = None
-        if staff_t:
-            if "{year}" in staff_t:
-                staff_url = staff_t.format(year=year)
-            else:
-                if year != YEARS[0]:
-                    continue
-                staff_url = staff_t
+# --- 1) KONFIGURACJA SZKÓŁ ------------------------------------------------
+# lista szkół i szablony URL są w schools.json (patrz registry.py)
 
-        SCHOOLS.append(
-            {
-                "school_name": base["school_name"],
-                "conference": base["conference"],
-                "season_year": year,
-                "roster_url": roster_url,
-                "staff_url": staff_url,
-            }
-        )
+ALL_STAFF_PATH = "all_schools_staff.jsonl"   # NDJSON, jedna drużyna na linię
 
 
 # --- 2) HELPERY HTTP / HTML -------------------------------------------------
@@ -189,12 +54,6 @@ def ensure_view2(url: str) -> str:
     return urlunparse(parsed)
 
 
-def fetch_html(url: str) -> str:
-    resp = requests.get(url, headers=HEADERS, timeout=25)
-    resp.raise_for_status()
-    return resp.text
-
-
 def normalize_space(s: str) -> str:
     if not s:
         return ""
@@ -338,61 +197,93 @@ def parse_staff_generic_block(block) -> List[Tuple[str, str]]:
 
     return staff
 
-def find_email_for_name(soup: BeautifulSoup, name: str) -> str:
-    """Znajdź e-mail powiązany z daną osobą (heurystyka, nie musi działać wszędzie)."""
-    if not name:
-        return ""
-    name_lower = name.lower()
+PHONE_PATTERN = re.compile(r"(\(?\d{3}\)?[-\s.]?\d{3}[-\s.]?\d{4})")
 
-    # 1) Szukamy <a href="mailto:..."> w tym samym bloku, gdzie pojawia się imię
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        if not href.lower().startswith("mailto:"):
-            continue
 
-        # kontener: wiersz tabeli, div, paragraf itd.
-        container = a.find_parent(["tr", "div", "p", "li"]) or a.parent
-        text = container.get_text(" ").lower()
-        if name_lower in text:
-            email = href.split("mailto:", 1)[1]
-            email = email.split("?", 1)[0].strip()
-            return email
-
-    return ""
-
-
-def find_phone_for_name(soup: BeautifulSoup, name: str) -> str:
+class ContactIndex:
     """
-    Znajdź numer telefonu powiązany z daną osobą.
-    Szukamy TYLKO w <tr> (wierszu tabeli), który zawiera jej imię.
-    Dzięki temu nie weźmiemy numeru z innej osoby / sekcji.
+    Indeks kontaktów budowany jednym przebiegiem po dokumencie – zamiast
+    przechodzić dla KAŻDEJ osoby wszystkie linki mailto: / wiersze <tr>
+    i liczyć get_text od nowa.
+
+    Dla każdego kontenera liczymy tekst raz i sklejamy wszystkie teksty w jeden
+    string; szukanie osoby to jedno str.find + bisect (pierwszy kontener w
+    kolejności dokumentu). Wyniki są zapamiętane w słowniku, więc kolejne
+    zapytania o to samo imię to zwykły lookup.
     """
-    if not name:
-        return ""
-    name_lower = name.lower()
-
-    phone_pattern = re.compile(r"(\(?\d{3}\)?[-\s.]?\d{3}[-\s.]?\d{4})")
 
-    # przejdź po wszystkich wierszach tabeli
-    for tr in soup.find_all("tr"):
-        row_text = tr.get_text(" ")
-        if name_lower not in row_text.lower():
-            continue
+    SEPARATOR = "\x00"
 
-        # 1) spróbuj tel: w tym samym <tr>
-        for a in tr.find_all("a", href=True):
+    def __init__(self, soup: BeautifulSoup):
+        # e-maile: kontener najbliższy linkowi mailto: (pierwszy link w kontenerze wygrywa)
+        email_texts: List[str] = []
+        self._emails: List[str] = []
+        seen_containers = set()
+        for a in soup.find_all("a", href=True):
             href = a["href"]
-            if href.lower().startswith("tel:"):
-                phone = href.split("tel:", 1)[1].strip()
-                return phone
-
-        # 2) jeśli nie ma tel:, szukaj wzorca numeru w tekście wiersza
-        m = phone_pattern.search(row_text)
-        if m:
-            return m.group(1).strip()
-
-    return ""
-
+            if not href.lower().startswith("mailto:"):
+                continue
+            container = a.find_parent(["tr", "div", "p", "li"]) or a.parent
+            if id(container) in seen_containers:
+                continue
+            seen_containers.add(id(container))
+            email_texts.append(container.get_text(" ").lower())
+            email = href.split("mailto:", 1)[1]
+            self._emails.append(email.split("?", 1)[0].strip())
+
+        # telefony: tylko wiersze <tr>, w których jest jakiś numer (tel: albo wzorzec)
+        phone_texts: List[str] = []
+        self._phones: List[str] = []
+        for tr in soup.find_all("tr"):
+            row_text = tr.get_text(" ")
+            phone = None
+            for a in tr.find_all("a", href=True):
+                href = a["href"]
+                if href.lower().startswith("tel:"):
+                    phone = href.split("tel:", 1)[1].strip()
+                    break
+            if phone is None:
+                m = PHONE_PATTERN.search(row_text)
+                if m:
+                    phone = m.group(1).strip()
+            if phone is None:
+                continue
+            phone_texts.append(row_text.lower())
+            self._phones.append(phone)
+
+        self._email_blob, self._email_starts = self._join(email_texts)
+        self._phone_blob, self._phone_starts = self._join(phone_texts)
+        self._cache: Dict[str, Tuple[str, str]] = {}
+
+    @classmethod
+    def _join(cls, texts: List[str]) -> Tuple[str, List[int]]:
+        starts = []
+        pos = 0
+        for t in texts:
+            starts.append(pos)
+            pos += len(t) + len(cls.SEPARATOR)
+        return cls.SEPARATOR.join(texts), starts
+
+    @staticmethod
+    def _first_containing(blob: str, starts: List[int], values: List[str], needle: str) -> str:
+        pos = blob.find(needle)
+        if pos == -1:
+            return ""
+        return values[bisect_right(starts, pos) - 1]
+
+    def lookup(self, name: str) -> Tuple[str, str]:
+        """(email, phone) dla danej osoby; puste stringi, gdy nic nie pasuje."""
+        if not name:
+            return "", ""
+        key = name.lower()
+        found = self._cache.get(key)
+        if found is None:
+            found = (
+                self._first_containing(self._email_blob, self._email_starts, self._emails, key),
+                self._first_containing(self._phone_blob, self._phone_starts, self._phones, key),
+            )
+            self._cache[key] = found
+        return found
 
 
 def parse_staff_for_school(html: str) -> Tuple[List[Dict], List[Dict]]:
@@ -441,12 +332,13 @@ def parse_staff_for_school(html: str) -> Tuple[List[Dict], List[Dict]]:
             seen.add(key)
             clean_pairs.append(key)
 
+    contacts = ContactIndex(soup)
+
     for name, title in clean_pairs:
         kind = classify_role(title)
 
-        # 🔹 TU dokładamy wyszukanie e-maila i telefonu
-        email = find_email_for_name(soup, name)
-        phone = find_phone_for_name(soup, name)
+        # 🔹 TU dokładamy wyszukanie e-maila i telefonu (z indeksu, bez ponownego skanu strony)
+        email, phone = contacts.lookup(name)
 
         entry = {
             "fullName": name,
@@ -463,6 +355,21 @@ def parse_staff_for_school(html: str) -> Tuple[List[Dict], List[Dict]]:
     return coaches, support
 
 
+def parse_staff_page(html: str) -> Tuple[List[Dict], List[Dict], str]:
+    """
+    Jak parse_staff_for_school, ale najpierw próbuje JSON-a osadzonego w <script>.
+    Zwraca (coaches, support, tier).
+    """
+    staff = extract_staff_from_scripts(html)
+    if staff:
+        coaches = [s for s in staff if classify_role(s["role"]) == "coach"]
+        support = [s for s in staff if classify_role(s["role"]) != "coach"]
+        return coaches, support, TIER_EMBEDDED_JSON
+
+    coaches, support = parse_staff_for_school(html)
+    return coaches, support, TIER_DOM_STAFF
+
+
 from typing import List, Dict, Tuple
 
 
@@ -487,23 +394,23 @@ def build_staff_json_for_school(cfg: Dict,
         },
         "Coaches": [
             {
-                "coachId": f"{team_id}_coach_{i+1}",
+                "coachId": coach_id,
                 "fullName": c.get("fullName", ""),
                 "role": c.get("role", ""),
                 "email": c.get("email", ""),
                 "phone": c.get("phone", ""),
             }
-            for i, c in enumerate(coaches)
+            for coach_id, c in zip(staff_ids(team_id, "coach", coaches), coaches)
         ],
         "SupportStaff": [
             {
-                "staffId": f"{team_id}_staff_{i+1}",
+                "staffId": staff_id,
                 "fullName": s.get("fullName", ""),
                 "role": s.get("role", ""),
                 "email": s.get("email", ""),
                 "phone": s.get("phone", ""),
             }
-            for i, s in enumerate(support)
+            for staff_id, s in zip(staff_ids(team_id, "staff", support), support)
         ],
     }
 
@@ -511,49 +418,191 @@ def build_staff_json_for_school(cfg: Dict,
 
 # --- 5) MAIN ---------------------------------------------------------------
 
-def main():
-    all_data = []
+def staff_page_url(cfg: Dict) -> str:
+    base_url = cfg["staff_url"] or cfg["roster_url"]
+    url = base_url
+    if "roster" in base_url and "view=" not in base_url:
+        url = ensure_view2(base_url)
+    return url
 
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    
-    for cfg in SCHOOLS:
-        print(f"\n=== {cfg['school_name']} ({cfg['season_year']}) ===")
-        base_url = cfg["staff_url"] or cfg["roster_url"]
-        url = base_url
-        if "roster" in base_url and "view=" not in base_url:
-            url = ensure_view2(base_url)
-
-        print(f"Fetching staff from: {url}")
-        try:
-            html = fetch_html(url)
-        except Exception as e:
-            print(f"  [ERROR] Failed to fetch {url}: {e}")
-            continue
 
-        coaches, support = parse_staff_for_school(html)
+def staff_output_path(cfg: Dict, output_dir: str = OUTPUT_DIR) -> str:
+    safe_name = cfg["school_name"].replace(" ", "_").replace("/", "_")
+    filename = f"{safe_name.lower()}_baseball_{cfg['season_year']}_staff.json"
+    return os.path.join(output_dir, filename)
 
-        print(f"  Parsed {len(coaches)} coaches, {len(support)} support staff")
-        for c in coaches[:3]:
-            print(f"    Coach: {c['fullName']} – {c['role']}")
-        for s in support[:2]:
-            print(f"    Support: {s['fullName']} – {s['role']}")
 
+def parse_staff_job(cfg: Dict, html: str) -> Tuple[Dict, str, List[Dict], List[Dict], Dict]:
+    """
+    Część CPU jednej strony (uruchamiana też w puli procesów).
+    Zwraca (school_json, tier, coaches, support, czasy etapów {"parse": s, "build": s}).
+    """
+    t0 = time.perf_counter()
+    with profiling.stage("parse"):
+        coaches, support, tier = parse_staff_page(html)
+    t1 = time.perf_counter()
+    with profiling.stage("build"):
         school_json = build_staff_json_for_school(cfg, coaches, support)
-        all_data.append(school_json)
+    timings = {"parse": t1 - t0, "build": time.perf_counter() - t1}
+    return school_json, tier, coaches, support, timings
+
+
+def finish_staff_page(cfg: Dict, url: str, result,
+                      tiers: Optional[Counter] = None,
+                      metrics: Optional[MetricsRecorder] = None) -> Optional[Dict]:
+    """
+    Loguje i zapisuje wynik parse_staff_job do raw_staff/.
+    `result` może być wyjątkiem (błąd pobierania albo JobFailed z parsera).
+    """
+    print(f"\n=== {cfg['school_name']} ({cfg['season_year']}) ===")
+    print(f"Fetching staff from: {url}")
+    if isinstance(result, JobFailed):
+        print(f"  [ERROR] Failed to parse {url}: {result}")
+        return None
+    if isinstance(result, Exception) or result is None:
+        print(f"  [ERROR] Failed to fetch {url}: {result}")
+        return None
+
+    school_json, tier, coaches, support, timings = result
+    if tiers is not None:
+        tiers[tier] += 1
+    labels = {"school": cfg["school_name"], "season": cfg["season_year"]}
+    n_records = len(coaches) + len(support)
+    if metrics is not None:
+        metrics.record("parse", timings["parse"], tier=tier, records=n_records, **labels)
+        metrics.record("build", timings["build"], records=n_records, **labels)
+
+    print(f"  Parsed {len(coaches)} coaches, {len(support)} support staff [{tier}]")
+    for c in coaches[:3]:
+        print(f"    Coach: {c['fullName']} – {c['role']}")
+    for s in support[:2]:
+        print(f"    Support: {s['fullName']} – {s['role']}")
+
+    out_path = staff_output_path(cfg)
+
+    t0 = time.perf_counter()
+    with profiling.stage("serialize"):
+        text = json.dumps(school_json, indent=2, ensure_ascii=False)
+    t1 = time.perf_counter()
+    with profiling.stage("write"), open(out_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    if metrics is not None:
+        metrics.record("serialize", t1 - t0, **labels)
+        metrics.record("write", time.perf_counter() - t1, nbytes=len(text.encode("utf-8")), **labels)
+    print(f"  Saved to {out_path}")
+    return school_json
+
+
+def write_all_staff(all_data: Iterable[Dict], path: str = ALL_STAFF_PATH) -> None:
+    """Plik zbiorczy (NDJSON) z dowolnego iterowalnego źródła – np. generatora po raw_staff/."""
+    with NdjsonWriter(path) as writer:
+        writer.write_all(all_data)
+    print(f"\nDone. Wrote {path} ({writer.count} teams)")
+
+
+def main(max_workers=MAX_WORKERS,
+         per_host_limit=PER_HOST_LIMIT,
+         min_interval=MIN_HOST_INTERVAL,
+         cache_dir=CACHE_DIR,
+         offline=False,
+         max_age=0.0,
+         archive_dir=ARCHIVE_DIR,
+         max_retries=MAX_RETRIES,
+         parse_workers=PARSE_WORKERS,
+         queue_size=QUEUE_SIZE,
+         state_path=STATE_PATH,
+         full=False,
+         schools: Optional[List[Dict]] = None,
+         shard=None,
+         metrics_dir=METRICS_DIR,
+         profile_dir=""):
+    schools = SCHOOLS if schools is None else schools
+    tiers = Counter()
+    metrics = MetricsRecorder("scrape_staff", metrics_dir)
+    profiler = start_profiling("scrape_staff", profile_dir)
+    if profiler is not None:
+        parse_workers = 0  # cProfile nie widzi procesów z puli
+    state = ScrapeState(shard_path(state_path, shard), full=full)
+    fingerprints: Dict[int, str] = {}
 
-        safe_name = cfg["school_name"].replace(" ", "_").replace("/", "_")
-        filename = f"{safe_name.lower()}_baseball_{cfg['season_year']}_staff.json"
-        out_path = os.path.join(OUTPUT_DIR, filename)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    cache = HttpCache(cache_dir) if cache_dir else None
+    archive = HtmlArchive(archive_dir) if archive_dir else None
+
+    # pobieranie i parsowanie potokiem (pipeline.py), zapis zaraz po sparsowaniu
+    staff_urls = [staff_page_url(cfg) for cfg in schools]
+    indexes_by_url: Dict[str, List[int]] = {}
+    for i, url in enumerate(staff_urls):
+        indexes_by_url.setdefault(url, []).append(i)
+    # plik zbiorczy rośnie w trakcie przebiegu, ale w kolejności rejestru
+    writer = NdjsonWriter(shard_path(ALL_STAFF_PATH, shard))
+    ordered = OrderedWriter(writer)
+
+    def on_fetch(url, seconds, nbytes, source):
+        cfg = schools[indexes_by_url[url][0]]
+        metrics.record("fetch", seconds, school=cfg["school_name"], season=cfg["season_year"],
+                       nbytes=nbytes, host=host_of(url), outcome=source)
+
+    def tasks():
+        for url, html in iter_fetch(staff_urls,
+                                    headers=HEADERS,
+                                    timeout=25,
+                                    max_workers=max_workers,
+                                    per_host_limit=per_host_limit,
+                                    min_interval=min_interval,
+                                    cache=cache,
+                                    offline=offline,
+                                    max_age=max_age,
+                                    queue_size=queue_size,
+                                    max_retries=max_retries,
+                                    observer=on_fetch):
+            for i in indexes_by_url[url]:
+                cfg = schools[i]
+                if isinstance(html, Exception):
+                    finish_staff_page(cfg, url, html, tiers)
+                    state.done(state_key(cfg, "staff"), "", "", None)
+                    ordered.put(i)
+                    continue
+                if archive is not None:
+                    archive.record(html, cfg["school_name"], cfg["season_year"], "staff", url)
+                kept, fingerprints[i] = state.check(state_key(cfg, "staff"), html,
+                                                    staff_output_path(cfg))
+                if kept is not None:
+                    print(f"\n=== {cfg['school_name']} ({cfg['season_year']}) === unchanged, "
+                          f"kept {staff_output_path(cfg)}")
+                    ordered.put(i, kept)
+                    continue
+                yield i, (cfg, html)
 
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(school_json, f, indent=2, ensure_ascii=False)
-        print(f"  Saved to {out_path}")
+    def on_result(i, result):
+        cfg = schools[i]
+        staff_json = finish_staff_page(cfg, staff_urls[i], result, tiers, metrics)
+        ordered.put(i, staff_json)
+        state.done(state_key(cfg, "staff"), fingerprints.pop(i),
+                   staff_output_path(cfg), staff_json)
 
-    with open("all_schools_staff.json", "w", encoding="utf-8") as f:
-        json.dump(all_data, f, indent=2, ensure_ascii=False)
-    print("\nDone. Wrote all_schools_staff.json")
+    with writer:
+        run_pipeline(tasks(), parse_staff_job, on_result, parse_workers=parse_workers)
+        ordered.flush()
 
+    state.save()
+    print("\n" + format_tier_summary(tiers))
+    print(state.summary())
+    print(f"\nDone. Wrote {writer.path} ({writer.count} teams)")
+    metrics.close()
+    if profiler is not None:
+        profiler.close()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape NCAA baseball coaching/support staff (Sidearm).")
+    add_fetch_arguments(parser)
+    add_pipeline_arguments(parser)
+    add_state_arguments(parser)
+    add_matrix_arguments(parser)
+    add_metrics_arguments(parser)
+    add_profile_arguments(parser, note="parses in the main process")
+    args = parser.parse_args()
+    main(**fetch_options(args), **pipeline_options(args), **state_options(args),
+         **matrix_options(args), **metrics_options(args),
+         **profile_options(args))
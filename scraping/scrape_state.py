@@ -0,0 +1,174 @@
+# scrape_state.py
+"""
+Scraping przyrostowy: plik stanu z "odciskiem" każdej strony.
+
+Dla każdej pary (school, season, kind) zapisujemy w scrape_state.json:
+  - fingerprint – sha256 znormalizowanej treści strony,
+  - output_hash – sha256 pliku JSON, który z niej powstał (raw_schools/, raw_staff/),
+  - version – STATE_VERSION (podbijamy, gdy zmieniają się parsery).
+
+Jeśli przy kolejnym przebiegu fingerprint się zgadza, a plik wyjściowy nadal
+ma zapisany hash, pomijamy parsowanie, budowanie JSON-a i zapis – do pliku
+zbiorczego trafia istniejący JSON szkoły.
+
+Normalizacja przed liczeniem fingerprintu wyrzuca to, co zmienia się przy
+każdym requeście, a nie wpływa na dane: komentarze, <style>, skrypty
+(poza tymi, z których czyta embedded_json.py), ukryte pola formularzy
+(tokeny) i różnice w białych znakach.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from embedded_json import SCRIPT_RE, SCRIPT_TYPE_RE, ASSIGNMENT_RE
+
+STATE_PATH = "scrape_state.json"
+STATE_VERSION = 2  # podbij po zmianie parserów / build_*_json – wymusi pełny przebieg (2: entity_ids.py)
+
+COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+STYLE_RE = re.compile(r"<style\b.*?</style\s*>", re.I | re.S)
+HIDDEN_INPUT_RE = re.compile(r"<input\b[^>]*\btype\s*=\s*[\"']?hidden[^>]*>", re.I)
+NONCE_RE = re.compile(r"\s(?:nonce|integrity)\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s>]+)", re.I)
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _keep_data_script(m: "re.Match") -> str:
+    """Zostawia tylko skrypty, z których embedded_json.py może wyciągnąć dane."""
+    attrs, body = m.group(1), m.group(2)
+    type_m = SCRIPT_TYPE_RE.search(attrs)
+    script_type = type_m.group(1).lower() if type_m else ""
+    if script_type in ("application/ld+json", "application/json"):
+        return m.group(0)
+    if (not script_type or "javascript" in script_type) and ASSIGNMENT_RE.match(body):
+        return m.group(0)
+    return ""
+
+
+def normalize_page(html: str) -> str:
+    html = SCRIPT_RE.sub(_keep_data_script, html)
+    html = COMMENT_RE.sub("", html)
+    html = STYLE_RE.sub("", html)
+    html = HIDDEN_INPUT_RE.sub("", html)
+    html = NONCE_RE.sub("", html)
+    return WHITESPACE_RE.sub(" ", html).strip()
+
+
+def page_fingerprint(html: str) -> str:
+    return hashlib.sha256(normalize_page(html).encode("utf-8")).hexdigest()
+
+
+def file_sha256(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def state_key(cfg: Dict, kind: str) -> str:
+    return f"{cfg['school_name']}|{cfg['season_year']}|{kind}"
+
+
+class ScrapeState:
+    """
+    Stan z poprzednich przebiegów + liczniki changed/unchanged/failed.
+
+    path="" wyłącza tryb przyrostowy (nic nie pomijamy, nic nie zapisujemy).
+    `full=True` ignoruje zapisane fingerprinty (wszystko parsujemy od nowa),
+    ale stan i tak jest aktualizowany.
+    """
+
+    def __init__(self, path: str = STATE_PATH, full: bool = False):
+        self.path = path
+        self.full = full
+        self.changes: Counter = Counter()
+        self._entries = self._load()
+        self._updated: Dict[str, Dict] = {}
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("pages", {})
+        except FileNotFoundError:
+            return {}
+
+    def check(self, key: str, html: str, out_path: str) -> Tuple[Optional[Dict], str]:
+        """
+        Zwraca (json, fingerprint). json to wynik z poprzedniego przebiegu, jeśli
+        strona się nie zmieniła i plik wyjściowy jest nietknięty; None oznacza,
+        że stronę trzeba sparsować.
+        """
+        if not self.path:
+            return None, ""
+        fingerprint = page_fingerprint(html)
+        entry = self._entries.get(key)
+        if (self.full or entry is None or entry.get("version") != STATE_VERSION
+                or entry.get("fingerprint") != fingerprint):
+            return None, fingerprint
+        try:
+            with open(out_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None, fingerprint
+        if hashlib.sha256(data).hexdigest() != entry.get("output_hash"):
+            return None, fingerprint
+        self.changes["unchanged"] += 1
+        return json.loads(data), fingerprint
+
+    def done(self, key: str, fingerprint: str, out_path: str, result: Optional[Dict]) -> None:
+        """Po sparsowaniu i zapisie strony (result=None: pobranie albo parser zawiódł)."""
+        if result is None:
+            self.changes["failed"] += 1
+            return
+        self.changes["changed"] += 1
+        if self.path:
+            self._updated[key] = {
+                "version": STATE_VERSION,
+                "fingerprint": fingerprint,
+                "output_hash": file_sha256(out_path),
+            }
+
+    def save(self) -> None:
+        """
+        Zapis atomowy. Plik czytamy jeszcze raz i nadpisujemy tylko klucze
+        z tego przebiegu, żeby scrape_rosters i scrape_staff nie kasowały
+        sobie nawzajem wpisów.
+        """
+        if not self.path or not self._updated:
+            return
+        entries = self._load()
+        entries.update(self._updated)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".scrape_state.")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"version": STATE_VERSION, "pages": entries}, f,
+                      indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp, self.path)
+        self._entries = entries
+        self._updated = {}
+
+    def summary(self) -> str:
+        return format_change_summary(self.changes)
+
+
+def format_change_summary(changes: Counter) -> str:
+    return (f"Pages changed: {changes['changed']}, unchanged (skipped): {changes['unchanged']}, "
+            f"failed: {changes['failed']}")
+
+
+def add_state_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--state-file", default=STATE_PATH,
+                        help="page fingerprints from previous runs ('' disables incremental mode)")
+    parser.add_argument("--full", action="store_true",
+                        help="parse every page even if its fingerprint did not change")
+
+
+def state_options(args: argparse.Namespace) -> Dict:
+    return {"state_path": args.state_file, "full": args.full}
@@ -0,0 +1,264 @@
+# work_queue.py
+"""
+Trwała kolejka zadań crawla w SQLite (jeden plik, bez serwera).
+
+Jedno zadanie = jedna strona (school, season, kind). Stany:
+
+    pending ──lease──> leased ──complete──> done
+       ^                 │
+       └──── fail ───────┤ (attempts < max_attempts, z opóźnieniem)
+                         └──── fail / wygasła dzierżawa po max_attempts ──> dead
+
+- Dzierżawa (lease) ma termin ważności: jeśli worker padnie, zadanie po
+  `lease_seconds` wraca do puli i bierze je ktoś inny.
+- Każde wzięcie zadania zwiększa `attempts`; po `max_attempts` nieudanych
+  próbach zadanie trafia do stanu "dead" (dead letter) razem z ostatnim błędem.
+- Grzeczność wobec serwerów jest pilnowana w samej kolejce, więc działa dla
+  dowolnej liczby procesów: w danej chwili najwyżej jedno wydzierżawione
+  zadanie na host i co najmniej `host_delay` sekund między kolejnymi.
+
+Wszystkie zmiany stanu idą w transakcjach BEGIN IMMEDIATE, więc wiele
+procesów może bezpiecznie korzystać z jednego pliku bazy.
+"""
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+QUEUE_PATH = "work_queue.sqlite"
+LEASE_SECONDS = 300.0
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 30.0      # opóźnienie ponownej próby = RETRY_DELAY * attempts
+HOST_DELAY = 1.0        # minimalny odstęp między zadaniami do jednego hosta
+
+STATE_PENDING = "pending"
+STATE_LEASED = "leased"
+STATE_DONE = "done"
+STATE_DEAD = "dead"
+STATES = (STATE_PENDING, STATE_LEASED, STATE_DONE, STATE_DEAD)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    school        TEXT    NOT NULL,
+    season        INTEGER NOT NULL,
+    kind          TEXT    NOT NULL,
+    url           TEXT    NOT NULL,
+    host          TEXT    NOT NULL,
+    cfg           TEXT    NOT NULL,
+    state         TEXT    NOT NULL DEFAULT 'pending',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    not_before    REAL    NOT NULL DEFAULT 0,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    last_error    TEXT,
+    output_path   TEXT,
+    updated_at    REAL    NOT NULL,
+    UNIQUE (school, season, kind)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, not_before);
+CREATE TABLE IF NOT EXISTS hosts (
+    host          TEXT PRIMARY KEY,
+    next_allowed  REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+class Job:
+    """Wydzierżawione zadanie (wiersz z tabeli jobs)."""
+
+    def __init__(self, row: sqlite3.Row):
+        self.id: int = row["id"]
+        self.school: str = row["school"]
+        self.season: int = row["season"]
+        self.kind: str = row["kind"]
+        self.url: str = row["url"]
+        self.host: str = row["host"]
+        self.cfg: Dict = json.loads(row["cfg"])
+        self.attempts: int = row["attempts"]
+
+    def __repr__(self) -> str:
+        return f"Job({self.id}, {self.school!r}, {self.season}, {self.kind})"
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    def __init__(self, path: str = QUEUE_PATH,
+                 lease_seconds: float = LEASE_SECONDS,
+                 max_attempts: int = MAX_ATTEMPTS,
+                 retry_delay: float = RETRY_DELAY,
+                 host_delay: float = HOST_DELAY):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.host_delay = host_delay
+        # autocommit – transakcje otwieramy sami (BEGIN IMMEDIATE)
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    # --- producent ---------------------------------------------------------
+
+    def enqueue(self, jobs: Iterable[Tuple[Dict, str, str, str]]) -> int:
+        """
+        Dodaje zadania (cfg, kind, url, host). Istniejące (school, season, kind)
+        są pomijane, więc enqueue można bezpiecznie powtarzać. Zwraca liczbę nowych.
+        """
+        now = time.time()
+        added = 0
+        with self._transaction() as conn:
+            for cfg, kind, url, host in jobs:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO jobs (school, season, kind, url, host, cfg, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (cfg["school_name"], cfg["season_year"], kind, url, host,
+                     json.dumps(cfg, ensure_ascii=False), now))
+                added += cur.rowcount
+        return added
+
+    # --- worker ------------------------------------------------------------
+
+    def _expire_leases(self, conn: sqlite3.Connection, now: float) -> None:
+        """Wygasłe dzierżawy: ostatnia próba -> dead, pozostałe wracają do pending."""
+        conn.execute(
+            "UPDATE jobs SET state = ?, last_error = COALESCE(last_error, 'lease expired'), "
+            "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+            (STATE_DEAD, now, STATE_LEASED, now, self.max_attempts))
+        conn.execute(
+            "UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE state = ? AND lease_expires < ?",
+            (STATE_PENDING, now, STATE_LEASED, now))
+
+    def lease(self, owner: Optional[str] = None) -> Optional[Job]:
+        """
+        Bierze najstarsze gotowe zadanie, którego host jest wolny.
+        None, jeśli teraz nic nie da się wziąć (patrz has_work()).
+        """
+        owner = owner or default_owner()
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+            row = conn.execute(
+                "SELECT j.* FROM jobs j LEFT JOIN hosts h ON h.host = j.host "
+                "WHERE j.state = ? AND j.not_before <= ? "
+                "  AND COALESCE(h.next_allowed, 0) <= ? "
+                "  AND NOT EXISTS (SELECT 1 FROM jobs b WHERE b.host = j.host AND b.state = ?) "
+                "ORDER BY j.id LIMIT 1",
+                (STATE_PENDING, now, now, STATE_LEASED)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated_at = ? WHERE id = ?",
+                (STATE_LEASED, owner, now + self.lease_seconds, now, row["id"]))
+            conn.execute(
+                "INSERT INTO hosts (host, next_allowed) VALUES (?, ?) "
+                "ON CONFLICT(host) DO UPDATE SET next_allowed = excluded.next_allowed",
+                (row["host"], now + self.host_delay))
+        job = Job(row)
+        job.attempts += 1
+        return job
+
+    def complete(self, job: Job, output_path: str = "") -> bool:
+        """False, jeśli dzierżawa już wygasła i zadanie wziął ktoś inny."""
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET state = ?, output_path = ?, last_error = NULL, "
+                "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND state = ? AND attempts = ?",
+                (STATE_DONE, output_path, time.time(), job.id, STATE_LEASED, job.attempts))
+            return cur.rowcount == 1
+
+    def fail(self, job: Job, error: str, retry: bool = True) -> str:
+        """
+        Zapisuje błąd. Zadanie wraca do pending (z opóźnieniem) albo, po
+        max_attempts próbach lub gdy retry=False, trafia do dead. Zwraca nowy stan.
+        """
+        now = time.time()
+        dead = not retry or job.attempts >= self.max_attempts
+        state = STATE_DEAD if dead else STATE_PENDING
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, last_error = ?, not_before = ?, "
+                "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND state = ? AND attempts = ?",
+                (state, error[:2000], now + self.retry_delay * job.attempts, now,
+                 job.id, STATE_LEASED, job.attempts))
+        return state
+
+    def release(self, job: Job) -> None:
+        """Oddaje zadanie bez liczenia próby (np. worker przerwany Ctrl-C)."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts - 1, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE id = ? AND state = ? AND attempts = ?",
+                (STATE_PENDING, time.time(), job.id, STATE_LEASED, job.attempts))
+
+    def defer(self, job: Job, until: float) -> None:
+        """
+        Oddaje zadanie bez liczenia próby i nie wcześniej niż `until`
+        (time.time()) – np. host z otwartym circuit breakerem.
+        """
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts - 1, not_before = ?, "
+                "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND state = ? AND attempts = ?",
+                (STATE_PENDING, until, time.time(), job.id, STATE_LEASED, job.attempts))
+
+    def has_work(self) -> bool:
+        """Czy zostało coś do zrobienia (pending albo wydzierżawione)."""
+        row = self._conn.execute(
+            "SELECT 1 FROM jobs WHERE state IN (?, ?) LIMIT 1",
+            (STATE_PENDING, STATE_LEASED)).fetchone()
+        return row is not None
+
+    # --- administracja -----------------------------------------------------
+
+    def counts(self) -> Dict[str, int]:
+        counts = {state: 0 for state in STATES}
+        for row in self._conn.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state"):
+            counts[row["state"]] = row["n"]
+        return counts
+
+    def dead_jobs(self) -> List[sqlite3.Row]:
+        return self._conn.execute(
+            "SELECT school, season, kind, url, attempts, last_error FROM jobs "
+            "WHERE state = ? ORDER BY id", (STATE_DEAD,)).fetchall()
+
+    def retry_dead(self) -> int:
+        """Przywraca zadania z dead do pending (z wyzerowanym licznikiem prób)."""
+        with self._transaction() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET state = ?, attempts = 0, not_before = 0, updated_at = ? "
+                "WHERE state = ?", (STATE_PENDING, time.time(), STATE_DEAD))
+            return cur.rowcount
+
+    def done_outputs(self, kind: str) -> List[Tuple[str, int, str]]:
+        """(school, season, output_path) zakończonych zadań, w kolejności dodania."""
+        return [(r["school"], r["season"], r["output_path"]) for r in self._conn.execute(
+            "SELECT school, season, output_path FROM jobs WHERE kind = ? AND state = ? "
+            "ORDER BY id", (kind, STATE_DONE))]
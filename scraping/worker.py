@@ -0,0 +1,245 @@
+# worker.py
+"""
+Crawl na trwałej kolejce SQLite (work_queue.py) zamiast jednego przebiegu w pamięci.
+
+Każda strona (school, season, kind) to osobne zadanie; wynik ląduje od razu
+w raw_schools/ albo raw_staff/, a zadanie jest oznaczane jako "done". Po awarii
+albo Ctrl-C kolejne uruchomienie zaczyna dokładnie tam, gdzie skończyło
+poprzednie. Workerów (procesów, także na kilku terminalach) może być dowolnie
+wiele – grzeczność per host pilnuje kolejka.
+
+Użycie:
+    python scraping/worker.py enqueue [--years 2016-2025] [--kind roster|staff|all]
+    python scraping/worker.py work --processes 4
+    python scraping/worker.py status
+    python scraping/worker.py finalize      # pliki zbiorcze z zakończonych zadań
+    python scraping/worker.py retry-dead    # dead letter -> pending
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+import scrape_rosters
+import scrape_staff
+from fetcher import HostPool, host_of
+from http_cache import CacheMiss, HttpCache, CACHE_DIR
+from html_archive import HtmlArchive, ARCHIVE_DIR
+from html_parsing import add_backend_argument, apply_backend_argument
+from resilience import CircuitOpen, RetryPolicy, MAX_RETRIES
+from registry import add_matrix_arguments, matrix_options
+from work_queue import (WorkQueue, Job, QUEUE_PATH, LEASE_SECONDS, MAX_ATTEMPTS,
+                        HOST_DELAY, STATES)
+
+KINDS = ("roster", "staff")
+IDLE_POLL = 0.5   # s – ile czekamy, gdy wszystkie wolne zadania mają zajęty host
+
+PAGE_URL = {"roster": scrape_rosters.roster_page_url, "staff": scrape_staff.staff_page_url}
+OUTPUT_PATH = {"roster": scrape_rosters.roster_output_path, "staff": scrape_staff.staff_output_path}
+PARSE_JOB = {"roster": scrape_rosters.parse_roster_job, "staff": scrape_staff.parse_staff_job}
+FINISH = {"roster": scrape_rosters.finish_roster_page, "staff": scrape_staff.finish_staff_page}
+HEADERS = {"roster": scrape_rosters.HEADERS, "staff": scrape_staff.HEADERS}
+TIMEOUT = {"roster": 20, "staff": 25}
+
+
+def enqueue(queue: WorkQueue, schools: List[Dict], kinds=KINDS) -> int:
+    jobs = []
+    for cfg in schools:
+        for kind in kinds:
+            url = PAGE_URL[kind](cfg)
+            jobs.append((cfg, kind, url, host_of(url)))
+    return queue.enqueue(jobs)
+
+
+def _is_permanent(error: Exception) -> bool:
+    """Błędy, których ponowienie nic nie da: brak w cache offline, HTTP 4xx (poza 429)."""
+    if isinstance(error, CacheMiss):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return 400 <= status < 500 and status != 429
+    return False
+
+
+def handle_job(job: Job, queue: WorkQueue, pools: Dict[str, HostPool],
+               archive: Optional[HtmlArchive]) -> str:
+    """Pobiera, parsuje i zapisuje jedną stronę. Zwraca stan zadania po próbie."""
+    cfg = job.cfg
+    try:
+        html = pools[job.kind].fetch(job.url, timeout=TIMEOUT[job.kind])
+    except CircuitOpen as e:
+        # host chwilowo wyłączony – zadanie wraca na koniec, próba się nie liczy
+        queue.defer(job, time.time() + max(0.0, e.until - time.monotonic()))
+        return "deferred"
+    except Exception as e:
+        return queue.fail(job, f"fetch: {type(e).__name__}: {e}", retry=not _is_permanent(e))
+
+    if archive is not None:
+        archive.record(html, cfg["school_name"], cfg["season_year"], job.kind, job.url)
+
+    try:
+        result = PARSE_JOB[job.kind](cfg, html)
+    except Exception as e:
+        # ta sama strona da ten sam błąd parsera – od razu do dead letter
+        return queue.fail(job, f"parse: {type(e).__name__}: {e}", retry=False)
+
+    FINISH[job.kind](cfg, job.url, result)
+    if not queue.complete(job, OUTPUT_PATH[job.kind](cfg)):
+        print(f"  [WARN] lease on {job} expired before completion")
+    return "done"
+
+
+def run_worker(queue_path: str = QUEUE_PATH,
+               cache_dir: str = CACHE_DIR,
+               offline: bool = False,
+               max_age: float = 0.0,
+               archive_dir: str = ARCHIVE_DIR,
+               lease_seconds: float = LEASE_SECONDS,
+               max_attempts: int = MAX_ATTEMPTS,
+               host_delay: float = HOST_DELAY,
+               max_retries: int = MAX_RETRIES) -> int:
+    """Bierze zadania, dopóki są; zwraca liczbę obsłużonych."""
+    queue = WorkQueue(queue_path, lease_seconds=lease_seconds,
+                      max_attempts=max_attempts, host_delay=host_delay)
+    cache = HttpCache(cache_dir) if cache_dir else None
+    archive = HtmlArchive(archive_dir) if archive_dir else None
+    # odstępy między requestami do hosta pilnuje kolejka (host_delay)
+    pools = {kind: HostPool(HEADERS[kind], min_interval=0.0, cache=cache,
+                            offline=offline, max_age=max_age,
+                            retry=RetryPolicy(max_retries)) for kind in KINDS}
+    os.makedirs(scrape_rosters.OUTPUT_DIR, exist_ok=True)
+    os.makedirs(scrape_staff.OUTPUT_DIR, exist_ok=True)
+
+    handled = 0
+    job = None
+    try:
+        while True:
+            job = queue.lease()
+            if job is None:
+                if not queue.has_work():
+                    break
+                time.sleep(IDLE_POLL)
+                continue
+            state = handle_job(job, queue, pools, archive)
+            if state != "done":
+                print(f"  [{state.upper()}] {job} (attempt {job.attempts})")
+            job = None
+            handled += 1
+    except KeyboardInterrupt:
+        if job is not None:
+            queue.release(job)
+        raise
+    finally:
+        for pool in pools.values():
+            pool.close()
+        queue.close()
+    return handled
+
+
+def _worker_process(kwargs: Dict) -> None:
+    try:
+        run_worker(**kwargs)
+    except KeyboardInterrupt:
+        pass
+
+
+def work(processes: int = 1, **kwargs) -> None:
+    if processes <= 1:
+        handled = run_worker(**kwargs)
+        print(f"Worker done, handled {handled} jobs")
+        return
+    procs = [multiprocessing.Process(target=_worker_process, args=(kwargs,))
+             for _ in range(processes)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+
+def _done_records(queue: WorkQueue, kind: str) -> Iterator[Dict]:
+    """Pliki z raw_*/ zakończonych zadań, czytane po jednym (kolejność dodania)."""
+    for school, season, path in queue.done_outputs(kind):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                yield json.load(f)
+        except FileNotFoundError:
+            print(f"  [WARN] {school} {season} {kind}: missing {path}")
+
+
+def finalize(queue: WorkQueue) -> None:
+    """Pliki zbiorcze (NDJSON) z raw_*/ dla wszystkich zakończonych zadań."""
+    writers = {"roster": scrape_rosters.write_all_schools, "staff": scrape_staff.write_all_staff}
+    for kind in KINDS:
+        writers[kind](_done_records(queue, kind))
+    print_status(queue)
+
+
+def print_status(queue: WorkQueue) -> None:
+    counts = queue.counts()
+    print("Jobs: " + ", ".join(f"{state} {counts[state]}" for state in STATES))
+    for row in queue.dead_jobs():
+        print(f"  dead: {row['school']} {row['season']} {row['kind']} "
+              f"(attempts {row['attempts']}): {row['last_error']}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Crawl through a durable SQLite work queue.")
+    parser.add_argument("--queue", default=QUEUE_PATH, help="SQLite queue file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_enqueue = sub.add_parser("enqueue", help="add (school, season, page) jobs")
+    p_enqueue.add_argument("--kind", choices=["all", "roster", "staff"], default="all")
+    add_matrix_arguments(p_enqueue)
+
+    p_work = sub.add_parser("work", help="lease and run jobs until the queue is drained")
+    p_work.add_argument("--processes", type=int, default=1, help="worker processes")
+    p_work.add_argument("--cache-dir", default=CACHE_DIR)
+    p_work.add_argument("--offline", action="store_true")
+    p_work.add_argument("--max-age", type=float, default=0.0)
+    p_work.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    p_work.add_argument("--lease", type=float, default=LEASE_SECONDS,
+                        help="seconds before an unfinished job is given to another worker")
+    p_work.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS)
+    p_work.add_argument("--retries", type=int, default=MAX_RETRIES,
+                        help="in-process retries per attempt (backoff, Retry-After)")
+    p_work.add_argument("--delay", type=float, default=HOST_DELAY,
+                        help="minimum seconds between jobs for the same host (all workers)")
+    add_backend_argument(p_work)
+
+    sub.add_parser("status", help="job counts and dead-letter jobs")
+    sub.add_parser("finalize", help="write the aggregate files from finished jobs")
+    sub.add_parser("retry-dead", help="move dead jobs back to pending")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "work":
+        apply_backend_argument(args)
+        work(processes=args.processes, queue_path=args.queue, cache_dir=args.cache_dir,
+             offline=args.offline, max_age=args.max_age, archive_dir=args.archive_dir,
+             lease_seconds=args.lease, max_attempts=args.max_attempts, host_delay=args.delay,
+             max_retries=args.retries)
+        return
+
+    queue = WorkQueue(args.queue)
+    try:
+        if args.command == "enqueue":
+            kinds = KINDS if args.kind == "all" else (args.kind,)
+            added = enqueue(queue, matrix_options(args)["schools"], kinds)
+            print(f"Enqueued {added} new jobs")
+            print_status(queue)
+        elif args.command == "status":
+            print_status(queue)
+        elif args.command == "finalize":
+            finalize(queue)
+        elif args.command == "retry-dead":
+            print(f"Moved {queue.retry_dead()} dead jobs back to pending")
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()